@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: XROTOR vs. the NumPy BEM backend (util_loads.bem) on the HeLics
+propeller of prop_loads_preprocessing.py. Both backends solve the same
+rpm sweep; runtime, thrust, torque and the root bending moment are
+compared.
+
+Usage::
+
+    python benchmarks/bench_bem.py [number_of_loadcases]
+
+XFOIL (polar of mf3218) and XROTOR must be on the PATH. The result cache is
+disabled, so XROTOR really runs.
+
+"""
+
+# %% Import Libraries and Data
+
+# Third-party imports
+import os
+import sys
+import time
+import numpy as np
+
+# Local imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from util_loads import Propeller, Airfoil, Loadcase, Bem
+
+# %% HeLics propeller
+
+
+def helics():
+    airfoil = Airfoil('mf3218.xfo', 500000, iter_limit=600)
+
+    propeller = Propeller(number_of_blades=2,
+                          tip_radius=0.412,
+                          hub_radius=0.04,
+                          )
+
+    propeller.geometry = np.array([[0.10, 0.078, 0],
+                                   [0.121, 0.078, 0.],
+                                   [0.155, 0.100, 5.99],
+                                   [0.223, 0.160, 17.97],
+                                   [0.345, 0.149, 14.44],
+                                   [0.417, 0.142, 12.68],
+                                   [0.490, 0.135, 11.18],
+                                   [0.563, 0.128, 9.94],
+                                   [0.636, 0.121, 8.97],
+                                   [0.709, 0.114, 8.26],
+                                   [0.782, 0.107, 7.81],
+                                   [0.854, 0.100, 7.63],
+                                   [0.947, 0.091, 7.5],
+                                   [1., 0.066, 7.5],
+                                   ])
+
+    propeller.sections = [[0.121, airfoil],
+                          [0.223, airfoil],
+                          [1., airfoil]]
+
+    airfoil.set_polar(alpha_start=-7, alpha_stop=20, alpha_inc=0.25)
+
+    airfoil.xrotor_characteristics['Cm'] = -0.14
+    airfoil.xrotor_characteristics['d(Cl)/d(alpha)'] = 6.28
+    airfoil.xrotor_characteristics['Minimum Cl'] = 0.
+
+    return propeller
+
+# %% Benchmark
+
+
+def run(propeller, backend):
+    propeller.backend = backend
+
+    start = time.perf_counter()
+    propeller.calc_loads()
+    wall_time = time.perf_counter() - start
+
+    results = [result for _, result in propeller.loadcases]
+
+    return wall_time, np.array(
+        [[result['single_values']['thrust(N)'],
+          result['single_values']['torque(N-m)'],
+          result['bend']['Mz'].iloc[0]]
+         for result in results])
+
+
+if __name__ == '__main__':
+    n_loadcases = int(sys.argv[1]) if len(sys.argv) == 2 else 10
+
+    Propeller.cache = None
+    propeller = helics()
+
+    for rpm in np.linspace(1000, 4000, n_loadcases):
+        propeller.add_loadcase(Loadcase('%i rpm' % rpm, flight_speed=0.01))
+        propeller.loadcases[-1][0].set_data('rpm', rpm)
+
+    t_xrotor, xrotor = run(propeller, 'xrotor')
+    t_bem, bem = run(propeller, 'bem')
+
+    print('%i loadcases: xrotor %8.3f s | bem %8.3f s | speedup %7.1fx'
+          % (n_loadcases, t_xrotor, t_bem, t_xrotor / t_bem))
+    print(repr(Bem(propeller)))
+    print('%8s %22s %22s %22s' % ('rpm', 'thrust(N) xrotor/bem',
+                                  'torque(N-m) xrotor/bem',
+                                  'Mz root xrotor/bem'))
+    for (loadcase, _), x, b in zip(propeller.loadcases, xrotor, bem):
+        print('%8.0f %10.2f %10.2f  %10.3f %10.3f  %10.3f %10.3f'
+              % (loadcase.data[1], x[0], b[0], x[1], b[1], x[2], b[2]))
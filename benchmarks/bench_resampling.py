@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark: resampling of XFOIL CPWR/DUMP outputs onto the normed X
+grid. Compares the former pandas append/sort/interpolate/isin idiom with
+the NumPy engine in util_loads.support.
+
+Usage::
+
+    python benchmarks/bench_resampling.py [cpwr_file dump_file]
+
+Without arguments, XFOIL is run once for mf3218 at Cl = 0.5 to write real
+output files.
+
+"""
+
+# %% Import Libraries and Data
+
+# Third-party imports
+import os
+import sys
+import timeit
+import numpy as np
+import pandas as pd
+
+# Local imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from util_loads import Xfoil, Airfoil
+from util_loads.support import NORM_GRID
+
+# %% Former implementation
+
+
+def legacy_norm(dataframe):
+    norm_list = list(np.arange(0.01, 1.00, 0.01))
+    empty_frame = pd.DataFrame(norm_list, columns=['x'])
+    empty_frame['y'] = np.nan
+    dataframe.columns = ['x', 'y']
+    dataframe = pd.concat([dataframe, empty_frame])
+    dataframe = dataframe.sort_values('x')
+    dataframe = dataframe.interpolate()
+    dataframe = dataframe.dropna()
+    dataframe = dataframe.drop_duplicates(keep='first')
+
+    dataframe = dataframe[dataframe['x'].isin(norm_list)]
+    return dataframe
+
+
+def legacy_read_cp_vs_x(filename):
+    df = pd.read_fwf(filename, header=0, skiprows=0, names=['#', 'x', 'Cp'])
+    df = df.drop(labels=['#'], axis=1)
+
+    suction_side = df.iloc[:df['x'].idxmin() + 1, :]
+    pressure_side = df.iloc[df['x'].idxmin() + 1:, :]
+
+    norm_suction_side = legacy_norm(suction_side)
+    norm_pressure_side = legacy_norm(pressure_side)
+
+    norm_suction_side.columns = ['x', 'Cp_suc']
+    norm_pressure_side.columns = ['x', 'Cp_pres']
+
+    norm_suction_side['Cp_pres'] = norm_pressure_side['Cp_pres']
+
+    return norm_suction_side[:99]
+
+
+def legacy_read_cf_vs_x(filename):
+    df = pd.read_fwf(filename, colspecs=[(12, 19), (59, 67)])
+    df = df[(df != 0).all(1)]
+
+    suction_side = df.iloc[:df['x'].idxmin() + 1, :]
+    pressure_side = df.iloc[df['x'].idxmin() + 1:, :]
+
+    norm_suction_side = legacy_norm(suction_side)
+    norm_pressure_side = legacy_norm(pressure_side)
+
+    norm_suction_side.columns = ['x', 'Cf']
+    norm_pressure_side.columns = ['x', 'Cf']
+
+    norm_suction_side['Cf'] = norm_suction_side['Cf'] \
+        + norm_pressure_side['Cf']
+
+    return norm_suction_side
+
+# %% Benchmark
+
+
+def write_outputs():
+    airfoil = Airfoil('mf3218', 500000)
+
+    coordinates_file = '_bench_coords.txt'
+    np.savetxt(coordinates_file, airfoil.coordinates, fmt='%9.8f')
+
+    with Xfoil() as x:
+        x.run('load ')
+        x.run(coordinates_file)
+        x.run('')
+        x.run('pane')
+        x.run('oper')
+        x.run('visc ' + str(airfoil.parameters['Re']))
+        x.run('iter')
+        x.run('200')
+        x.run('cl')
+        x.run(0.5)
+        x.run('cpwr')
+        x.run('_bench_cpwr.txt')
+        x.run('dump')
+        x.run('_bench_dump.txt')
+        x.run('')
+        x.run('quit')
+
+    os.remove(coordinates_file)
+
+    return '_bench_cpwr.txt', '_bench_dump.txt'
+
+
+def bench(name, legacy, engine, filename, column, number=200):
+    t_legacy = timeit.timeit(lambda: legacy(filename), number=number)
+    t_engine = timeit.timeit(lambda: engine(filename), number=number)
+
+    old = legacy(filename)
+    new = engine(filename)
+    # The former implementation silently drops grid points (float equality).
+    # Differences also come from DataFrame.interpolate(), which treats the
+    # points as equally spaced instead of interpolating linearly in x.
+    found = new['x'].round(6).isin(old['x'].round(6)).to_numpy()
+    diff = np.max(np.abs(old[column].to_numpy()
+                         - new[column].to_numpy()[found]))
+
+    print('%-12s legacy %8.3f ms | numpy %8.3f ms | speedup %5.1fx | '
+          'points %i/%i | max diff %.2e'
+          % (name, 1000 * t_legacy / number, 1000 * t_engine / number,
+             t_legacy / t_engine, len(old), len(NORM_GRID), diff))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3:
+        cpwr_file, dump_file = sys.argv[1:]
+    else:
+        cpwr_file, dump_file = write_outputs()
+
+    bench('read_cp_vs_x', legacy_read_cp_vs_x,
+          lambda f: Xfoil.read_cp_vs_x(f, True), cpwr_file, 'Cp_suc')
+    bench('read_cf_vs_x', legacy_read_cf_vs_x,
+          Xfoil.read_cf_vs_x, dump_file, 'Cf')
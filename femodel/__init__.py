@@ -5,4 +5,5 @@
 # Local imports
 from .femodel import Femodel
 from .propellermodel import PropellerModel
-from .prop_threepart import Threepartmodel
\ No newline at end of file
+from .prop_threepart import Threepartmodel
+from .checkpoint import EvaluationStore
\ No newline at end of file
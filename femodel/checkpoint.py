@@ -0,0 +1,194 @@
+# %% Import Libraries and Data
+
+# Third-party imports
+import os
+import glob
+import json
+import time
+import functools
+import numpy as np
+import pandas as pd
+
+# Local imports
+
+# %%
+
+
+class EvaluationStore:
+    """
+    Append-only store of objective function evaluations (x, f, g, fail,
+    wall time, rank) with an evaluation cache: a restarted optimization
+    gets the stored result of every design that was already evaluated
+    instead of solving it again.
+
+    Every MPI rank appends to its own JSON lines file, so the ranks never
+    write to the same file. Every record is flushed to disk immediately,
+    a crash loses at most the running evaluation. On startup, the records
+    of all ranks are loaded into the cache.
+
+    The cache is only valid for one model: the evaluations are stored in
+    a subdirectory per fingerprint (e.g. a hash of element_data, loads and
+    materials, see util_loads.ResultCache.fingerprint()), so a changed 
+    model never gets the results of another one. Replay can be switched
+    off (replay = False), e.g. for a cold start that only records.
+
+    .. code-block:: python
+
+        from femodel.checkpoint import EvaluationStore
+        from util_loads import ResultCache
+
+        fingerprint = ResultCache.fingerprint(model.element_data, loads)
+        store = EvaluationStore('./checkpoints', rank=rank,
+                                fingerprint=fingerprint)
+
+        @store.checkpoint
+        def objfunc(x):
+            ...
+            return f, g, fail
+
+    Parameters
+    ----------
+    path : str
+        Directory of the store.
+    rank : int, optional
+        MPI rank of this process. The default is 0.
+    decimals : int, optional
+        Design variables are rounded to this number of decimals to find
+        them in the cache. The default is 10.
+    fingerprint : str, optional
+        Hash of everything except x that defines f and g. The default is
+        None (no subdirectory: the caller guarantees one model per path).
+    replay : bool, optional
+        Answer known designs from the cache. The default is True.
+
+    """
+
+    def __init__(self, path, rank=0, decimals=10, fingerprint=None,
+                 replay=True):
+        if fingerprint is not None:
+            path = os.path.join(path, str(fingerprint)[:16])
+        self.path = path
+        self.rank = rank
+        self.decimals = decimals
+        self.fingerprint = fingerprint
+        self.replay = replay
+        self.hits = 0
+
+        os.makedirs(path, exist_ok=True)
+        self.__cache = {}
+        self.reload()
+        
+        # Terminate an incomplete last line of a crashed run
+        if os.path.isfile(self.filename) and os.path.getsize(self.filename):
+            with open(self.filename, 'rb+') as fp:
+                fp.seek(-1, os.SEEK_END)
+                if fp.read(1) != b'\n':
+                    fp.write(b'\n')
+
+    def __repr__(self):
+        return ('EvaluationStore ' + str(self.path) + ' ('
+                + str(len(self)) + ' evaluations)')
+
+    def __len__(self):
+        return len(self.__cache)
+
+    @property
+    def filename(self):
+        """
+        Returns
+        -------
+        str
+            The file of this rank.
+
+        """
+        return os.path.join(self.path,
+                            'evaluations_' + str(self.rank) + '.jsonl')
+
+    def __key__(self, x):
+        return tuple(np.round(np.asarray(x, dtype=float), self.decimals))
+
+    def reload(self):
+        """Loads the records of all ranks into the cache."""
+
+        for filename in sorted(glob.glob(os.path.join(self.path,
+                                                      'evaluations_*.jsonl'))):
+            with open(filename, 'r') as fp:
+                for line in fp:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Incomplete last line of a crashed run
+                        continue
+                    self.__cache[self.__key__(record['x'])] = record
+
+    def lookup(self, x):
+        """
+        Returns
+        -------
+        record : Dict
+            The stored evaluation of x, None if x was not evaluated.
+
+        """
+        return self.__cache.get(self.__key__(x))
+
+    def append(self, x, f, g, fail=0, wall_time=None):
+        """
+        Stores one evaluation.
+
+        Returns
+        -------
+        record : Dict
+
+        """
+        record = {'x': [float(i) for i in x],
+                  'f': float(f),
+                  'g': [float(i) for i in g],
+                  'fail': int(fail),
+                  'wall_time': wall_time,
+                  'rank': self.rank,
+                  'time': time.time()}
+
+        with open(self.filename, 'a') as fp:
+            fp.write(json.dumps(record) + '\n')
+            fp.flush()
+            os.fsync(fp.fileno())
+
+        self.__cache[self.__key__(x)] = record
+
+        return record
+
+    def checkpoint(self, objfunc):
+        """
+        Decorator for an objective function objfunc(x) -> (f, g, fail):
+        known designs are answered from the cache (if replay), new 
+        evaluations are stored. Failed evaluations (fail != 0) are stored, but evaluated
+        again after a restart.
+
+        """
+        @functools.wraps(objfunc)
+        def wrapper(x, *args, **kwargs):
+            record = self.lookup(x) if self.replay else None
+            if record is not None and record['fail'] == 0:
+                self.hits += 1
+                return record['f'], list(record['g']), record['fail']
+
+            start = time.time()
+            f, g, fail = objfunc(x, *args, **kwargs)
+            self.append(x, f, g, fail, time.time() - start)
+
+            return f, g, fail
+
+        return wrapper
+
+    def history(self):
+        """
+        Returns
+        -------
+        DataFrame
+            The stored evaluations (the last one of every design), 
+            sorted by time.
+
+        """
+        records = sorted(self.__cache.values(), key=lambda r: r['time'])
+
+        return pd.DataFrame(records)
@@ -32,6 +32,18 @@ class Femodel:
         self.__element_data = None
         self.__element_chord_vector = None
         self.__element_aoa_vector = None
+        self.__element_station = None
+        self.__element_section = None
+        self.__stations = None
+        self.__element_geometry = None
+        self.__element_states = None
+        self.__station_cl = None
+        self.__edge_nodes = None
+        # Layup interning table for the element sections (LayupTable), 
+        # None: one section per element. Off by default: the core plies 
+        # scale with the element height, so almost no two elements of the 
+        # propeller models share a layup.
+        self.layups = None
         # Name of the .cdb file
         self.__ansys_input_filename = '_ansys_input_file'
         
@@ -47,203 +59,291 @@ class Femodel:
         """
         pass
 
-    def __calc_element_data__(self):
+    def __calc_element_data__(self, station_tolerance=0.5, pool=None):
         """
         This method gathers all necessary element data for assigning
         the loads.
         
+        It works in two stages: First, the element midpoints are grouped
+        into radial stations (elements of one spanwise row). The leading and
+        trailing edges, the interpolated airfoil and the aerodynamic state
+        are computed once per station. Then, these station values are 
+        broadcast onto the elements. The loads are mapped by 
+        __calc_element_loads__(), which can be re-run on its own when the 
+        propeller loads change.
+
+        Parameters
+        ----------
+        station_tolerance : float, optional
+            Maximum spanwise distance [mm] between the midpoints of 
+            neighbouring elements of one station. The default is 0.5.
+        pool : XfoilPool, optional
+            Running XfoilPool to compute the station states concurrently.
+            The default is None.
+        
         """
         
-        self.mapdl.prep7()        
+        self.mapdl.prep7()
         
-        data_array = []
-        chord_vector = [] 
-        alpha_vector = []
+        ## Stage 1: Element geometry
+        elements = np.array(self.mapdl.mesh.enum, dtype=int)
         
-        for element in self.mapdl.mesh.enum:
-            ## Center point of element
+        midpoints = np.zeros([len(elements), 3])
+        element_area = np.zeros(len(elements))
+        
+        for idx, element in enumerate(elements):
+            # Center point of element
             self.mapdl.get('mp_x','elem',element,'cent','x')
             self.mapdl.get('mp_y','elem',element,'cent','y')
             self.mapdl.get('mp_z','elem',element,'cent','z')
             
-            element_midpoint = np.array([self.mapdl.parameters['mp_x'],
-                                         self.mapdl.parameters['mp_y'],
-                                         self.mapdl.parameters['mp_z']])
-            
-            ## Leading and trailing edge coords:
-            leading_edge, trailing_edge, chordlength = \
-                self.__get_edges__(element_midpoint[1])
-                
-            ## Get section of element:
-            n_sec = np.floor(((np.round(element_midpoint[1],0) 
-                              - self.propeller.parameters['hub_radius']*1000)
-                             / ((self.propeller.parameters['tip_radius']
-                                 - self.propeller.parameters['hub_radius'])
-                                * 1000)) * self.n_sec)
-                
-            ## Orthographic projection to get normalized chord length:
-            # (Der 'element_midpoint' wird auf die Profilsehne projeziert)   
-             
-            # LE-TE = LE + lambda_ * u
-            u = ((trailing_edge - leading_edge)
-                 / np.linalg.norm(trailing_edge - leading_edge))
+            midpoints[idx] = [self.mapdl.parameters['mp_x'],
+                              self.mapdl.parameters['mp_y'],
+                              self.mapdl.parameters['mp_z']]
             
-            lambda_ = (np.dot(element_midpoint - leading_edge, u)
-                       / np.dot(u, u))
-                
-            projected_point = leading_edge + lambda_ * u
+            # Element area
+            element_area[idx] = self.mapdl.get('a', 'elem', element, 'area')
+        
+        # Spanwise extent of the elements (Y coordinates of the nodes)
+        nnum = np.array(self.mapdl.mesh.nnum, dtype=int)
+        node_y = np.array(self.mapdl.mesh.nodes)[:, 1]
+        
+        elem_dy = np.zeros(len(elements))
+        for idx, element in enumerate(elements):
+            nodes = np.array(self.mapdl.mesh.elem[element-1][10:], dtype=int)
+            nloc = node_y[np.searchsorted(nnum, nodes)]
+            elem_dy[idx] = abs(nloc.max() - nloc.min())
+        
+        ## Stage 2: Radial stations
+        element_station, station_y = \
+            self.__group_stations__(midpoints[:, 1], station_tolerance)
+        
+        n_stations = len(station_y)
+        station_rel_radius = (station_y
+                              / (self.propeller.parameters['tip_radius']
+                                 * 1000))
+        
+        leading_edge = np.zeros([n_stations, 3])
+        trailing_edge = np.zeros([n_stations, 3])
+        chordlength = np.zeros(n_stations)
+        thickness_lines = []
+        camber_lines = []
+        
+        for station in range(n_stations):
+            # Leading and trailing edge coords:
+            leading_edge[station], trailing_edge[station], \
+                chordlength[station] = self.__get_edges__(station_y[station])
             
-            ## Normalized chord length: 
-            rel_chord = (np.linalg.norm(projected_point - leading_edge)
-                              / chordlength)
-                
-            ## Normalized radial station:
-            rel_radius = (element_midpoint[1]
-                          / (self.propeller.parameters['tip_radius'] * 1000))
-                            
-            ## Element height:
-            # Symmetric airfoil coords:
-            _, profiltropfen, camber = self.propeller.get_airfoil(rel_radius)
+            # Symmetric airfoil and camber line coords, only the top half of
+            # the points, sorted by X:
+            _, profiltropfen, camber = \
+                self.propeller.get_airfoil(station_rel_radius[station])
             
-            # Use only the top half of the points
             profiltropfen = profiltropfen.iloc[:profiltropfen['X'].idxmin(), :]
-            
-            # Append rel_chord to the DataFrame and interpolate its value
-            empty_frame = pd.DataFrame([rel_chord], columns=['X'])
-            empty_frame['Y'] = np.nan
-            profiltropfen = profiltropfen.append(empty_frame)
-            profiltropfen = profiltropfen.sort_values('X')
-            profiltropfen = profiltropfen.interpolate()
-            profiltropfen = profiltropfen.dropna()
-            profiltropfen = profiltropfen.drop_duplicates(keep='first')
-            
-            # Camberline calculation for SECOFFSET:
             camber = camber.iloc[:camber['X'].idxmin(), :]
-
-            camber = camber.append(empty_frame)
-            camber = camber.sort_values('X')
-            camber = camber.interpolate()
-            camber = camber.dropna()
-            camber = camber.drop_duplicates(keep='first')
-            
-            # Element height:
-            elem_height = 2 * \
-                np.array(profiltropfen[profiltropfen['X']==rel_chord]['Y'])[0]
-                
-            try:    
-                secoffset = -1 * np.array(camber[camber['X'] == rel_chord]['Y'])[0]
-            except:
-                secoffset = 0    
-            
-            ## Element area:
-            element_area = self.mapdl.get('a', 'elem', element, 'area')
-            
-            ## Element state (contains: Cl, Cd, alpha, Re, both Cps, Cf):
-            elem_state = self.propeller.state(rel_chord, rel_radius)
-            
-            ## Circular velocity of the Elements radial position:
-            # Get the highest rpm in Loadcases
-            f_max = max([float(i[1]['single_values']['rpm']) 
-                         for i in self.propeller.loadcases]) / 60
-            
-            v_circ = 2 * pi * element_midpoint[1] * f_max
-            
-            ## Density of Air:
-            rho = self.propeller.loadcases[0][1]['single_values']['rho(kg/m3)']
-            rho = rho * 1e-12 # convert to tonne/mm^3
-            
-            ## Get the elements air pressure:
-            # P = Cp * q
-            elem_pressure = - ((elem_state['Cp_suc'] - elem_state['Cp_pres']) 
-                               * (rho/2) 
-                               * v_circ**2)
-            
-            ## Element viscous drag: ### Todo: Bug? x/y vertauschen
-            # Y coordinates of the elements nodes
-            nloc = [self.mapdl.get('nloc','node',node,'loc','y') 
-                    for node in self.mapdl.mesh.elem[element-1][10:]]
-            # Normalized average X dimensions:
-            elem_dx = ((element_area / abs(max(nloc)-min(nloc)))
-                             / chordlength)
-            
-            # Element viscous drag:
-            visc_drag = ((elem_state['Cf'] * elem_dx)
-                         * element_area
-                         * (rho/2) 
-                         * v_circ**2)
-            
-            # Total Drag
-            
-            drag = elem_state['Cd'] * (rho/2) * v_circ**2 * element_area
-                        
-            ## Angle ot attack
-            # in rad:
-            alpha = np.deg2rad(elem_state['alpha'])
-            # vectorial:
-            aoa = np.array([1,0,(np.cos(alpha)-u[0])/u[2]])
-            aoa = aoa/np.linalg.norm(aoa)
-            
-            ## Append all the data:
-            alpha_vector.append(aoa)
-            
-            chord_vector.append(u)       
             
-            data_array.append([int(element),
-                               int(n_sec),
-                               np.round(element_midpoint[0],3),
-                               np.round(element_midpoint[1],3),
-                               np.round(element_midpoint[2],3),
-                               np.round(rel_chord,3),
-                               np.round(chordlength,3),
-                               np.round(rel_radius,4),
-                               np.round(elem_height*chordlength,3),
-                               np.round(secoffset*chordlength,3),
-                               np.round(element_area,3),
-                               np.round(elem_state['Cp_suc'],3),
-                               np.round(elem_state['Cp_pres'],3),
-                               np.round(v_circ,3),
-                               elem_pressure,
-                               elem_state['Cl'],
-                               elem_state['Cd'],
-                               elem_state['Cf'],
-                               elem_state['Cf'] * elem_dx,
-                               visc_drag,
-                               drag,
-                               elem_state['alpha'],
-                               ])
+            thickness_lines.append(profiltropfen.sort_values('X'))
+            camber_lines.append(camber.sort_values('X'))
             
+        ## Stage 3: Broadcast onto the elements
+        le = leading_edge[element_station]
+        te = trailing_edge[element_station]
+        chord = chordlength[element_station]
         
-        data_array = np.array(data_array, dtype=object)
+        ## Get section of element:
+        n_sec = np.floor(((np.round(midpoints[:, 1], 0) 
+                          - self.propeller.parameters['hub_radius']*1000)
+                         / ((self.propeller.parameters['tip_radius']
+                             - self.propeller.parameters['hub_radius'])
+                            * 1000)) * self.n_sec)
+        
+        ## Orthographic projection to get normalized chord length:
+        # (Der 'element_midpoint' wird auf die Profilsehne projeziert)   
+         
+        # LE-TE = LE + lambda_ * u
+        u = (te - le) / np.linalg.norm(te - le, axis=1)[:, None]
+        
+        lambda_ = (np.sum((midpoints - le) * u, axis=1)
+                   / np.sum(u * u, axis=1))
+        
+        projected_point = le + lambda_[:, None] * u
+        
+        ## Normalized chord length: 
+        rel_chord = np.linalg.norm(projected_point - le, axis=1) / chord
+        
+        ## Normalized radial station:
+        rel_radius = (midpoints[:, 1]
+                      / (self.propeller.parameters['tip_radius'] * 1000))
+        
+        ## Element height and offset:
+        elem_height = np.zeros(len(elements))
+        secoffset = np.zeros(len(elements))
+        
+        for station in range(n_stations):
+            mask = element_station == station
+            x = rel_chord[mask]
             
-        df = pd.DataFrame(data_array,
-                          index=data_array[:,0],
-                          columns=['Element Number',
-                                   'Section Number',
-                                   'Midpoint X',
-                                   'Midpoint Y',
-                                   'Midpoint Z',
-                                   'Relative Chord',
-                                   'Chordlength',
-                                   'Relative Radius',
-                                   'Element height',
-                                   'Element offset',
-                                   'Element area',
-                                   'Cp_suc',
-                                   'Cp_pres',
-                                   'Circular velocity',
-                                   'Pressure by Lift',
-                                   'Cl',
-                                   'Cd',
-                                   'Cf',
-                                   'Cf*dx',
-                                   'Viscous Drag',
-                                   'Total Drag',
-                                   'alpha',
-                                   ])
+            elem_height[mask] = 2 * np.interp(x, 
+                                              thickness_lines[station]['X'],
+                                              thickness_lines[station]['Y'])
+            secoffset[mask] = -1 * np.interp(x,
+                                             camber_lines[station]['X'],
+                                             camber_lines[station]['Y'])
+        
+        ## Element viscous drag: ### Todo: Bug? x/y vertauschen
+        # Normalized average X dimensions:
+        elem_dx = (element_area / elem_dy) / chord
+        
+        ## Collect the geometry data, the loads follow in 
+        ## __calc_element_loads__():
+        df = pd.DataFrame({'Element Number': elements,
+                           'Section Number': n_sec.astype(int),
+                           'Midpoint X': np.round(midpoints[:, 0],3),
+                           'Midpoint Y': np.round(midpoints[:, 1],3),
+                           'Midpoint Z': np.round(midpoints[:, 2],3),
+                           'Relative Chord': np.round(rel_chord,3),
+                           'Chordlength': np.round(chord,3),
+                           'Relative Radius': np.round(rel_radius,4),
+                           'Element height': np.round(elem_height*chord,3),
+                           'Element offset': np.round(secoffset*chord,3),
+                           'Element area': np.round(element_area,3),
+                           },
+                          index=elements)
             
         self.__element_data = df
-        self.__element_chord_vector = chord_vector
-        self.__element_aoa_vector = alpha_vector
+        self.__element_section = None
+        self.__element_chord_vector = list(u)
+        self.__element_station = element_station
+        self.__stations = {'Midpoint Y': station_y,
+                           'Relative Radius': station_rel_radius,
+                           'Leading edge': leading_edge,
+                           'Trailing edge': trailing_edge,
+                           'Chordlength': chordlength,
+                           }
+        self.__element_geometry = {'midpoints': midpoints,
+                                   'rel_chord': rel_chord,
+                                   'chord_vector': u,
+                                   'area': element_area,
+                                   'dx': elem_dx,
+                                   }
+        self.__element_states = None
+        self.__station_cl = None
+        self.__edge_nodes = None
+        
+        self.__calc_element_loads__(pool=pool)
+        
+    def __calc_element_loads__(self, pool=None, stations=None):
+        """
+        Maps the aerodynamic loads of the propeller onto the elements, using
+        the element to station mapping of __calc_element_data__().
+        
+        The aerodynamic states (Cl, Cd, alpha, Cp, Cf) are only evaluated 
+        for the elements of the given stations, all other elements keep 
+        their previous states. Pressures and drag are updated for all 
+        elements.
+
+        Parameters
+        ----------
+        pool : XfoilPool, optional
+            Running XfoilPool to compute the station states concurrently.
+            The default is None.
+        stations : np.array, optional
+            Indices of the stations to re-evaluate. The default is None 
+            (all stations).
+        
+        """
+        geometry = self.__element_geometry
+        element_station = self.__element_station
+        station_rel_radius = self.__stations['Relative Radius']
+        midpoints = geometry['midpoints']
+        rel_chord = geometry['rel_chord']
+        u = geometry['chord_vector']
+        n_elements = len(rel_chord)
+        
+        station_cl = self.__calc_station_cl__()
+        
+        if self.__element_states is None or stations is None:
+            stations = None
+            mask = np.ones(n_elements, dtype=bool)
+            self.__element_states = {key: np.zeros(n_elements) for key in 
+                                     ['Cl', 'Cd', 'alpha', 'Cp_suc', 
+                                      'Cp_pres', 'Cf']}
+        else:
+            mask = np.isin(element_station, stations)
+        
+        ## State at the relative chord (XFOIL runs once per station):
+        if mask.any():
+            states = self.propeller.states(
+                rel_chord[mask], station_rel_radius[element_station[mask]],
+                pool=pool)
+            for key in self.__element_states:
+                self.__element_states[key][mask] = states[key].to_numpy()
+        
+        # CL baseline of the re-evaluated stations only, so a slow drift of
+        # the other stations adds up until it exceeds the tolerance
+        if stations is None:
+            self.__station_cl = station_cl
+        else:
+            self.__station_cl[stations] = station_cl[stations]
+        
+        Cl, Cd, alpha, Cp_suc, Cp_pres, Cf = \
+            [self.__element_states[key] 
+             for key in ['Cl', 'Cd', 'alpha', 'Cp_suc', 'Cp_pres', 'Cf']]
+            
+        ## Circular velocity of the Elements radial position:
+        # Get the highest rpm in Loadcases
+        f_max = max([float(i[1]['single_values']['rpm']) 
+                     for i in self.propeller.loadcases]) / 60
+        
+        v_circ = 2 * pi * midpoints[:, 1] * f_max
+        
+        ## Density of Air:
+        rho = self.propeller.loadcases[0][1]['single_values']['rho(kg/m3)']
+        rho = rho * 1e-12 # convert to tonne/mm^3
+        
+        ## Get the elements air pressure:
+        # P = Cp * q
+        elem_pressure = - ((Cp_suc - Cp_pres) * (rho/2) * v_circ**2)
+        
+        # Element viscous drag:
+        visc_drag = ((Cf * geometry['dx']) * geometry['area'] 
+                     * (rho/2) * v_circ**2)
+        
+        # Total Drag
+        drag = Cd * (rho/2) * v_circ**2 * geometry['area']
+                    
+        ## Angle ot attack
+        # in rad:
+        alpha_rad = np.deg2rad(alpha)
+        # vectorial:
+        aoa = np.array([np.ones(n_elements),
+                        np.zeros(n_elements),
+                        (np.cos(alpha_rad) - u[:, 0]) / u[:, 2]]).T
+        aoa = aoa / np.linalg.norm(aoa, axis=1)[:, None]
+        
+        ## Collect all the data:
+        df = self.__element_data
+        df['Cp_suc'] = np.round(Cp_suc,3)
+        df['Cp_pres'] = np.round(Cp_pres,3)
+        df['Circular velocity'] = np.round(v_circ,3)
+        df['Pressure by Lift'] = elem_pressure
+        df['Cl'] = Cl
+        df['Cd'] = Cd
+        df['Cf'] = Cf
+        df['Cf*dx'] = Cf * geometry['dx']
+        df['Viscous Drag'] = visc_drag
+        df['Total Drag'] = drag
+        df['alpha'] = alpha
+        
+        self.__element_aoa_vector = list(aoa)
+        
+    def __calc_station_cl__(self):
+        """Returns the envelope lift coefficient of every station."""
+        
+        oper = self.propeller.load_envelope['oper'].sort_values(['r/R'])
+        
+        return np.interp(self.__stations['Relative Radius'], 
+                         oper['r/R'], oper['CL'])
         
     def __define_and_mesh_geometry__():
         """
@@ -312,6 +412,40 @@ class Femodel:
         te = np.array(intersection(te_num))
         
         return le, te, np.linalg.norm(te - le)
+    
+    @staticmethod
+    def __group_stations__(y, tolerance):
+        """
+        Group the elements into radial stations. Neighbouring midpoints 
+        closer than the tolerance belong to the same station.
+
+        Parameters
+        ----------
+        y : np.array
+            Spanwise coordinates of the element midpoints.
+        tolerance : float
+            Maximum spanwise distance within one station.
+
+        Returns
+        -------
+        element_station : np.array
+            Station index of every element.
+        station_y : np.array
+            Mean spanwise coordinate of every station.
+
+        """
+        order = np.argsort(y)
+        
+        sorted_station = np.concatenate(
+            [[0], np.cumsum(np.diff(y[order]) > tolerance)])
+        
+        element_station = np.empty(len(y), dtype=int)
+        element_station[order] = sorted_station
+        
+        station_y = (np.bincount(element_station, weights=y)
+                     / np.bincount(element_station))
+        
+        return element_station, station_y
         
 # %% Public Methods
 
@@ -333,6 +467,86 @@ class Femodel:
         """
         pass
 
+    def update_element_loads(self, pool=None, cl_tolerance=1e-3):
+        """
+        Maps changed propeller loads onto the elements (e.g. after 
+        Propeller.calc_loads() with a new geometry). Only the stations whose
+        lift coefficient changed by more than cl_tolerance since their last
+        evaluation are re-evaluated.
+
+        Parameters
+        ----------
+        pool : XfoilPool, optional
+            Running XfoilPool to compute the station states concurrently.
+            The default is None.
+        cl_tolerance : float, optional
+            The default is 1e-3.
+
+        Returns
+        -------
+        stations : np.array
+            Indices of the re-evaluated stations.
+
+        """
+        if self.__element_geometry is None:
+            raise RuntimeError('No element mapping: run pre_processing() '
+                               'first')
+        
+        stations = np.flatnonzero(np.abs(self.__calc_station_cl__() 
+                                         - self.__station_cl) > cl_tolerance)
+        
+        self.__calc_element_loads__(pool=pool, stations=stations)
+        
+        return stations
+    
+    def station_twist(self):
+        """
+        Returns the elastic twist of the radial stations from the current 
+        result: the rotation of the chord line (nodes next to the leading 
+        and trailing edge) in the X-Z plane. Positive values increase the 
+        blade angle of the propeller geometry.
+
+        Returns
+        -------
+        twist : np.array
+            Twist of every station [deg].
+
+        """
+        if self.__stations is None:
+            raise RuntimeError('No element mapping: run pre_processing() '
+                               'first')
+        
+        nnum, disp = self.mapdl.result.nodal_displacement(0)
+        nnum = np.array(nnum, dtype=int)
+        disp = np.array(disp)[:, :3]
+        nodes = np.array(self.mapdl.mesh.nodes)[:, :3]
+        
+        if self.__edge_nodes is None:
+            # Mesh node next to every leading and trailing edge point
+            self.__edge_nodes = [
+                np.array([np.argmin(np.linalg.norm(nodes - point, axis=1))
+                          for point in points])
+                for points in [self.__stations['Leading edge'],
+                               self.__stations['Trailing edge']]]
+        
+        mesh_nnum = np.array(self.mapdl.mesh.nnum, dtype=int)
+        le, te = [nodes[idx] for idx in self.__edge_nodes]
+        u_le, u_te = [disp[np.searchsorted(nnum, mesh_nnum[idx])] 
+                      for idx in self.__edge_nodes]
+        
+        chord = te - le
+        deformed = chord + u_te - u_le
+        
+        def angle(vector):
+            return np.degrees(np.arctan(vector[:, 2] / vector[:, 0]))
+        
+        # Orientation of the mesh relative to the blade angles
+        beta = np.interp(self.__stations['Relative Radius'],
+                         *np.array(self.propeller.geometry)[:, [0, 2]].T)
+        sign = 1 if np.sum(angle(chord) * beta) >= 0 else -1
+        
+        return sign * (angle(deformed) - angle(chord))
+        
     def clear(self):
         """Resets the MAPDL Session. """
         
@@ -347,7 +561,7 @@ class Femodel:
         """
         pass        
 
-    def pre_processing(self):
+    def pre_processing(self, pool=None):
         """
         This method does all preprocessing, except for the geometry variation.
         It executes the following methods in sequence:
@@ -357,9 +571,14 @@ class Femodel:
 
         After that, it writes the model to a .cdb file and clears it.
 
+        Parameters
+        ----------
+        pool : XfoilPool, optional
+            Running XfoilPool to run XFOIL concurrently. The default is None.
+
         """
         self.__define_and_mesh_geometry__()
-        self.__calc_element_data__()
+        self.__calc_element_data__(pool=pool)
         self.__apply_loads__()
         
         self.mapdl.allsel('all')
@@ -403,9 +622,53 @@ class Femodel:
     @element_data.setter
     def element_data(self, data):
         self.__element_data = data
+        self.__element_section = None
     
+    @property
+    def element_section(self):
+        """
+        The optimization section index of every element (same order as 
+        element_data).
+
+        Returns
+        -------
+        element_section : np.array
+
+        """
+        if self.__element_section is None:
+            self.__element_section = \
+                self.__element_data['Section Number'].to_numpy(dtype=int)
+        
+        return self.__element_section
     
     
+    
+    @property
+    def element_station(self):
+        """
+        The radial station index of every element (same order as 
+        element_data).
+
+        Returns
+        -------
+        element_station : np.array
+
+        """
+        return self.__element_station
+    
+    @property
+    def stations(self):
+        """
+        Data of the radial stations: Midpoint Y, Relative Radius, 
+        Leading edge, Trailing edge and Chordlength.
+
+        Returns
+        -------
+        stations : Dict
+
+        """
+        return self.__stations
+    
     @property
     def element_aoa_vector(self):
         """
@@ -44,84 +44,42 @@ class Threepartmodel(PropellerModel):
         # self.mapdl.domega('','',-6540/(2 * 1.363))
         # print('domega: ' + str(omega_z))
                 
-        # Vary Geometry
-        for element in self.element_data['Element Number']:
-            self.mapdl.sectype(element,'shell','','')
-            
-            sec = int(self.element_data['Section Number'][element])
-            el_height = self.element_data['Element height'][element]
-            
-            layer_thickness = 0.185
-            min_thickness = layer_thickness * 2
-            core = el_height - min_thickness
-            
-            with self.mapdl.chain_commands:
-                self.mapdl.secdata(min_thickness/2,
-                                  self.materials['flaxpreg'].number,
-                                  global_vars[0],
-                                  3)           
-                if core > 0:
-                    height_balsa = core * (1 - args[sec][0])
-                    
-                    if height_balsa < 1:
-                        for i in range(2):
-                            self.mapdl.secdata(core / 2,
-                                               self.materials['flaxpreg'].number,
-                                               global_vars[0],
-                                               3)
-                    
-                    else:
-                        self.mapdl.secdata((core
-                                            * args[sec][0] 
-                                            * args[sec][1]),
-                                           self.materials['flaxpreg'].number,
-                                           global_vars[0],
-                                           3)                    
-                        self.mapdl.secdata((core
-                                            * (1 - args[sec][0])),
-                                           self.materials['balsa'].number,
-                                           global_vars[1],
-                                           3)      
-                        self.mapdl.secdata((core
-                                            * args[sec][0] 
-                                            * (1 - args[sec][1])),
-                                           self.materials['flaxpreg'].number,
-                                           global_vars[0],
-                                           3)
-                
-                self.mapdl.secdata(min_thickness/2,
-                                  self.materials['flaxpreg'].number,
-                                  global_vars[0],
-                                  3) 
-                
-                self.mapdl.emodif(element, 'secnum', element)
-                        
-        self.mapdl.allsel('all')
+        # Vary Geometry: layup of all elements at once
+        # (Layers: face, core flaxpreg, balsa, core flaxpreg, face)
+        sec = self.element_data['Section Number'].to_numpy(dtype=int)
+        el_height = self.element_data['Element height'].to_numpy()
+        args = np.array(args, dtype=float)[sec]
         
-    def evaluate(self, x):
-        """
-        This method translates the rather confusing design variable list 
-        from the optimizer into a more comprehensible format which is passed
-        to the change_design_variables() method.
+        layer_thickness = 0.185
+        min_thickness = layer_thickness * 2
+        core = el_height - min_thickness
+        height_balsa = core * (1 - args[:, 0])
         
-        Then, the model is solved, the database is cleared, 
-        and the post-processing results are returned.
+        thickness = np.column_stack([np.full(len(core), min_thickness/2),
+                                     core * args[:, 0] * args[:, 1],
+                                     core * (1 - args[:, 0]),
+                                     core * args[:, 0] * (1 - args[:, 1]),
+                                     np.full(len(core), min_thickness/2)])
         
-
-        Parameters
-        ----------
-        x : list
-            The design variables list coming from the Optimizer.
-
-        Returns
-        -------
-        M_tot : float
-            The propeller blade mass in [tonne].
-        I_fib_fail : list
-            The Puck fiber failure criterion.
-        I_mat_fail : list
-            The Puck inter-fiber failure criterion.
-        """
+        # Thin balsa: two flaxpreg core layers instead
+        thin = (core > 0) & (height_balsa < 1)
+        thickness[thin, 1:3] = core[thin, None] / 2
+        thickness[thin, 3] = np.nan
+        # No core
+        thickness[core <= 0, 1:4] = np.nan
+        
+        material = np.full(thickness.shape, 
+                           self.materials['flaxpreg'].number)
+        material[~thin, 2] = self.materials['balsa'].number
+        angle = np.full(thickness.shape, float(global_vars[0]))
+        angle[~thin, 2] = global_vars[1]
+        
+        self.__write_sections__(thickness, material, angle)
+                        
+        self.mapdl.allsel('all')
+        
+    def __split_design_variables__(self, x):
+        """Splits x into the global variables and the section variables."""
         
         global_vars = x[1:3]
         
@@ -129,14 +87,5 @@ class Threepartmodel(PropellerModel):
         for section in range(self.n_sec):
             x1 = 1 + len(global_vars) + section * 2
             args.append(x[x1:(x1+2)])
-        
-        # Convert input for __change_design_variables__() method
-        self.cdread()
-        self.change_design_variables(global_vars, *args)
-        self.__solve__()
-        m, I_f, I_m = self.post_processing()
-        self.clear()
-        
-        g = list(np.array(I_f+I_m))    
-        
-        return  m*1e6, g, []
\ No newline at end of file
+            
+        return global_vars, args
@@ -2,16 +2,34 @@
 
 # Third-party imports
 from math import pi
+import time
 import numpy as np
+import pandas as pd
 
 # Local imports
-from util_mapdl.post_functions import fc_puck
+from util_mapdl import prep_functions
+from util_mapdl import post_functions
+from util_mapdl.result_reader import ResultReader
 from .femodel import Femodel
 
 # %%
 
 
 class PropellerModel(Femodel):
+    
+    # Timing and convergence of the last coupled_evaluate() (DataFrame)
+    coupling_history = None
+    
+    # APDL command files of __apply_loads__() and __write_sections__(), in
+    # the working directory of MAPDL (see prep_functions.working_file())
+    __load_filename = '_ansys_loads.inp'
+    __section_filename = '_ansys_sections.inp'
+    
+    # Maximum number of layers, material and angle of every MAPDL layer 
+    # (absent layers removed, 0 = no layer) of the last __write_sections__()
+    __n_layers = None
+    __layer_material = None
+    __layer_angle = None
         
     def __define_and_mesh_geometry__(self):
         """
@@ -90,7 +108,9 @@ class PropellerModel(Femodel):
                         
     def __apply_loads__(self):
         """
-        The Load application.
+        The Load application. The loads of all elements are assembled in 
+        NumPy and read by MAPDL from one command file (see 
+        util_mapdl.prep_functions.write_load_file()).
 
         """
         # Read ANSYS Input file (Do not change!)
@@ -99,26 +119,26 @@ class PropellerModel(Femodel):
         self.mapdl.fcum('add')
         self.mapdl.allsel('all')
         
-        # Vary Geometry
+        elements = self.element_data['Element Number'].to_numpy(dtype=int)
+        pressure = self.element_data['Pressure by Lift'].to_numpy()
+        drag = self.element_data['Viscous Drag'].to_numpy()
+        aoa = np.array(self.element_aoa_vector)[elements - 1]
         
+        # Viscous drag, distributed to the element's nodes
         nodes_per_elem = len(self.mapdl.mesh.elem[1][10:])
-        
-        for element in self.element_data['Element Number']:            
-            # assign lift
-            self.mapdl.sfe(element, '', 'pres', 1,
-                           -1 * self.element_data['Pressure by Lift'][element])
-            
-            # assign drag (distributed to the element's nodes)
-            for node in self.mapdl.mesh.elem[int(element-1)][10:]:
-                self.mapdl.f(node, 'fx', 
-                            self.element_aoa_vector[int(element-1)][0]
-                            * self.element_data['Viscous Drag'][element]
-                            / nodes_per_elem)
-                
-                self.mapdl.f(node, 'fz',
-                            self.element_aoa_vector[int(element-1)][2]
-                            * self.element_data['Viscous Drag'][element]
-                            / nodes_per_elem)
+        nodes, forces = prep_functions.distribute_to_nodes(
+            [self.mapdl.mesh.elem[element - 1][10:] for element in elements],
+            aoa[:, [0, 2]] * drag[:, None],
+            nodes_per_elem)
+        
+        # Lift as pressure on face 1, drag as nodal forces. The command 
+        # file is written to the working directory of this MAPDL instance
+        with prep_functions.working_file(self.mapdl, 
+                                         self.__load_filename) as filename:
+            prep_functions.write_load_file(filename,
+                                           elements, -1 * pressure,
+                                           nodes, forces, labels=('FX', 'FZ'))
+            prep_functions.read_input_file(self.mapdl, filename)
             
         self.mapdl.omega(0,0,(max([float(i[1]['single_values']['rpm']) 
                                   for i in self.propeller.loadcases]) 
@@ -145,54 +165,74 @@ class PropellerModel(Femodel):
         self.mapdl.prep7()
         # self.mapdl.cdread('all', ansys_input_filename, 'cdb')
                 
-        # Vary Geometry
-        for element in self.element_data['Element Number']:
-            self.mapdl.sectype(element,'shell','','')
-            # self.mapdl.secoffset('user',
-            #                      self.element_data['Element offset'][element])
-            
-            sec = int(self.element_data['Section Number'][element])
-            el_height = self.element_data['Element height'][element]
-            core = el_height - args[sec][0]
-            
-            if args[sec][0] > el_height:
-                for index in [0,1,5,6]:
-                    self.mapdl.secdata(args[sec][0]/4,
-                                       self.materials['flaxpreg'].number,
-                                       global_vars[index],
-                                       3)
-            else:
-                for index in [0,1]:
-                    self.mapdl.secdata(args[sec][0]/4,
-                                       self.materials['flaxpreg'].number,
-                                       global_vars[index],
-                                       3)
-                self.mapdl.secdata((core
-                                    * args[sec][1] 
-                                    * args[sec][2]),
-                                   self.materials['flaxpreg'].number,
-                                   global_vars[2],
-                                   3)
-                self.mapdl.secdata((core
-                                    * (1 - args[sec][1])),
-                                   self.materials['balsa'].number,
-                                   global_vars[3],
-                                   3)
-                self.mapdl.secdata((core
-                                    * args[sec][1] 
-                                    * (1 - args[sec][2])),
-                                   self.materials['flaxpreg'].number,
-                                   global_vars[4],
-                                   3)
-                for index in [5,6]:
-                    self.mapdl.secdata(args[sec][0]/4,
-                                       self.materials['flaxpreg'].number,
-                                       global_vars[index],
-                                       3)            
-            
-            self.mapdl.emodif(element, 'secnum', element)
+        # Vary Geometry: layup of all elements at once
+        # (Layers: 4 face layers, inner flaxpreg, balsa, inner flaxpreg)
+        sec = self.element_data['Section Number'].to_numpy(dtype=int)
+        el_height = self.element_data['Element height'].to_numpy()
+        args = np.array(args, dtype=float)[sec]
+        core = el_height - args[:, 0]
+        solid = args[:, 0] > el_height
+        
+        flaxpreg = self.materials['flaxpreg'].number
+        balsa = self.materials['balsa'].number
+        
+        thickness = np.column_stack([args[:, 0]/4,
+                                     args[:, 0]/4,
+                                     core * args[:, 1] * args[:, 2],
+                                     core * (1 - args[:, 1]),
+                                     core * args[:, 1] * (1 - args[:, 2]),
+                                     args[:, 0]/4,
+                                     args[:, 0]/4])
+        thickness[solid, 2:5] = np.nan  # Only the face layers
+        
+        material = np.full(thickness.shape, flaxpreg)
+        material[:, 3] = balsa
+        angle = np.broadcast_to(np.array(global_vars[:7], dtype=float),
+                                thickness.shape)
+        
+        self.__write_sections__(thickness, material, angle)
                         
         self.mapdl.allsel('all')
+    
+    def __write_sections__(self, thickness, material, angle):
+        """
+        Assigns the layered sections to the elements by one APDL command 
+        file, see util_mapdl.prep_functions.write_section_file(). 
+        Elements with the same layup (within the tolerances of the 
+        LayupTable layups) share one section. Without LayupTable 
+        (layups = None, the default), every element gets its own section
+        (section number = element number).
+
+        Parameters
+        ----------
+        thickness, material, angle : np.array
+            Layup of every element (same order as element_data), shape 
+            (elements, layers). Thickness np.nan: no layer.
+
+        """
+        section_ids = None
+        if self.layups is not None:
+            self.layups.clear()
+            section_ids = self.layups.intern(thickness, material, angle)
+            thickness, material, angle = self.layups.layup(section_ids)
+        
+        with prep_functions.working_file(self.mapdl, 
+                                         self.__section_filename) as filename:
+            prep_functions.write_section_file(
+                filename,
+                self.element_data['Element Number'].to_numpy(dtype=int),
+                thickness, material, angle, section_ids)
+            prep_functions.read_input_file(self.mapdl, filename)
+        
+        empty = np.isnan(thickness)
+        self.__n_layers = int((~empty).sum(axis=1).max())
+        
+        order = np.argsort(empty, axis=1, kind='stable')
+        layer_material = np.where(np.take_along_axis(empty, order, axis=1), 0,
+                                  np.take_along_axis(material, order, axis=1))
+        self.__layer_material = layer_material[:, :self.__n_layers]
+        self.__layer_angle = np.take_along_axis(
+            np.asarray(angle, dtype=float), order, axis=1)[:, :self.__n_layers]
         
     def convergence_study(self, mesh_density):
         output = []
@@ -266,31 +306,159 @@ class PropellerModel(Femodel):
 
         Returns
         -------
-        M_tot : float
-            The propeller blade mass in [tonne].
-        I_fib_fail : list
-            The Puck fiber failure criterion.
-        I_mat_fail : list
-            The Puck inter-fiber failure criterion.
+        m, g, h
+            See __objective__().
         """
         
-        global_vars = x[:7]
-        
-        args = []
-        for section in range(self.n_sec):
-            x1 = len(global_vars) + section * 3
-            args.append(x[x1:(x1+3)])
+        global_vars, args = self.__split_design_variables__(x)
         
         # Convert input for __change_design_variables__() method
         self.cdread()
         self.change_design_variables(global_vars, *args)
         self.__solve__()
-        m, I_f, I_m = self.post_processing()
+        result = self.__objective__()
         self.clear()
         
-        g = list(np.array(I_f+I_m)-1)    
+        return result
+    
+    def __objective__(self):
+        """
+        Returns the optimizer result of the solved model from 
+        post_processing(), used by evaluate() and coupled_evaluate(). 
+        Override it to change the objective or the constraints.
+
+        Returns
+        -------
+        m : float
+            The propeller blade mass in [g].
+        g : list
+            The Puck fiber and inter-fiber failure indices of all sections
+            (failure at 1).
+        h : list
+            Equality constraints (none).
+
+        """
+        m, I_f, I_m = self.post_processing()
+        
+        return m*1e6, list(np.array(I_f+I_m)), []
+        
+    def coupled_evaluate(self, x, relaxation=0.5, tolerance=0.01, 
+                         max_iter=10, cl_tolerance=1e-3, pool=None):
+        """
+        Like evaluate(), but iterates the propeller loads (XROTOR or BEM, 
+        see Propeller.backend) and the MAPDL deflections until the elastic 
+        twist of the blade converges:
+            
+            1. Solve the FE-Model with the current element loads.
+            2. Elastic twist of the stations (station_twist()), relaxed.
+            3. Propeller.calc_loads() with the twisted blade geometry.
+            4. Re-map the loads onto the elements. Only stations with a 
+               changed lift coefficient are re-evaluated 
+               (update_element_loads()).
+        
+        Requires the element mapping of pre_processing() in this session. 
+        The propeller geometry is restored afterwards, the element loads 
+        stay at the coupled state. Timing and convergence of every 
+        iteration are stored in coupling_history.
+
+        Parameters
+        ----------
+        x : list
+            The design variables list coming from the Optimizer.
+        relaxation : float, optional
+            Relaxation factor of the twist update. The default is 0.5.
+        tolerance : float, optional
+            Convergence limit of the twist change [deg]. The default is 
+            0.01.
+        max_iter : int, optional
+            Maximum number of FE solutions. The default is 10.
+        cl_tolerance : float, optional
+            See update_element_loads(). The default is 1e-3.
+        pool : XfoilPool, optional
+            Running XfoilPool for XROTOR and XFOIL runs. The default is None.
+
+        Returns
+        -------
+        Same as evaluate().
+        
+        """
+        global_vars, args = self.__split_design_variables__(x)
+        
+        geometry = np.array(self.propeller.geometry, dtype=float)
+        rel_radius = self.stations['Relative Radius']
+        twist = np.zeros(len(rel_radius))
+        history = []
+        
+        try:
+            for iteration in range(max_iter):
+                begin = time.perf_counter()
+                
+                self.cdread()
+                self.change_design_variables(global_vars, *args)
+                self.__reapply_loads__()
+                self.__solve__()
+                
+                change = self.station_twist() - twist
+                twist = twist + relaxation * change
+                converged = np.max(np.abs(change)) <= tolerance
+                t_fe = time.perf_counter() - begin
+                
+                t_aero, t_states, stations = 0., 0., []
+                if not converged and iteration < max_iter - 1:
+                    twisted = geometry.copy()
+                    twisted[:, 2] += np.interp(geometry[:, 0], rel_radius,
+                                               twist)
+                    self.propeller.geometry = twisted
+                    self.propeller.calc_loads(pool=pool)
+                    t_aero = time.perf_counter() - begin - t_fe
+                    
+                    stations = self.update_element_loads(pool, cl_tolerance)
+                    t_states = time.perf_counter() - begin - t_fe - t_aero
+                
+                history.append({'Iteration': iteration,
+                                'Converged': converged,
+                                'Max. twist change': np.max(np.abs(change)),
+                                'Tip twist': twist[-1],
+                                'Changed stations': len(stations),
+                                'FE time': t_fe,
+                                'Loads time': t_aero,
+                                'States time': t_states,
+                                'Total time': (time.perf_counter() 
+                                               - begin),
+                                })
+                
+                if converged or iteration == max_iter - 1:
+                    break
+                self.clear()
+            
+            result = self.__objective__()
+            self.clear()
+        finally:
+            self.propeller.geometry = geometry
+            self.coupling_history = pd.DataFrame(history)
+        
+        return result
+    
+    def __reapply_loads__(self):
+        """Replaces the loads of the .cdb file by the current element_data."""
+        
+        self.mapdl.prep7()
+        self.mapdl.sfedele('all', 'all', 'all')
+        self.mapdl.fdele('all', 'all')
+        self.__apply_loads__()
+        self.mapdl.allsel('all')
+    
+    def __split_design_variables__(self, x):
+        """Splits x into the global variables and the section variables."""
+        
+        global_vars = x[:7]
         
-        return  m*1e6, g, []
+        args = []
+        for section in range(self.n_sec):
+            x1 = len(global_vars) + section * 3
+            args.append(x[x1:(x1+3)])
+            
+        return global_vars, args
         
     def post_processing(self):
         """
@@ -316,48 +484,180 @@ class PropellerModel(Femodel):
         self.mapdl.fctyp('add','pfib')
         self.mapdl.fctyp('add','pmat')
         
-        I_fib_fail = []
-        I_mat_fail = []
+        # Failure indices of all elements and layers at once, reduced to 
+        # the maximum of every section
+        I_fib, I_mat = post_functions.puck_by_element(self.mapdl, 
+                                                      self.__n_layers)
         
-        # Calculate objective and constraint values        
-        for section in range(self.n_sec):
-            elements = self.element_data[self.element_data['Section Number'] \
-                                         == section]['Element Number']
-            
-            elements = list(elements)
-            
-            elements_to_ignore = []
-
-            self.mapdl.esel('none')
-            for element in elements:
-                if not element in elements_to_ignore:
-                    self.mapdl.esel('a','elem','',element)
-            
-            I_f_loc, I_m_loc = fc_puck(self.mapdl)
-            
-            I_fib_fail.append(I_f_loc)
-            I_mat_fail.append(I_m_loc)
+        rows = self.element_data['Element Number'].to_numpy(dtype=int) - 1
+        
+        I_fib_fail = list(post_functions.section_maxima(
+            I_fib[rows], self.element_section, self.n_sec))
+        I_mat_fail = list(post_functions.section_maxima(
+            I_mat[rows], self.element_section, self.n_sec))
             
         self.mapdl.allsel('all')
         self.mapdl.get('Blade_Mass','elem','0','mtot','z')
         
         return self.mapdl.parameters['Blade_Mass'], I_fib_fail, I_mat_fail
     
-    def reaction_forces(self):
-        self.mapdl.post1()
+    def result_reader(self, copy_to=None):
+        """
+        Returns a reader of the result file, with element results in the 
+        order of element_data, see util_mapdl.result_reader.ResultReader.
+
+        Parameters
+        ----------
+        copy_to : str, optional
+            Path of a copy of the result file, which is not overwritten by
+            the next solve. The default is None (no copy).
+
+        Returns
+        -------
+        ResultReader
+
+        """
+        return ResultReader.from_mapdl(
+            self.mapdl, self.element_data['Element Number'].to_numpy(dtype=int),
+            copy_to)
+    
+    def puck_failure(self, materials=None, reader=None, **kwargs):
+        """
+        Puck failure evaluated in NumPy from the layer stresses of the 
+        current result, see util_mapdl.post_functions.puck(). Independent 
+        of the FC/FCTYP settings of MAPDL, so several strength datasets can
+        be evaluated for one solve.
+
+        Parameters
+        ----------
+        materials : Dict, optional
+            Material name: Material (or fc dict) with the strengths. The 
+            default is None (self.materials).
+        reader : ResultReader, optional
+            Reads the layer stresses from the result file (see 
+            result_reader()) instead of ETABLE. The default is None.
+        **kwargs
+            Inclination parameters of puck().
+
+        Returns
+        -------
+        I_fib_fail : list
+            The Puck fiber failure criterion of every section.
+        I_mat_fail : list
+            The Puck inter-fiber failure criterion of every section.
+
+        """
+        if materials is None:
+            materials = self.materials
         
-        # self.mapdl.nsel('s','loc','y',50)
-        # nodes = self.mapdl.mesh.nnum
+        # Material number: strengths
+        strengths = {self.materials[key].number: getattr(value, 'fc', value)
+                     for key, value in materials.items()}
         
-        rforces, nnum, dof = self.mapdl.result.nodal_reaction_forces(0)
+        if reader is None:
+            self.mapdl.post1()
+            
+            stresses = post_functions.layer_stresses(self.mapdl, 
+                                                     self.__n_layers)
+            
+            rows = self.element_data['Element Number'].to_numpy(dtype=int) - 1
+            stresses = stresses[rows]
+        else:
+            stresses = post_functions.rotate_stresses(
+                reader.layer_stresses(self.__n_layers), self.__layer_angle)
         
-        rforces_sorted = [[] for i in range(6)]
+        I_fib, I_mat, _ = post_functions.puck_layup(
+            stresses, self.__layer_material, strengths, **kwargs)
         
-        for idx, x in enumerate(rforces):
-            rforces_sorted[int(dof[idx]-1)].append(x)
+        I_fib_fail = list(post_functions.section_maxima(
+            I_fib, self.element_section, self.n_sec))
+        I_mat_fail = list(post_functions.section_maxima(
+            I_mat, self.element_section, self.n_sec))
         
-        fsum = []    
-        for x in rforces_sorted:
-            fsum.append(sum(x))
-            
-        return fsum
\ No newline at end of file
+        return I_fib_fail, I_mat_fail
+    
+    def reaction_forces(self, rnum=0):
+        """
+        Returns
+        -------
+        fsum : list
+            Sum of the reaction forces of every DOF (FX, FY, FZ, MX, MY, 
+            MZ) of result set rnum.
+
+        """
+        self.mapdl.post1()
+        
+        rforces, nnum, dof = self.mapdl.result.nodal_reaction_forces(rnum)
+        
+        return list(post_functions.reaction_resultant(rforces, nnum, dof))
+    
+    def hub_loads(self, reader=None, root=50.):
+        """
+        Resulting reaction loads of every result set (loadcase) about the 
+        root section at the blade axis (y = root), as blade loads in the 
+        units of the XROTOR bend output (see xrotor_root_moments()): 
+        bending (out-of-plane, XROTOR Mz), lead-lag (in-plane, XROTOR Mx) 
+        and torsion moment.
+
+        Parameters
+        ----------
+        reader : ResultReader, optional
+            The default is None (result_reader()).
+        root : float, optional
+            Radius of the root section [mm]. The default is 50.
+
+        Returns
+        -------
+        hub_loads : DataFrame
+            One row per result set.
+
+        """
+        if reader is None:
+            reader = self.result_reader()
+        
+        node_numbers, node_coordinates = reader.node_coordinates()
+        
+        resultants = np.array([
+            post_functions.reaction_resultant(
+                *reader.nodal_reaction_forces(rnum), 
+                node_numbers, node_coordinates, point=(0., root, 0.))
+            for rnum in range(reader.n_results)])
+        
+        # Blade loads = - reactions, [N] and [N-mm] -> [N-m]
+        loads = -resultants
+        
+        return pd.DataFrame({'Fx (N)': loads[:, 0],
+                             'Fy (N)': loads[:, 1],
+                             'Fz (N)': loads[:, 2],
+                             'Bending (N-m)': loads[:, 3] / 1000,
+                             'Lead-lag (N-m)': loads[:, 5] / 1000,
+                             'Torsion (N-m)': loads[:, 4] / 1000})
+    
+    def xrotor_root_moments(self, root=50.):
+        """
+        XROTOR bending moments of every loadcase, interpolated to the root
+        section, to compare with hub_loads().
+
+        Parameters
+        ----------
+        root : float, optional
+            Radius of the root section [mm]. The default is 50.
+
+        Returns
+        -------
+        root_moments : DataFrame
+            One row per loadcase.
+
+        """
+        rel_radius = root / (self.propeller.parameters['tip_radius'] * 1000)
+        
+        moments = np.array([
+            [np.interp(rel_radius, result['bend']['r/R'], 
+                       result['bend'][column])
+             for column in ['Mz', 'Mx']]
+            for _, result in self.propeller.loadcases])
+        
+        return pd.DataFrame({'Bending (N-m)': moments[:, 0],
+                             'Lead-lag (N-m)': moments[:, 1]},
+                            index=[loadcase.name for loadcase, _ 
+                                   in self.propeller.loadcases])
\ No newline at end of file
@@ -20,7 +20,8 @@ import os
 
 # Local imports
 from util_mapdl import Material
-from femodel import Threepartmodel
+from util_loads import ResultCache
+from femodel import Threepartmodel, EvaluationStore
 
 # %% Run ANSYS and instantiate FE-Model
 
@@ -72,6 +73,22 @@ starttime = time.time()
 
 tip_vector = [0, 0.5, 0, 0.5, 0, 0.5, 0, 0.5, 0, 0.5, 0, 0.5]
 
+i_ref = 1.
+
+# Every evaluation is stored, per model (element data incl. loads, 
+# materials, fixed variables); restart() replays the designs that were 
+# already evaluated from the store
+fingerprint = ResultCache.fingerprint(
+    femodel[rank].element_data,
+    {key: [value.mp, value.fc] 
+     for key, value in femodel[rank].materials.items()},
+    tip_vector, n_sec, i_ref, femodel[rank].mesh_density_factor)
+
+checkpoint_path = '/home/y0065120/Dokumente/Leichtwerk/Projects/ALPSO/checkpoints'
+store = EvaluationStore(checkpoint_path, rank=rank, fingerprint=fingerprint,
+                        replay=False)
+
+@store.checkpoint
 def objfunc(x):
     comm = MPI.COMM_WORLD
     
@@ -83,7 +100,6 @@ def objfunc(x):
     f, g, h = femodel[rank].evaluate(x)
         
     g_beta = []
-    i_ref = 1.
     for i_sec in g[1:14]:
         if i_sec >= i_ref:
             g_beta.append(i_sec - x[0])
@@ -154,11 +170,21 @@ alpso.setOption('stopCriteria', 0)
 alpso.setOption('c1',3.5)
 alpso.setOption('c2',0.3)
 alpso.setOption('w2',0.7)
+alpso.setOption('seed', 1)         # Fixed seed: restarts repeat the swarm
 
 
 def coldstart():    
+    store.replay = False
+    alpso(optprob, store_hst=True)
+    print(optprob.solution(0))
+    
+def restart():
+    # Same swarm as coldstart(), evaluated designs come from the store
+    store.replay = True
+    alpso.setOption('filename',alpso_path+filename + '_restart')
     alpso(optprob, store_hst=True)
     print(optprob.solution(0))
+    print(str(store.hits) + ' evaluations replayed from ' + repr(store))
     
 def hotstart():
     alpso.setOption('filename',alpso_path+filename + '_hotstart')
@@ -0,0 +1,12 @@
+# %% Import Libraries and Data
+
+# Third-party imports
+import os
+import sys
+
+# Local imports
+
+# %% The packages are used from the repository root, as in the scripts
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
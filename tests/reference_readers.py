@@ -0,0 +1,75 @@
+"""
+Readers of XFOIL and XROTOR output files as they were before
+util_loads.parsers (pandas.read_fwf with fixed row positions). They are
+the reference of tests/test_parsers.py.
+
+read_polar() sets skip_blank_lines=False. Without it, pandas >= 1.5 skips
+the whitespace-only lines of the polar header, and header=[10] no longer
+points at the 'alpha' line the former reader relied on.
+
+"""
+
+# %% Import Libraries and Data
+
+# Third-party imports
+import pandas as pd
+
+# Local imports
+
+# %%
+
+
+def read_polar(filename):
+    colspecs = [(1, 8), (10, 17), (20, 27), (30, 37), (39, 46),
+                (49, 55), (58, 64), (66, 73), (74, 82)]
+    tabular_data = pd.read_fwf(filename,
+                               colspecs=colspecs,
+                               header=[10],
+                               skiprows=[11],
+                               skip_blank_lines=False)
+    tabular_data.sort_values('alpha', inplace=True)
+    tabular_data.drop_duplicates(keep='first', inplace=True)
+
+    return tabular_data.reset_index()
+
+
+def read_bend_output(filename):
+    colspecs = [(1, 3), (4, 10), (11, 18), (19, 26), (28, 34), (35, 46),
+                (48, 59), (61, 72), (74, 85), (87, 98), (100, 111)]
+
+    tabular_data = pd.read_fwf(filename,
+                               colspecs=colspecs,
+                               header=[1],
+                               skiprows=[2],
+                               nrows=29,)
+
+    return tabular_data
+
+
+def read_oper_output(filename):
+    single_values = {}
+    columns = [[(1, 12), (15, 24)],
+               [(28, 39), (42, 51)],
+               [(54, 65), (69, 78)]]
+
+    for colspec in columns:
+        header = pd.read_fwf(filename,
+                             colspecs=colspec,
+                             header=0,
+                             skiprows=3,
+                             nrows=7,
+                             index_col=0)
+
+        header.columns = ['Value']
+        header.dropna(subset=['Value'], inplace=True)
+        header = header.to_dict()['Value']
+        single_values.update(header)
+
+    colspecs = [(1, 4), (4, 9), (10, 16), (16, 25), (25, 30), (33, 39),
+                (40, 47), (48, 53), (54, 60), (61, 66), (67, 74)]
+
+    tabular_data = pd.read_fwf(filename,
+                               colspecs=colspecs,
+                               header=16)
+
+    return single_values, tabular_data
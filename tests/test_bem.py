@@ -0,0 +1,97 @@
+"""
+Bem: plausibility of the BEM solution, trim to prescribed thrust, and
+results in the form of the XROTOR results.
+
+"""
+
+# %% Import Libraries and Data
+
+# Third-party imports
+import os
+import numpy as np
+import pytest
+
+# Local imports
+from util_loads import Airfoil, Bem, Loadcase, Propeller, Xrotor
+
+# %%
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def propeller():
+    """Two-bladed propeller with the XROTOR characteristics of an airfoil."""
+
+    airfoil = Airfoil('bem', 500000)
+    airfoil.xrotor_characteristics = {'Zero-lift alpha (deg)': -4.,
+                                      'd(Cl)/d(alpha)': 6.28,
+                                      'd(Cl)/d(alpha)@stall': 0.1,
+                                      'Maximum Cl': 1.4,
+                                      'Minimum Cl': -0.3,
+                                      'Minimum Cd': 0.012,
+                                      'Cl at minimum Cd': 0.5,
+                                      'd(Cd)/d(Cl**2)': 0.01,
+                                      'Cm': -0.1}
+
+    propeller = Propeller(2, 0.412, 0.04, backend='bem')
+    propeller.geometry = np.array([[0.121, 0.078, 20.],
+                                   [0.345, 0.149, 14.],
+                                   [0.709, 0.114, 8.],
+                                   [1., 0.066, 6.]])
+    propeller.sections = [[0.121, airfoil], [1., airfoil]]
+
+    return propeller
+
+
+def loadcase(*data, flight_speed=5.):
+    loadcase = Loadcase('bem', flight_speed)
+    loadcase.set_data(*data)
+    return loadcase
+
+
+def test_monotonic_in_rpm():
+    rpm = np.linspace(1000, 4000, 7)
+    results = Bem(propeller()).run([loadcase('rpm', n) for n in rpm])
+
+    thrust, torque = [np.array([result['single_values'][key]
+                                for result in results])
+                      for key in ['thrust(N)', 'torque(N-m)']]
+
+    assert np.all(np.diff(thrust) > 0)
+    assert np.all(np.diff(torque) > 0)
+    assert np.all([np.all(np.diff(result['bend']['Mz'].to_numpy()) < 0)
+                   for result in results])
+
+
+@pytest.mark.parametrize('data', [('thru', 'p'), ('thru', 'r', 2500.),
+                                  ('torq', 'p')])
+def test_trim(data):
+    bem = Bem(propeller())
+    reference = bem.run([loadcase('rpm', 3000.)])[0]['single_values']
+    key = {'thru': 'thrust(N)', 'torq': 'torque(N-m)'}[data[0]]
+
+    result = bem.run([loadcase(data[0], reference[key], *data[1:])])[0]
+
+    assert result['single_values'][key] == pytest.approx(reference[key],
+                                                         rel=1e-3)
+    if data[1] == 'p':
+        assert result['single_values']['rpm'] == pytest.approx(3000.,
+                                                               rel=1e-3)
+    else:
+        assert result['single_values']['rpm'] == 2500.
+
+
+def test_xrotor_form():
+    result = Bem(propeller(), n_stations=12).run([loadcase('rpm', 3000.)])[0]
+    single_values, oper = Xrotor.read_oper_output(
+        os.path.join(DATA, 'xrotor_oper.txt'))
+    bend = Xrotor.read_bend_output(os.path.join(DATA, 'xrotor_bend.txt'))
+
+    assert set(result['single_values']) == set(single_values)
+    assert list(result['oper'].columns) == list(oper.columns)
+    assert list(result['bend'].columns) == list(bend.columns)
+    assert len(result['oper']) == len(result['bend']) == 12
+
+    computed = ['i', 'r/R', 'Mz', 'Mx', 'P']
+    assert not result['bend'][computed].isna().any().any()
+    assert result['bend'].drop(columns=computed).isna().all().all()
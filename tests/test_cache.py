@@ -0,0 +1,93 @@
+"""
+ResultCache: keys, store/load round trip, LRU eviction and atomic
+replacement of entries.
+
+"""
+
+# %% Import Libraries and Data
+
+# Third-party imports
+import os
+import numpy as np
+import pandas as pd
+
+# Local imports
+from util_loads import ResultCache
+
+# %%
+
+
+def test_fingerprint():
+    fingerprint = ResultCache.fingerprint
+
+    assert fingerprint('cp_vs_x', 500000, 0.5) \
+        == fingerprint('cp_vs_x', 500000., np.float32(0.5))
+    assert fingerprint(np.int64(9)) == fingerprint(9.)
+    assert fingerprint(np.arange(3)) == fingerprint(np.array([0., 1., 2.]))
+    assert fingerprint({'a': 1, 'b': [2, 3]}) \
+        == fingerprint({'b': [2., 3.], 'a': 1.})
+
+    assert fingerprint(1) != fingerprint('1')
+    assert fingerprint(1) != fingerprint(True)
+    assert fingerprint([1, 2]) != fingerprint([2, 1])
+    assert fingerprint(np.zeros(4)) != fingerprint(np.zeros((2, 2)))
+    assert fingerprint(pd.DataFrame({'x': [1.]})) \
+        != fingerprint(pd.DataFrame({'y': [1.]}))
+
+
+def test_round_trip(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    polar = pd.DataFrame({'alpha': [-1., 0., 1.], 'CL': [0.2, 0.3, 0.4]},
+                         index=[4, 5, 6])
+    values = {'thrust(N)': np.float64(12.5), 'rpm': 3000, 'name': 'lc 1',
+              'alpha': [1.0, 2.0]}
+
+    key = cache.fingerprint('test', 1)
+    assert cache.load(key) is None
+
+    cache.store(key, {'polar': polar, 'single_values': values})
+    entry = cache.load(key)
+
+    pd.testing.assert_frame_equal(entry['polar'], polar, check_index_type=False)
+    assert entry['single_values'] == {'thrust(N)': 12.5, 'rpm': 3000,
+                                      'name': 'lc 1', 'alpha': [1.0, 2.0]}
+
+
+def test_replace(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    key = cache.fingerprint('test')
+
+    cache.store(key, {'value': {'x': 1}})
+    cache.store(key, {'value': {'x': 2}})
+
+    assert cache.load(key)['value'] == {'x': 2}
+    # Only the entry, no temporary files
+    assert os.listdir(tmp_path) == [key + '.npz']
+
+    with open(cache.filename(key), 'wb') as f:
+        f.write(b'incomplete')
+    assert cache.load(key) is None
+
+
+def test_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    frame = pd.DataFrame({'x': np.random.default_rng(0).random(500)})
+
+    keys = [cache.fingerprint('test', i) for i in range(4)]
+    for i, key in enumerate(keys):
+        cache.store(key, {'frame': frame})
+        os.utime(cache.filename(key), (1000. + i, 1000. + i))
+    entry_size = cache.size / 4
+
+    # Using the oldest entry marks it as recently used
+    assert cache.load(keys[0]) is not None
+
+    cache.max_size = 2.5 * entry_size
+    cache.evict()
+
+    assert [cache.load(key) is not None for key in keys] \
+        == [True, False, False, True]
+    assert cache.size <= cache.max_size
+
+    cache.clear()
+    assert cache.size == 0
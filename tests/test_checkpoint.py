@@ -0,0 +1,90 @@
+"""
+EvaluationStore: evaluations are recorded and replayed after a restart,
+only for the same model fingerprint.
+
+"""
+
+# %% Import Libraries and Data
+
+# Third-party imports
+import os
+
+# Local imports
+from femodel.checkpoint import EvaluationStore
+
+# %%
+
+
+def counting_objfunc(calls, fail=0):
+    def objfunc(x):
+        calls.append(list(x))
+        return sum(x), [x[0] - 1.], fail
+    return objfunc
+
+
+def test_replay_after_restart(tmp_path):
+    calls = []
+    objfunc = EvaluationStore(tmp_path, rank=0).checkpoint(
+        counting_objfunc(calls))
+    assert objfunc([1., 2.]) == (3., [0.], 0)
+
+    # Restart: another rank, the records of all ranks are loaded
+    store = EvaluationStore(tmp_path, rank=1)
+    objfunc = store.checkpoint(counting_objfunc(calls))
+
+    assert len(store) == 1
+    assert objfunc([1., 2.]) == (3., [0.], 0)
+    assert objfunc([1., 3.]) == (4., [0.], 0)
+    assert calls == [[1., 2.], [1., 3.]]
+    assert store.hits == 1
+    assert list(store.history()['f']) == [3., 4.]
+
+
+def test_failed_evaluations_are_repeated(tmp_path):
+    calls = []
+    EvaluationStore(tmp_path).checkpoint(counting_objfunc(calls, 1))([1.])
+    EvaluationStore(tmp_path).checkpoint(counting_objfunc(calls, 1))([1.])
+
+    assert len(calls) == 2
+
+
+def test_fingerprint(tmp_path):
+    calls = []
+    store = EvaluationStore(tmp_path, fingerprint='a' * 64)
+    store.checkpoint(counting_objfunc(calls))([1.])
+
+    assert store.path == os.path.join(tmp_path, 'a' * 16)
+
+    # Another model does not get the results of the first one
+    store = EvaluationStore(tmp_path, fingerprint='b' * 64)
+    store.checkpoint(counting_objfunc(calls))([1.])
+    store = EvaluationStore(tmp_path, fingerprint='a' * 64)
+    store.checkpoint(counting_objfunc(calls))([1.])
+
+    assert len(calls) == 2
+
+
+def test_no_replay(tmp_path):
+    calls = []
+    EvaluationStore(tmp_path).checkpoint(counting_objfunc(calls))([1.])
+
+    store = EvaluationStore(tmp_path, replay=False)
+    store.checkpoint(counting_objfunc(calls))([1.])
+
+    assert len(calls) == 2
+    assert store.hits == 0
+
+
+def test_crashed_last_line(tmp_path):
+    store = EvaluationStore(tmp_path)
+    store.append([1.], 1., [0.])
+    with open(store.filename, 'a') as fp:
+        fp.write('{"x": [2.0], "f"')
+
+    store = EvaluationStore(tmp_path)
+    store.append([3.], 3., [0.])
+
+    store = EvaluationStore(tmp_path)
+    assert len(store) == 2
+    assert store.lookup([3.])['f'] == 3.
+    assert store.lookup([2.]) is None
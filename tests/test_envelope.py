@@ -0,0 +1,78 @@
+"""
+Envelope: element-wise maximum and critical frame of several DataFrames,
+independent of the order the frames are added in.
+
+"""
+
+# %% Import Libraries and Data
+
+# Third-party imports
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+
+# Local imports
+from util_loads import Envelope
+
+# %%
+
+
+def frames():
+    index = [0.2, 0.5, 0.9]
+    return {0: pd.DataFrame({'CL': [0.5, 0.7, np.nan], 'i': [1, 2, 3]},
+                            index=index),
+            1: pd.DataFrame({'CL': [0.6, 0.7, np.nan], 'i': [1, 2, 3]},
+                            index=index),
+            2: pd.DataFrame({'CL': [0.4, 0.2, 0.1], 'i': [1, 5, 3]},
+                            index=index)}
+
+
+def test_maximum():
+    envelope = Envelope()
+    for label, frame in frames().items():
+        envelope.add(frame, label)
+
+    expected = pd.DataFrame({'CL': [0.6, 0.7, 0.1], 'i': [1, 5, 3]},
+                            index=[0.2, 0.5, 0.9])
+
+    pd.testing.assert_frame_equal(envelope.frame(), expected)
+    assert len(envelope) == 3
+    # Ties go to the smaller label, NaN is skipped
+    assert envelope.critical().values.tolist() == [[1, 0], [0, 2], [2, 0]]
+
+
+def test_order():
+    results = []
+    for order in itertools.permutations(frames().items()):
+        envelope = Envelope()
+        for label, frame in order:
+            envelope.add(frame, label)
+        results.append(envelope.critical())
+
+    for critical in results[1:]:
+        pd.testing.assert_frame_equal(critical, results[0])
+
+
+def test_all_nan():
+    frame = pd.DataFrame({'CL': [np.nan]})
+
+    for labels in [('b', 'a'), ('a', 'b')]:
+        envelope = Envelope()
+        for label in labels:
+            envelope.add(frame, label)
+
+        assert np.isnan(envelope.frame()['CL'][0])
+        assert envelope.critical()['CL'][0] == 'a'
+
+
+def test_mismatch():
+    envelope = Envelope()
+    assert envelope.frame() is None and envelope.critical() is None
+
+    envelope.add(frames()[0])
+
+    with pytest.raises(ValueError):
+        envelope.add(frames()[0].iloc[:2])
+    with pytest.raises(ValueError):
+        envelope.add(frames()[0].rename(columns={'CL': 'CD'}))
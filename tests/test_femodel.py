@@ -0,0 +1,81 @@
+"""
+Femodel.update_element_loads(): only stations whose lift coefficient
+changed by more than the tolerance since their last evaluation are
+re-evaluated.
+
+"""
+
+# %% Import Libraries and Data
+
+# Third-party imports
+import numpy as np
+import pandas as pd
+
+# Local imports
+from femodel.femodel import Femodel
+
+# %%
+
+
+class DriftingPropeller:
+    """Propeller stub: envelope CL of two stations, counts the states."""
+
+    def __init__(self):
+        self.cl = np.array([0.5, 0.5])
+        self.evaluated = []
+        self.loadcases = [('lc', {'single_values': {'rpm': 3000.,
+                                                    'rho(kg/m3)': 1.225}})]
+
+    @property
+    def load_envelope(self):
+        return {'oper': pd.DataFrame({'r/R': [0.25, 0.75], 'CL': self.cl})}
+
+    def states(self, rel_chord, rel_radius, pool=None):
+        self.evaluated.append(np.unique(rel_radius))
+        n = len(rel_chord)
+        return pd.DataFrame({key: np.full(n, 0.1) for key in
+                             ['Cl', 'Cd', 'alpha', 'Cp_suc', 'Cp_pres',
+                              'Cf']})
+
+
+def element_model():
+    """Femodel with the element mapping of two stations of two elements."""
+
+    propeller = DriftingPropeller()
+    model = Femodel(None, propeller, n_sec=1)
+
+    model._Femodel__element_data = pd.DataFrame({'Element Number':
+                                                 [1, 2, 3, 4]})
+    model._Femodel__element_station = np.array([0, 0, 1, 1])
+    model._Femodel__stations = {'Relative Radius': np.array([0.25, 0.75])}
+    model._Femodel__element_geometry = {
+        'midpoints': np.array([[0., 100., 0.]] * 2 + [[0., 300., 0.]] * 2),
+        'rel_chord': np.array([0.25, 0.75, 0.25, 0.75]),
+        'chord_vector': np.array([[1., 0., 0.1]] * 4),
+        'area': np.ones(4),
+        'dx': np.ones(4)}
+    model.__calc_element_loads__()
+    propeller.evaluated.clear()
+
+    return model, propeller
+
+
+def test_changed_stations():
+    model, propeller = element_model()
+    propeller.cl = np.array([0.5, 0.6])
+
+    assert list(model.update_element_loads()) == [1]
+    np.testing.assert_allclose(propeller.evaluated, [[0.75]])
+    assert list(model.update_element_loads()) == []
+
+
+def test_slow_drift():
+    model, propeller = element_model()
+
+    # Station 1 drifts by 0.6 times the tolerance per coupling iteration
+    updates = []
+    for iteration in range(1, 6):
+        propeller.cl = np.array([0.5, 0.5 + iteration * 0.6e-3])
+        updates.append(list(model.update_element_loads(cl_tolerance=1e-3)))
+
+    assert updates == [[], [1], [], [1], []]
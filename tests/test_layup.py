@@ -0,0 +1,62 @@
+"""
+LayupTable: equal layups share one section ID, the stored layups are the
+ones that were interned.
+
+"""
+
+# %% Import Libraries and Data
+
+# Third-party imports
+import numpy as np
+
+# Local imports
+from util_mapdl import LayupTable
+
+# %%
+
+
+def test_round_trip():
+    thickness = np.array([[0.185, 0.185, 0.37],
+                          [0.185, 0.185, 0.37],
+                          [0.2123, 0.185, np.nan]])
+    material = np.array([[1, 2, 1], [1, 2, 1], [1, 2, 1]])
+    angle = np.array([[45., -45., 0.], [45., -45., 0.], [12.5, 0., 0.]])
+
+    layups = LayupTable()
+    section_ids = layups.intern(thickness, material, angle)
+
+    assert list(section_ids) == [1, 1, 2]
+    assert len(layups) == 2
+
+    t, m, a = layups.layup(section_ids)
+    np.testing.assert_allclose(t, thickness, rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(m[~np.isnan(thickness)],
+                                  material[~np.isnan(thickness)])
+    np.testing.assert_allclose(a[~np.isnan(thickness)],
+                               angle[~np.isnan(thickness)], atol=1e-12)
+
+
+def test_known_layups_keep_their_id():
+    layups = LayupTable(first_id=10)
+    layups.intern([[0.2, 0.3]], 1, [0., 90.])
+
+    section_ids = layups.intern([[0.1, 0.3], [0.2, 0.3]], 1, [0., 90.])
+
+    assert list(section_ids) == [11, 10]
+
+    layups.clear()
+    assert len(layups) == 0
+    assert list(layups.intern([[0.1, 0.3]], 1, [0., 90.])) == [10]
+
+
+def test_coarse_tolerance():
+    thickness = [[0.185, 0.37], [0.19, 0.36], [0.3, 0.37]]
+
+    assert len(set(LayupTable().intern(thickness, 1, 0.))) == 3
+
+    layups = LayupTable(tolerance=0.05)
+    section_ids = layups.intern(thickness, 1, 0.)
+
+    assert section_ids[0] == section_ids[1] != section_ids[2]
+    np.testing.assert_allclose(layups.layup(section_ids[:1])[0],
+                               [[0.2, 0.35]])
@@ -0,0 +1,107 @@
+"""
+The parsers of util_loads (used by Xfoil and Xrotor) must return the same
+data as the former pandas readers on every XFOIL/ XROTOR output file in
+tests/data and tests/data/captured.
+
+"""
+
+# %% Import Libraries and Data
+
+# Third-party imports
+import glob
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# Local imports
+import reference_readers
+from util_loads import Xfoil, Xrotor, parsers
+
+# %%
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def data_files(pattern):
+    return sorted(glob.glob(os.path.join(DATA, pattern))
+                  + glob.glob(os.path.join(DATA, 'captured', pattern)))
+
+
+def assert_same_frame(new, old):
+    assert list(new.columns) == list(old.columns)
+    assert len(new) == len(old)
+    for column in old.columns:
+        np.testing.assert_allclose(new[column].to_numpy(dtype=float),
+                                   old[column].to_numpy(dtype=float),
+                                   rtol=0, atol=0, err_msg=column)
+
+
+@pytest.mark.parametrize('filename', data_files('*polar*.txt'))
+def test_polar(filename):
+    new = Xfoil.read_polar(filename)
+    old = reference_readers.read_polar(filename).reset_index(drop=True)
+
+    # The former reader sliced the names of the transition columns with
+    # the data colspecs ('p_Xtr' instead of 'Top_Xtr'). They are not used.
+    n_named = list(old.columns).index('CM') + 1
+    assert list(new.columns[:n_named]) == list(old.columns[:n_named])
+    old.columns = new.columns[:len(old.columns)]
+
+    # The former reader sorted with an unstable sort, so the 'index' of a
+    # duplicate point is any of its rows. The new one keeps the first row.
+    assert np.all(np.diff(new['alpha']) > 0)
+    new, old = new.drop(columns='index'), old.drop(columns='index')
+
+    assert_same_frame(new.reset_index(drop=True), old)
+
+
+@pytest.mark.parametrize('filename', data_files('*oper*.txt'))
+def test_oper(filename):
+    single_values, oper = Xrotor.read_oper_output(filename)
+    old_values, old_oper = reference_readers.read_oper_output(filename)
+
+    # The former reader also returned the separator line ('-----') 
+    old_values = {key: float(value) for key, value in old_values.items()
+                  if not key.startswith('---')}
+    
+    assert single_values.keys() == old_values.keys()
+    for key, value in old_values.items():
+        assert single_values[key] == pytest.approx(value), key
+
+    assert_same_frame(oper, old_oper)
+
+
+@pytest.mark.parametrize('filename', data_files('*bend*.txt'))
+def test_bend(filename):
+    assert_same_frame(Xrotor.read_bend_output(filename),
+                      reference_readers.read_bend_output(filename))
+
+
+def test_sources():
+    # Filename, bytes and file-like objects give the same table
+    filename = data_files('*polar*.txt')[0]
+    with open(filename, 'rb') as f:
+        content = f.read()
+
+    tables = [parsers.parse_polar(source) 
+              for source in [filename, content, open(filename)]]
+
+    for table in tables[1:]:
+        assert table.columns == tables[0].columns
+        np.testing.assert_array_equal(table.data, tables[0].data)
+
+
+def test_overflow_field():
+    # Fortran overflow fields are np.nan, the column stays numeric
+    filename = data_files('xfoil_polar.txt')[0]
+    with open(filename) as f:
+        content = f.read()
+    content += ('   4.000   0.7000   0.01000   0.00500  -0.1000   0.9000'
+                '   0.5000********   0.0000\n')
+
+    polar = parsers.parse_polar(content.encode()).to_frame()
+
+    assert np.isnan(polar['Top_Itr'].iloc[-1])
+    assert polar['alpha'].iloc[-1] == 4.
+    assert pd.api.types.is_float_dtype(polar['Top_Itr'])
@@ -0,0 +1,86 @@
+"""
+Propeller.calc_loads() with a pool: the load envelope is updated as the
+results arrive and does not depend on their order.
+
+"""
+
+# %% Import Libraries and Data
+
+# Third-party imports
+import itertools
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+import pytest
+
+# Local imports
+import util_loads.propeller
+from util_loads import Loadcase, Propeller
+
+# %%
+
+
+def loadcase_result(index):
+    """Result of loadcase index, loadcases 0 and 2 are equal (ties)."""
+
+    value = [1., 3., 1.][index]
+    oper = pd.DataFrame({'r/R': [0.5, 1.], 'CL': [value, 0.5]})
+    bend = pd.DataFrame({'r/R': [0.5, 1.], 'Mz': [2 * value, 1.]})
+
+    return {'single_values': {'rpm': 1000. * (index + 1)},
+            'oper': oper, 'bend': bend}
+
+
+class ImmediatePool:
+    """Pool stub: every loadcase is finished on submission."""
+
+    def submit_loadcase(self, propeller, loadcase):
+        future = Future()
+        future.set_result(loadcase_result(int(loadcase.name)))
+        return future
+
+
+def propeller():
+    propeller = Propeller(2, 0.5, 0.05)
+    for index in range(3):
+        propeller.add_loadcase(Loadcase(str(index), 10.))
+    return propeller
+
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.setattr(Propeller, 'cache', None)
+
+
+def test_serial(monkeypatch):
+    serial = propeller()
+    monkeypatch.setattr(serial, 'calc_loadcase',
+                        lambda loadcase: loadcase_result(int(loadcase.name)))
+    serial.calc_loads()
+
+    assert serial.critical_loadcases['oper']['CL'].tolist() == [1, 0]
+
+
+@pytest.mark.parametrize('order', list(itertools.permutations(range(3))))
+def test_arrival_order(order, monkeypatch):
+    pool_propeller = propeller()
+    envelope_sizes = []
+
+    def as_completed(futures):
+        futures = list(futures)
+        for index in order:
+            envelope_sizes.append(
+                len(pool_propeller._Propeller__envelope['oper']))
+            yield futures[index]
+
+    monkeypatch.setattr(util_loads.propeller, 'as_completed', as_completed)
+    pool_propeller.calc_loads(pool=ImmediatePool())
+
+    # Incremental: every result is in the envelope before the next one
+    assert envelope_sizes == [0, 1, 2]
+
+    critical = pool_propeller.critical_loadcases
+    assert critical['oper']['CL'].tolist() == [1, 0]
+    assert critical['bend']['Mz'].tolist() == [1, 0]
+    np.testing.assert_array_equal(pool_propeller.load_envelope['oper']['CL'],
+                                  [3., 0.5])
@@ -0,0 +1,96 @@
+"""
+Puck failure criterion of post_functions: the strengths give failure
+index 1, the inter-fiber failure modes A, B and C are selected by the
+stress state and meet continuously.
+
+"""
+
+# %% Import Libraries and Data
+
+# Third-party imports
+import types
+import numpy as np
+import pytest
+
+# Local imports
+from util_mapdl.post_functions import (puck, puck_layup, rotate_stresses,
+                                       section_maxima)
+
+# %%
+
+FC = {'xten': 1500., 'xcmp': -1200., 'yten': 50., 'ycmp': -200.,
+      'xy': 80.}
+
+
+@pytest.mark.parametrize('stresses, I_fib, I_mat, mode', [
+    ([1500., 0., 0.], 1., 0., 0),
+    ([-1200., 0., 0.], 1., 0., 0),
+    ([0., 50., 0.], 0., 1., 0),
+    ([0., 0., 80.], 0., 1., 0),
+    ([0., -200., 0.], 0., 1., 2),
+    ])
+def test_strengths(stresses, I_fib, I_mat, mode):
+    result = puck(stresses, FC)
+
+    assert result[0] == pytest.approx(I_fib)
+    assert result[1] == pytest.approx(I_mat)
+    assert result[2] == mode
+
+
+def test_modes_b_c():
+    p, s, yc = 0.25, FC['xy'], abs(FC['ycmp'])
+    r_aa = s / (2 * p) * (np.sqrt(1 + 2 * p * yc / s) - 1)
+    t21_c = s * np.sqrt(1 + 2 * p * r_aa / s)
+
+    # Boundary of mode B and C
+    t21 = 60.
+    s2 = t21 * r_aa / t21_c
+    _, I_mat, mode = puck([[0., -s2 * 0.999, t21], [0., -s2 * 1.001, t21]],
+                          FC)
+
+    assert list(mode) == [1, 2]
+    assert I_mat[0] == pytest.approx(I_mat[1], rel=1e-2)
+
+
+def test_compressive_strength_key():
+    fc = dict(FC)
+    fc['cmp'] = fc.pop('xcmp')
+    stresses = np.random.default_rng(0).normal(0, 100, (20, 3))
+
+    for new, old in zip(puck(stresses, fc), puck(stresses, FC)):
+        np.testing.assert_array_equal(new, old)
+
+
+def test_puck_layup():
+    stresses = np.zeros((2, 3, 3))
+    stresses[..., 0] = 750.
+    material = np.array([[1, 2, 0], [2, 1, 0]])
+    materials = {1: types.SimpleNamespace(fc=FC),
+                 2: dict(FC, xten=3000.)}
+
+    I_fib, _, _ = puck_layup(stresses, material, materials)
+
+    np.testing.assert_allclose(I_fib, [[0.5, 0.25, 0.], [0.25, 0.5, 0.]])
+
+
+def test_rotate_stresses():
+    sx, sy, sxy = 100., 20., 5.
+    stresses = [sx, sy, 0., sxy, 0., 0.]
+
+    np.testing.assert_allclose(rotate_stresses(stresses, 0.),
+                               [sx, sy, sxy])
+    np.testing.assert_allclose(rotate_stresses(stresses, 90.),
+                               [sy, sx, -sxy], atol=1e-12)
+
+    # Pure shear is tension/ compression in +- 45 deg
+    np.testing.assert_allclose(rotate_stresses([0., 0., 0., 10., 0., 0.],
+                                               [45., -45.]),
+                               [[10., -10., 0.], [-10., 10., 0.]],
+                               atol=1e-12)
+
+
+def test_section_maxima():
+    values = [[0.1, 0.5], [0.7, 0.2], [0.3, 0.], [0.4, 0.1]]
+
+    np.testing.assert_allclose(section_maxima(values, [0, 0, 2, 2], 4),
+                               [0.7, 0., 0.4, 0.])
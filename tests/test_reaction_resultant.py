@@ -0,0 +1,70 @@
+"""
+post_functions.reaction_resultant() against the former loop of
+PropellerModel.reaction_forces() and a nodal r x F sum.
+
+"""
+
+# %% Import Libraries and Data
+
+# Third-party imports
+import numpy as np
+
+# Local imports
+from util_mapdl.post_functions import reaction_resultant
+
+# %%
+
+
+def reaction_forces():
+    """Random reactions of 20 nodes, not every node has every DOF."""
+
+    rng = np.random.default_rng(1)
+    node_numbers = np.arange(101, 121)
+    node_coordinates = rng.normal(0, 50, (20, 3))
+
+    nnum = np.repeat(node_numbers, 6)
+    dof = np.tile(np.arange(1, 7), 20)
+    keep = rng.random(len(dof)) < 0.7
+    nnum, dof = nnum[keep], dof[keep]
+    rforces = rng.normal(0, 10, len(dof))
+
+    # Coordinates in another order than the reaction forces
+    order = rng.permutation(20)
+
+    return (rforces, nnum, dof, node_numbers[order],
+            node_coordinates[order], dict(zip(node_numbers,
+                                              node_coordinates)))
+
+
+def test_forces():
+    rforces, nnum, dof, _, _, _ = reaction_forces()
+
+    # Former loop
+    rforces_sorted = [[] for i in range(6)]
+    for idx, x in enumerate(rforces):
+        rforces_sorted[int(dof[idx]-1)].append(x)
+    fsum = [sum(x) for x in rforces_sorted]
+
+    np.testing.assert_allclose(reaction_resultant(rforces, nnum, dof), fsum)
+
+
+def test_moments():
+    rforces, nnum, dof, node_numbers, node_coordinates, coordinates \
+        = reaction_forces()
+    point = np.array([0., 50., 0.])
+
+    moment = np.zeros(3)
+    for value, node, direction in zip(rforces, nnum, dof):
+        if direction > 3:
+            moment[direction - 4] += value
+        else:
+            force = np.zeros(3)
+            force[direction - 1] = value
+            moment += np.cross(coordinates[node] - point, force)
+
+    resultant = reaction_resultant(rforces, nnum, dof, node_numbers,
+                                   node_coordinates, point)
+
+    np.testing.assert_allclose(resultant[:3],
+                               reaction_resultant(rforces, nnum, dof)[:3])
+    np.testing.assert_allclose(resultant[3:], moment)
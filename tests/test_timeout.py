@@ -0,0 +1,62 @@
+"""
+Timed out XFOIL jobs: the job reports timed_out, the operating point is
+unconverged (filled with 0) and not cached.
+
+"""
+
+# %% Import Libraries and Data
+
+# Third-party imports
+import os
+import stat
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+
+# Local imports
+from util_loads import Airfoil, ResultCache, Xfoil
+
+# %%
+
+
+@pytest.fixture
+def hanging_xfoil(tmp_path, monkeypatch):
+    """An 'xfoil' on PATH that never writes output, 1 s time limit."""
+
+    executable = tmp_path / 'bin' / 'xfoil'
+    executable.parent.mkdir()
+    executable.write_text('#!/bin/sh\nsleep 60\n')
+    executable.chmod(executable.stat().st_mode | stat.S_IEXEC)
+
+    monkeypatch.setenv('PATH', str(executable.parent) + os.pathsep
+                       + os.environ['PATH'])
+    monkeypatch.setattr(Xfoil, 'default_timeout', 1)
+
+
+def test_job_timed_out(hanging_xfoil):
+    with pytest.warns(RuntimeWarning, match='timed out'):
+        with Xfoil(in_memory=True, plot=False) as x:
+            x.run('quit')
+
+    assert x.timed_out
+    assert x.outputs == {}
+
+
+def test_unconverged_point(hanging_xfoil, tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / 'cache'))
+    monkeypatch.setattr(Airfoil, 'cache', cache)
+
+    airfoil = Airfoil('timeout', 500000)
+    airfoil.coordinates = pd.DataFrame({'X': [1., 0., 1.],
+                                        'Y': [0., 0., -0.01]})
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        cp, cf, polar = airfoil.cp_vs_x('cl', 0.5)
+
+    assert any('Unconverged point' in str(w.message) for w in caught)
+    assert (polar.iloc[0] == 0).all() and polar['alpha'][0] == 0
+    np.testing.assert_array_equal(cp['Cp_suc'], 0.)
+    np.testing.assert_array_equal(cf['Cf'], 0.)
+    assert not os.path.exists(cache.path) or not os.listdir(cache.path)
@@ -4,9 +4,13 @@
 
 # Local imports
 from .xsoftware import Xsoftware
-from .xfoil import Xfoil
+from .xfoil import Xfoil, XfoilSession
 from .xrotor import Xrotor
+from .bem import Bem
 
 from .propeller import Propeller
 from .airfoil import Airfoil
-from .loadcase import Loadcase
\ No newline at end of file
+from .loadcase import Loadcase
+from .cache import ResultCache
+from .envelope import Envelope
+from .pool import XfoilPool
\ No newline at end of file
@@ -4,6 +4,7 @@
 
 # Third-party imports
 import os
+import contextlib
 import numpy as np
 import pandas as pd
 from scipy.optimize import curve_fit
@@ -11,8 +12,9 @@ from scipy.signal import savgol_filter
 import warnings
 
 # Local imports
-from .xfoil import Xfoil
-from .support import cleanup, print_call
+from .xfoil import Xfoil, XfoilSession
+from .cache import ResultCache
+from .support import print_call, NORM_GRID, resample
 
 # %%
 
@@ -32,8 +34,16 @@ class Airfoil:
     iter_limit : int, optional
         Viscous-solution iteration limit. The default is 200.
 
+    Attributes
+    ----------
+    cache : ResultCache or None
+        Cache for the results of cp_vs_x() and set_polar(), shared by all 
+        airfoils. Set ``Airfoil.cache = None`` to always run XFOIL.
+
     """
 
+    cache = ResultCache()
+
     def __init__(self, airfoil_filename, re, ncrit=9, iter_limit=200):
         self.__parameters = {
             'airfoil_filename': airfoil_filename,
@@ -43,6 +53,8 @@ class Airfoil:
         }
         self.__polar = None
         self.__xrotor_characteristics = None
+        self.__session = None
+        self.__cp_table = None
         self.__database = './util_loads/airfoil-database/'
 
         airfoil_path = self.__database + self.__parameters['airfoil_filename']
@@ -54,6 +66,12 @@ class Airfoil:
     def __repr__(self):
         return 'Airfoil ' + self.__parameters['airfoil_filename']
 
+    def __getstate__(self):
+        # A running XFOIL session cannot be passed to other processes
+        state = self.__dict__.copy()
+        state['_Airfoil__session'] = None
+        return state
+
     @property
     def coordinates(self):
         """
@@ -130,7 +148,183 @@ class Airfoil:
         """
         return self.__polar
 
-    @cleanup
+    @polar.setter
+    def polar(self, polar):
+        self.__polar = polar
+
+    @property
+    def cp_table(self):
+        """
+        Return the pre-tabulated pressure distribution and skin friction
+        (see set_cp_table()).
+            Cl : np.array (n_cl)
+            x : np.array (99)
+            Cp_suc : np.array (n_cl, 99)
+            Cp_pres : np.array (n_cl, 99)
+            Cf : np.array (n_cl, 99)
+            alpha : np.array (n_cl)
+            error : DataFrame (see validate_cp_table())
+
+        Returns
+        -------
+        dict or None
+
+        """
+        return self.__cp_table
+
+    def set_cp_table(self, cl_start=-0.5, cl_stop=1.5, cl_inc=0.05,
+                     xtr=[1, 1], pool=None):
+        """
+        Calculate the pressure distribution and skin friction over a sweep
+        of lift coefficients and store them as table. Afterwards, 
+        cp_lookup() answers queries by interpolation instead of XFOIL runs.
+        Unconverged points are left out of the table.
+
+        Parameters
+        ----------
+        cl_start : int or float, optional
+            First Cl value. The default is -0.5.
+        cl_stop : int or float, optional
+            Last Cl value. The default is 1.5.
+        cl_inc : int or float, optional
+            Cl increment. The default is 0.05.
+        xtr : list, optional
+            Forced transition points [top, bottom]. The default is [1, 1].
+        pool : XfoilPool, optional
+            Running XfoilPool to run XFOIL concurrently. The default is None.
+
+        Returns
+        -------
+        None.
+
+        """
+        cls = np.arange(cl_start, cl_stop + cl_inc / 2, cl_inc).round(6)
+
+        if pool is None:
+            results = [self.cp_vs_x('cl', cl, xtr) for cl in cls]
+        else:
+            results = [future.result() 
+                       for future in pool.map_cp_vs_x(self, 'cl', cls, xtr)]
+
+        table = {'Cl': [], 'x': NORM_GRID, 'Cp_suc': [], 'Cp_pres': [], 'Cf': [],
+                 'alpha': []}
+
+        for cl, (pressures, cf, polar) in zip(cls, results):
+            if (polar.iloc[0] == 0).all():
+                continue  # Unconverged point
+            table['Cl'].append(cl)
+            table['alpha'].append(polar['alpha'][0])
+            for column, df in [['Cp_suc', pressures],
+                               ['Cp_pres', pressures],
+                               ['Cf', cf]]:
+                table[column].append(resample(df['x'], df[column]))
+
+        for key in ['Cl', 'alpha', 'Cp_suc', 'Cp_pres', 'Cf']:
+            table[key] = np.array(table[key])
+
+        if len(table['Cl']) < 2:
+            raise RuntimeError('Less than two converged points in ' 
+                               + str(self))
+
+        table['error'] = None
+        self.__cp_table = table
+
+    def cp_lookup(self, rel_chord, cl):
+        """
+        Returns Cp_suc, Cp_pres, Cf and alpha at arbitrary (rel_chord, Cl) 
+        by bilinear interpolation in the cp_table. Arrays are broadcast 
+        against each other. Values outside the table are clamped.
+
+        Parameters
+        ----------
+        rel_chord : float or np.array
+            Relative chord: 0..1.
+        cl : float or np.array
+            Lift coefficient.
+
+        Returns
+        -------
+        dict : np.array
+            Cp_suc, Cp_pres, Cf, alpha.
+
+        """
+        if self.__cp_table is None:
+            raise RuntimeError('No cp_table. Run set_cp_table() first.')
+
+        table = self.__cp_table
+        rel_chord, cl = np.broadcast_arrays(np.asarray(rel_chord, float),
+                                            np.asarray(cl, float))
+
+        def weights(grid, values):
+            i = np.clip(np.searchsorted(grid, values) - 1, 0, len(grid) - 2)
+            t = np.clip((values - grid[i]) / (grid[i+1] - grid[i]), 0, 1)
+            return i, t
+
+        i, t = weights(table['Cl'], cl)
+        j, s = weights(table['x'], rel_chord)
+
+        result = {}
+        for key in ['Cp_suc', 'Cp_pres', 'Cf']:
+            values = table[key]
+            result[key] = ((1-t) * (1-s) * values[i, j]
+                           + t * (1-s) * values[i+1, j]
+                           + (1-t) * s * values[i, j+1]
+                           + t * s * values[i+1, j+1])
+
+        result['alpha'] = (1-t) * table['alpha'][i] \
+            + t * table['alpha'][i+1]
+
+        return result
+
+    def validate_cp_table(self, xtr=[1, 1], pool=None):
+        """
+        Compare the cp_table against direct XFOIL runs at the Cl values 
+        halfway between the table points, where the interpolation error is
+        largest. The result is stored in cp_table['error'].
+
+        Parameters
+        ----------
+        xtr : list, optional
+            Forced transition points [top, bottom]. Must be the same as in
+            set_cp_table(). The default is [1, 1].
+        pool : XfoilPool, optional
+            Running XfoilPool to run XFOIL concurrently. The default is None.
+
+        Returns
+        -------
+        DataFrame
+            Maximum absolute error of Cp_suc, Cp_pres, Cf and alpha per Cl.
+
+        """
+        table = self.cp_table
+        cls = ((table['Cl'][1:] + table['Cl'][:-1]) / 2).round(6)
+
+        if pool is None:
+            results = [self.cp_vs_x('cl', cl, xtr) for cl in cls]
+        else:
+            results = [future.result() 
+                       for future in pool.map_cp_vs_x(self, 'cl', cls, xtr)]
+
+        rows = []
+        for cl, (pressures, cf, polar) in zip(cls, results):
+            if (polar.iloc[0] == 0).all():
+                continue  # Unconverged point
+            lookup = self.cp_lookup(table['x'], cl)
+            row = {'Cl': cl}
+            for column, df in [['Cp_suc', pressures],
+                               ['Cp_pres', pressures],
+                               ['Cf', cf]]:
+                direct = resample(df['x'], df[column])
+                row[column] = np.abs(lookup[column] - direct).max()
+            row['alpha'] = abs(lookup['alpha'][0] - polar['alpha'][0])
+            rows.append(row)
+
+        table['error'] = pd.DataFrame(rows, 
+                                      columns=['Cl', 'Cp_suc', 'Cp_pres', 
+                                               'Cf', 'alpha'])
+
+        return table['error']
+
     # @print_call
     def set_polar(self, alpha_start=-20, alpha_stop=20, alpha_inc=0.25):
         """
@@ -151,16 +345,43 @@ class Airfoil:
         None.
 
         """
+        if self.cache is not None:
+            key = self.cache.fingerprint('set_polar',
+                                         self.coordinates,
+                                         self.__parameters['Re'],
+                                         self.__parameters['Ncrit'],
+                                         self.__parameters['Iter'],
+                                         float(alpha_start),
+                                         float(alpha_stop),
+                                         float(alpha_inc))
+            entry = self.cache.load(key)
+            if entry is not None:
+                self.__polar = entry['polar']
+                self.__xrotor_characteristics = \
+                    entry['xrotor_characteristics']
+                self.__warn_unconverged_polar__(
+                    entry.get('unconverged', {}).get('alpha', []))
+                return
+
         polar_file = '_xfoil_polar.txt'
+        polar = b''
+        timed_out = False
 
         coordinates_file = '_xfoil_input_coords.txt'
-        np.savetxt(coordinates_file, self.coordinates, fmt='%9.8f')
 
         aseq = [[0, alpha_start, alpha_inc],
                 [0, alpha_stop, alpha_inc]]
 
         for sequence in aseq:
-            with Xfoil(mode='hide') as x:
+            # Long job: fixed time limit instead of the adaptive one
+            with Xfoil(mode='hide', in_memory=True, plot=False,
+                       timeout=Xfoil.default_timeout) as x:
+                np.savetxt(x.path(coordinates_file), self.coordinates,
+                           fmt='%9.8f')
+                if polar:
+                    # Continue the polar of the previous sequence
+                    with open(x.path(polar_file), 'wb') as f:
+                        f.write(polar)
                 x.run('load ')
                 x.run(coordinates_file)
                 x.run('')
@@ -182,7 +403,23 @@ class Airfoil:
                 x.run('')
                 x.run('quit')
 
-        self.__polar = Xfoil.read_polar(polar_file)
+            # After a time out, the polar file may be missing: the points of
+            # this sequence are unconverged
+            polar = x.outputs.get(polar_file, polar)
+            timed_out = timed_out or x.timed_out
+
+        self.__polar = Xfoil.read_polar(polar)
+        
+        if self.__polar.empty:
+            raise RuntimeError('No converged polar points in ' + str(self))
+        
+        # Requested angles of attack without converged result
+        requested = np.round(np.union1d(
+            np.arange(0, alpha_start - alpha_inc / 2, -abs(alpha_inc)),
+            np.arange(0, alpha_stop + alpha_inc / 2, abs(alpha_inc))), 3)
+        unconverged = np.setdiff1d(
+            requested, np.round(self.__polar['alpha'].to_numpy(), 3))
+        self.__warn_unconverged_polar__(unconverged)
 
         # Set Xrotor_characteristics
 
@@ -223,6 +460,24 @@ class Airfoil:
             'Cm': self.__polar['CM'].min(),
         }
 
+        if self.cache is not None and not timed_out:
+            # Unconverged points are stored, to warn again on every hit.
+            # Polars of timed out jobs are not stored, they are incomplete.
+            self.cache.store(key, {'polar': self.__polar,
+                                   'xrotor_characteristics': 
+                                       self.__xrotor_characteristics,
+                                   'unconverged': 
+                                       {'alpha': [float(alpha) 
+                                                  for alpha in unconverged]}})
+
+    def __warn_unconverged_polar__(self, alpha):
+        """Warns about the unconverged angles of attack of set_polar()."""
+
+        if len(alpha):
+            warnings.warn('Unconverged polar points: ' + str(self) + 
+                          ' alpha = ' + str(list(np.round(alpha, 3))),
+                          RuntimeWarning)
+
     @staticmethod
     def __fit_cl_alpha__(x, x0, x1, a3, b1, b3, c2):
         b2 = 2 * a3 * x1 + b3
@@ -234,7 +489,44 @@ class Airfoil:
                              lambda xx: a3 * xx ** 2 + b3 * xx + c3],
                             )
 
-    @cleanup
+    @contextlib.contextmanager
+    def session(self, xtr=[1, 1], timeout=60):
+        """
+        Keeps one XFOIL process alive while the context is open. All calls
+        of cp_vs_x() are streamed to this process instead of starting a new
+        XFOIL process per call.
+
+        .. code-block:: python
+
+            with airfoil.session():
+                for cl in [0.2, 0.4, 0.6]:
+                    pressures, cf, polar = airfoil.cp_vs_x('cl', cl)
+
+        Parameters
+        ----------
+        xtr : list, optional
+            Initial forced transition points [top, bottom]. The default is
+            [1, 1].
+        timeout : int or float, optional
+            Time limit of one request in seconds. The default is 60.
+
+        Yields
+        ------
+        XfoilSession
+
+        """
+        with XfoilSession(self.coordinates,
+                          self.__parameters['Re'],
+                          self.__parameters['Ncrit'],
+                          self.__parameters['Iter'],
+                          xtr,
+                          timeout) as session:
+            self.__session = session
+            try:
+                yield session
+            finally:
+                self.__session = None
+
     # @print_call
     def cp_vs_x(self, mode, value, xtr=[1,1]):
         """
@@ -247,22 +539,61 @@ class Airfoil:
             'cl' for Coefficient of lift.
             'cli' for Coefficient of lift, inviscid.
         value : int or float
+        xtr : list, optional
+            Forced transition points [top, bottom]. The default is [1, 1].
 
         Returns
         -------
         DataFrame
             Pressure distribution.
+        DataFrame
+            Skin friction coefficient.
+        DataFrame
+            Polar of the operating point.
 
         """
-        coordinates_file = '_xfoil_input_coords.txt'
+        if self.cache is not None:
+            key = self.cache.fingerprint('cp_vs_x',
+                                         self.coordinates,
+                                         self.__parameters['Re'],
+                                         self.__parameters['Ncrit'],
+                                         self.__parameters['Iter'],
+                                         str(mode).lower(),
+                                         float(value),
+                                         list(xtr))
+            entry = self.cache.load(key)
+            if entry is not None:
+                return entry['cp'], entry['cf'], entry['polar']
+
+        if self.__session is not None:
+            cp, cf, polar = self.__session.cp_vs_x(mode, value, xtr)
+        else:
+            cp, cf, polar = self.__cp_vs_x_xfoil__(mode, value, xtr)
+
+        if polar.empty:
+            # Not cached: the point is computed (and warned) again next time
+            polar = pd.DataFrame(0., index=[0], columns=polar.columns)
+            
+            warnings.warn('Unconverged point: ' + str(self) + ' ' + \
+                          str(mode) + ' ' + str(value) + '. Filling with 0.',
+                          RuntimeWarning)
 
-        np.savetxt(coordinates_file, self.coordinates, fmt='%9.8f')
+        elif self.cache is not None:
+            self.cache.store(key, {'cp': cp, 'cf': cf, 'polar': polar})
 
+        return cp, cf, polar
+
+    def __cp_vs_x_xfoil__(self, mode, value, xtr):
+        """Runs XFOIL for one operating point, see cp_vs_x()."""
+
+        coordinates_file = '_xfoil_input_coords.txt'
         cp_vs_x_file = '_xfoil_cpvsx.txt'
         dump_file = '_xfoil_dump.txt'
         polar_file = '_xfoil_polar.txt'
 
-        with Xfoil() as x:
+        with Xfoil(in_memory=True, plot=False) as x:
+            np.savetxt(x.path(coordinates_file), self.coordinates, 
+                       fmt='%9.8f')
             x.run('load ')
             x.run(coordinates_file)
             x.run('')
@@ -289,24 +620,24 @@ class Airfoil:
             x.run('')
             x.run('quit')
             
-        polar = Xfoil.read_polar(polar_file)  
-        if polar.empty:
-            polar = polar.append(pd.Series(), ignore_index=True)
-            polar = polar.fillna(0)
+        if not all(name in x.outputs 
+                   for name in [cp_vs_x_file, dump_file, polar_file]):
+            # Timed out (x.timed_out) before all files were written: 
+            # unconverged point, see cp_vs_x()
+            return pd.DataFrame({'x': NORM_GRID, 'Cp_suc': 0., 
+                                 'Cp_pres': 0.}), \
+                pd.DataFrame({'x': NORM_GRID, 'Cf': 0.}), \
+                pd.DataFrame(columns=['alpha', 'CL', 'CD', 'CDp', 'CM'])
             
-            warnings.warn('Unconverged point: ' + str(self) + ' ' + \
-                          str(mode) + ' ' + str(value) + '. Filling with 0.',
-                          RuntimeWarning)
-                        
-        return Xfoil.read_cp_vs_x(cp_vs_x_file, True), Xfoil.read_cf_vs_x(dump_file),\
-            polar
+        return Xfoil.read_cp_vs_x(x.outputs[cp_vs_x_file], True), \
+            Xfoil.read_cf_vs_x(x.outputs[dump_file]), \
+            Xfoil.read_polar(x.outputs[polar_file])
 
     @staticmethod
-    @cleanup
-    def interpolate(airfoil1, airfoil2, fraction_of_2nd_airfoil):
+    def interpolate(airfoil1, airfoil2, fraction_of_2nd_airfoil,
+                    method='native', n_points=81):
         """
         Return interpolated airfoil of two input airfoils and fraction.
-        This method uses XFOILs INTE and GDES routines in the background.
 
         .. code-block:: python
 
@@ -320,6 +651,19 @@ class Airfoil:
         airfoil2 : Airfoil
         fraction_of_2nd_airfoil : Float 0..1
             Fraction of second airfoil to keep.
+        method : str, optional
+            Must be one of the following:
+
+            - ``'native'`` Both airfoils are re-paneled by arc length and
+              decomposed into camber and thickness lines, which are
+              blended linearly. No XFOIL process is started.
+            - ``'xfoil'`` Use XFOILs INTE and GDES routines (e.g. for
+              validation of the native method).
+
+            The default is 'native'.
+        n_points : int, optional
+            Number of points per surface of the native method. The default
+            is 81.
 
         Returns
         -------
@@ -330,23 +674,105 @@ class Airfoil:
         DataFrame
             The camber line.
 
+        """
+        if method == 'xfoil':
+            return Airfoil.__interpolate_xfoil__(airfoil1, airfoil2,
+                                                 fraction_of_2nd_airfoil)
+        elif method != 'native':
+            raise ValueError('Invalid method %s' % method)
+
+        fraction = float(fraction_of_2nd_airfoil)
+
+        # Common X grid with cosine spacing (dense at LE and TE)
+        x = 0.5 * (1 - np.cos(np.linspace(0, np.pi, n_points)))
+
+        camber1, thickness1 = Airfoil.__decompose__(airfoil1.coordinates, x)
+        camber2, thickness2 = Airfoil.__decompose__(airfoil2.coordinates, x)
+
+        camber = (1 - fraction) * camber1 + fraction * camber2
+        thickness = (1 - fraction) * thickness1 + fraction * thickness2
+
+        def contour(upper, lower):
+            # XFOIL order: TE -> upper surface -> LE -> lower surface -> TE
+            return pd.DataFrame({'X': np.concatenate([x[::-1], x[1:]]),
+                                 'Y': np.concatenate([upper[::-1],
+                                                      lower[1:]])})
+
+        return contour(camber + thickness, camber - thickness), \
+            contour(thickness, -thickness), \
+            contour(camber, camber)
+
+    @staticmethod
+    def __decompose__(coordinates, x):
+        """
+        Re-panel an airfoil by arc length and return its camber line and
+        half thickness at the given X positions.
+
+        Parameters
+        ----------
+        coordinates : DataFrame
+            Airfoil coordinates (TE -> upper surface -> LE -> lower surface
+            -> TE).
+        x : np.array
+            X positions 0..1.
+
+        Returns
+        -------
+        camber : np.array
+        thickness : np.array
+            Half thickness.
+
+        """
+        X = np.array(coordinates['X'], dtype=float)
+        Y = np.array(coordinates['Y'], dtype=float)
+
+        le = np.argmin(X)
+        surfaces = [(X[le::-1], Y[le::-1]),  # upper surface, LE -> TE
+                    (X[le:], Y[le:])]  # lower surface, LE -> TE
+
+        y = []
+        for xs, ys in surfaces:
+            # Arc length parametrization, cosine spaced re-paneling
+            s = np.concatenate(
+                [[0], np.cumsum(np.hypot(np.diff(xs), np.diff(ys)))])
+            s_new = s[-1] * 0.5 * (1 - np.cos(np.linspace(0, np.pi,
+                                                          4 * len(x))))
+            xs_new = np.interp(s_new, s, xs)
+            ys_new = np.interp(s_new, s, ys)
+
+            # Normalize to unit chord
+            xs_new = (xs_new - X[le]) / (X.max() - X[le])
+
+            y.append(np.interp(x, np.maximum.accumulate(xs_new), ys_new))
+
+        return (y[0] + y[1]) / 2, (y[0] - y[1]) / 2
+
+    @staticmethod
+    def __interpolate_xfoil__(airfoil1, airfoil2, fraction_of_2nd_airfoil):
+        """
+        Return interpolated airfoil of two input airfoils and fraction.
+        This method uses XFOILs INTE and GDES routines in the background.
+
         """
         output_file = '_xfoil_output.txt'
+        coordinates_files = ['_xfoil_input_coords1.txt',
+                             '_xfoil_input_coords2.txt']
 
         result = []
         options = [[1, 1], [1, 0], [0, 1]]
 
         for option in options:
-            if os.path.exists(output_file):
-                os.remove(output_file)
-            with Xfoil() as x:
+            with Xfoil(in_memory=True, plot=False,
+                       timeout=Xfoil.default_timeout) as x:
+                np.savetxt(x.path(coordinates_files[0]), airfoil1.coordinates,
+                           fmt='%9.8f')
+                np.savetxt(x.path(coordinates_files[1]), airfoil2.coordinates,
+                           fmt='%9.8f')
                 x.run('inte')
                 x.run('f')
-                x.run('./util_loads/airfoil-database/' +
-                      airfoil1.parameters['airfoil_filename'])
+                x.run(coordinates_files[0])
                 x.run('f')
-                x.run('./util_loads/airfoil-database/' +
-                      airfoil2.parameters['airfoil_filename'])
+                x.run(coordinates_files[1])
                 x.run(fraction_of_2nd_airfoil)
                 x.run('')
                 x.run('pcop')
@@ -362,8 +788,6 @@ class Airfoil:
                 x.run(output_file)
                 x.run('quit')
 
-            result.append(Xfoil.read_coordinates(output_file))
-        # thickness_line= df.loc[df['Y'] >= 0].drop_duplicates()
-        # thickness_line['Y'] = thickness_line['Y']*2
+            result.append(Xfoil.read_coordinates(x.outputs[output_file]))
 
         return result[0], result[1], result[2]
@@ -0,0 +1,466 @@
+#%% Import Libraries and Data
+
+# Third-party imports
+import numpy as np
+import pandas as pd
+
+# Local imports
+
+#%% Column names of XROTORs OPER and BEND output (see parsers)
+
+OPER_COLUMNS = ['i', 'r/R', 'c/R', 'beta(deg)', 'CL', 'Cd', 'REx10^3',
+                'Mach', 'effi', 'effp', 'na.u/U']
+
+BEND_COLUMNS = ['i', 'r/R', 'u/R', 'w/R', 't(deg)', 'Mz', 'Mx', 'T', 'P',
+                'Sbend', 'Stors']
+
+#%%
+
+
+class Bem:
+    """
+    Blade element momentum (BEM) solver in pure NumPy, a fast alternative
+    to XROTOR. All loadcases and all radial stations are solved at once.
+
+    The results have the same form as the XROTOR results of
+    Propeller.calc_loadcase(): a dictionary of single_values, oper and bend
+    with XROTORs keys and column names.
+
+    .. code-block:: python
+
+        from util_loads import Bem
+
+        results = Bem(propeller).run([loadcase1, loadcase2])
+        results[0]['bend']['Mz']
+
+        # Or select the backend of the propeller:
+        propeller.backend = 'bem'
+        propeller.calc_loads()
+
+    Model:
+
+    - Momentum balance of every annulus in axial and tangential direction,
+      with Prandtl's tip loss factor. Induced velocities are found by
+      under-relaxed fixed point iteration, which also works in static
+      conditions (flight speed 0).
+    - Airfoil data from Airfoil.xrotor_characteristics (XROTORs linear
+      lift/ quadratic drag model with Re scaling and Prandtl-Glauert
+      correction) or from the polar (aero='polar'). Between the section
+      radii, the coefficients are interpolated linearly.
+    - Loads of the blade as cantilever beam: bending moments out-of-plane
+      (Mz, from thrust) and in-plane (Mx, from torque) and the torsional
+      moment (P, from Cm). Deflections, tension and stresses need
+      structural data and are np.nan.
+
+    Parameters
+    ----------
+    propeller : Propeller
+        Geometry, sections and parameters are taken from the propeller.
+    n_stations : int, optional
+        Number of radial stations between hub and tip. The default is 30.
+    aero : str, optional
+        Source of the airfoil data:
+
+        - ``'characteristics'`` Airfoil.xrotor_characteristics
+        - ``'polar'`` Airfoil.polar (CL, CD and CM over alpha)
+
+        The default is 'characteristics'.
+    relaxation : float, optional
+        Under-relaxation of the induced velocities. The default is 0.3.
+    tolerance : float, optional
+        Convergence limit of the induced velocities relative to the tip
+        speed. The default is 1e-6.
+    max_iter : int, optional
+        Maximum number of iterations. The default is 500.
+
+    """
+
+    # ISA 0km, as XROTORs 'atmo 0'
+    rho = 1.225
+    vsound = 340.3
+    mu = 1.789e-5
+
+    # Exponent of XROTORs Reynolds number scaling of Cd
+    re_exponent = -0.4
+
+    def __init__(self, propeller, n_stations=30, aero='characteristics',
+                 relaxation=0.3, tolerance=1e-6, max_iter=500):
+        if aero not in ['characteristics', 'polar']:
+            raise ValueError('Invalid aero %s' % aero)
+
+        self.propeller = propeller
+        self.n_stations = n_stations
+        self.aero = aero
+        self.relaxation = relaxation
+        self.tolerance = tolerance
+        self.max_iter = max_iter
+
+        self.__set_stations__()
+
+    def __repr__(self):
+        return 'Bem (' + str(self.n_stations) + ' stations, ' \
+            + self.aero + ')'
+
+    def __set_stations__(self):
+        """Interpolates geometry and section data onto the stations."""
+
+        tip_radius = self.propeller.parameters['tip_radius']
+        hub_radius = self.propeller.parameters['hub_radius']
+
+        # Stations at the centers of equally wide annuli
+        edges = np.linspace(hub_radius, tip_radius, self.n_stations + 1)
+        self.radius = (edges[1:] + edges[:-1]) / 2
+        self.dr = np.diff(edges)
+        self.rel_radius = self.radius / tip_radius
+
+        geometry = np.asarray(self.propeller.geometry, dtype=float)
+        geometry = geometry[np.argsort(geometry[:, 0])]
+        self.chord = np.interp(self.rel_radius, geometry[:, 0],
+                               geometry[:, 1]) * tip_radius
+        self.beta = np.radians(np.interp(self.rel_radius, geometry[:, 0],
+                                         geometry[:, 2]))
+
+        # Weights of the sections at every station (linear interpolation)
+        section_radii = np.array([section[0]
+                                  for section in self.propeller.sections])
+        self.airfoils = [section[1] for section in self.propeller.sections]
+        self.weights = np.array(
+            [np.interp(self.rel_radius, section_radii, row)
+             for row in np.eye(len(section_radii))])
+
+        if self.aero == 'characteristics':
+            keys = ['Zero-lift alpha (deg)', 'd(Cl)/d(alpha)',
+                    'd(Cl)/d(alpha)@stall', 'Maximum Cl', 'Minimum Cl',
+                    'Minimum Cd', 'Cl at minimum Cd', 'd(Cd)/d(Cl**2)', 'Cm']
+            self.characteristics = {
+                key: self.weights.T @ np.array(
+                    [airfoil.xrotor_characteristics[key]
+                     for airfoil in self.airfoils], dtype=float)
+                for key in keys}
+            self.characteristics['Re'] = self.weights.T @ np.array(
+                [airfoil.parameters['Re'] for airfoil in self.airfoils],
+                dtype=float)
+        else:
+            for airfoil in self.airfoils:
+                if airfoil.polar is None:
+                    raise ValueError('No polar: run Airfoil.set_polar() '
+                                     'first')
+
+    def run(self, loadcases):
+        """
+        Solves all loadcases at once.
+
+        Parameters
+        ----------
+        loadcases : list
+            List of Loadcase instances. Supported types (Loadcase.set_data):
+            'rpm', 'adva' (XROTORs advance ratio V/(Omega R)) and 'thru',
+            'torq', 'powe' with fixed pitch ('p') or fixed rpm ('r').
+
+        Returns
+        -------
+        results : list
+            One dictionary (single_values, oper, bend) per loadcase, with
+            the keys and columns of XROTOR. In bend, only 'i', 'r/R' and
+            the moments 'Mz' (out-of-plane bending), 'Mx' (in-plane 
+            bending) and 'P' (torsion) are computed, in N-m. 'u/R', 'w/R',
+            't(deg)', 'T', 'Sbend' and 'Stors' are np.nan. 
+
+        """
+        tip_radius = self.propeller.parameters['tip_radius']
+
+        speed = np.array([loadcase.flight_speed for loadcase in loadcases],
+                         dtype=float)
+        rpm = np.full(len(loadcases), np.nan)
+        pitch = np.zeros(len(loadcases))
+        target = np.full(len(loadcases), np.nan)
+        quantity = [None] * len(loadcases)
+        variable = [None] * len(loadcases)
+
+        for i, loadcase in enumerate(loadcases):
+            data = loadcase.data
+            if data[0] == 'rpm':
+                rpm[i] = data[1]
+            elif data[0] == 'adva':
+                rpm[i] = speed[i] / (data[1] * tip_radius) * 30 / np.pi
+            elif data[0] in ['thru', 'torq', 'powe']:
+                quantity[i] = data[0]
+                target[i] = data[1]
+                if data[2] == 'r':
+                    rpm[i] = data[3]
+                    variable[i] = 'pitch'
+                else:
+                    variable[i] = 'rpm'
+            else:
+                raise ValueError('Invalid loadcase %s' % loadcase)
+
+        if any(v is not None for v in variable):
+            rpm, pitch = self.__trim__(speed, rpm, pitch, target, quantity,
+                                       variable)
+
+        state = self.__solve__(speed, rpm, pitch)
+
+        return [self.__result__(state, i) for i in range(len(loadcases))]
+
+    def __trim__(self, speed, rpm, pitch, target, quantity, variable):
+        """
+        Finds rpm (fixed pitch) or pitch change (fixed rpm) of the loadcases
+        with prescribed thrust, torque or power by the secant method.
+
+        """
+        keys = {'thru': 'thrust', 'torq': 'torque', 'powe': 'power'}
+        trimmed = np.array([v is not None for v in variable])
+        by_rpm = np.array([v == 'rpm' for v in variable])
+        by_pitch = np.array([v == 'pitch' for v in variable])
+
+        def residual(x):
+            rpm_x = np.where(by_rpm, x, rpm)
+            pitch_x = np.where(by_pitch, x, pitch)
+            state = self.__solve__(speed, rpm_x, pitch_x)
+            value = np.array([state[keys[q]][i] if q is not None else 0.
+                              for i, q in enumerate(quantity)])
+            return np.where(trimmed, value - target, 0.)
+
+        # Start values: rpm [1/min] or pitch change [rad]
+        x0 = np.where(by_rpm, 2000., np.where(by_pitch, 0., 0.))
+        x1 = np.where(by_rpm, 3000., np.where(by_pitch, 0.05, 0.))
+        f0, f1 = residual(x0), residual(x1)
+
+        for _ in range(50):
+            df = f1 - f0
+            step = np.where(trimmed & (df != 0), f1 * (x1 - x0) /
+                            np.where(df != 0, df, 1.), 0.)
+            x0, f0 = x1, f1
+            x1 = x1 - step
+            x1 = np.where(by_rpm, np.maximum(x1, 1.), x1)
+            f1 = residual(x1)
+            limit = 1e-4 * np.maximum(np.abs(np.nan_to_num(target)), 1.)
+            if np.all((np.abs(f1) <= limit) | ~trimmed):
+                break
+
+        return np.where(by_rpm, x1, rpm), np.where(by_pitch, x1, pitch)
+
+    def __solve__(self, speed, rpm, pitch):
+        """
+        Solves the BEM equations of all loadcases at once. Arrays have the
+        shape (loadcases, stations).
+
+        """
+        blades = self.propeller.parameters['number_of_blades']
+        tip_radius = self.propeller.parameters['tip_radius']
+
+        speed = speed[:, None]
+        omega = (rpm * np.pi / 30)[:, None]
+        beta = self.beta[None, :] + pitch[:, None]
+        r = self.radius[None, :]
+        solidity = blades * self.chord / (2 * np.pi * self.radius)
+
+        v_axial = np.zeros((len(rpm), self.n_stations))
+        v_tang = np.zeros((len(rpm), self.n_stations))
+        limit = self.tolerance * np.maximum(omega * tip_radius, 1.)
+
+        for _ in range(self.max_iter):
+            u_axial = speed + v_axial
+            u_tang = np.maximum(omega * r - v_tang, 1e-6)
+            w = np.hypot(u_axial, u_tang)
+            phi = np.arctan2(u_axial, u_tang)
+            sin_phi = np.maximum(np.abs(np.sin(phi)), 1e-6)
+
+            cl, cd, cm = self.coefficients(beta - phi, w)
+            cn = cl * np.cos(phi) - cd * np.sin(phi)
+            ct = cl * np.sin(phi) + cd * np.cos(phi)
+
+            # Prandtl's tip loss factor
+            f = blades / 2 * (1 - self.rel_radius) \
+                / (self.rel_radius * sin_phi)
+            loss = np.maximum(2 / np.pi * np.arccos(np.exp(-f)), 1e-3)
+
+            v_axial_new = solidity * w * cn / (4 * loss * sin_phi)
+            v_tang_new = solidity * w * ct / (4 * loss * sin_phi)
+
+            change = np.maximum(np.abs(v_axial_new - v_axial),
+                                np.abs(v_tang_new - v_tang))
+            v_axial += self.relaxation * (v_axial_new - v_axial)
+            v_tang += self.relaxation * (v_tang_new - v_tang)
+
+            if np.all(change <= limit):
+                break
+
+        u_axial = speed + v_axial
+        u_tang = np.maximum(omega * r - v_tang, 1e-6)
+        w = np.hypot(u_axial, u_tang)
+        phi = np.arctan2(u_axial, u_tang)
+        cl, cd, cm = self.coefficients(beta - phi, w)
+
+        # Loads per blade and unit length
+        q = self.rho / 2 * w**2 * self.chord
+        lift_n, lift_t = q * cl * np.cos(phi), q * cl * np.sin(phi)
+        drag_n, drag_t = -q * cd * np.sin(phi), q * cd * np.cos(phi)
+
+        thrust = blades * np.sum((lift_n + drag_n) * self.dr, axis=1)
+        torque = blades * np.sum((lift_t + drag_t) * r * self.dr, axis=1)
+
+        return {'speed': speed[:, 0], 'rpm': rpm, 'omega': omega[:, 0],
+                'pitch': pitch, 'beta': beta, 'w': w, 'phi': phi,
+                'cl': cl, 'cd': cd, 'cm': cm,
+                'v_axial': v_axial, 'v_tang': v_tang,
+                'normal': lift_n + drag_n, 'tangential': lift_t + drag_t,
+                'pitching': q * self.chord * cm,
+                'thrust': thrust, 'torque': torque,
+                'power': torque * omega[:, 0],
+                'thrust_visc': blades * np.sum(drag_n * self.dr, axis=1),
+                'power_visc': blades * omega[:, 0]
+                    * np.sum(drag_t * r * self.dr, axis=1)}
+
+    def coefficients(self, alpha, w):
+        """
+        Returns Cl, Cd and Cm at all stations.
+
+        Parameters
+        ----------
+        alpha : np.array
+            Angles of attack [rad], shape (loadcases, stations).
+        w : np.array
+            Relative velocities [m/s], same shape.
+
+        Returns
+        -------
+        cl, cd, cm : np.array
+
+        """
+        if self.aero == 'polar':
+            return self.__polar_coefficients__(alpha)
+
+        c = self.characteristics
+        mach = np.minimum(w / self.vsound, 0.9)
+        pg = 1 / np.sqrt(1 - mach**2)  # Prandtl-Glauert
+
+        cl_lin = c['d(Cl)/d(alpha)'] \
+            * (alpha - np.radians(c['Zero-lift alpha (deg)'])) * pg
+        cl_max = c['Maximum Cl'] * np.ones_like(cl_lin)
+        cl_min = c['Minimum Cl'] * np.ones_like(cl_lin)
+        slope = c['d(Cl)/d(alpha)'] * pg
+
+        # Post stall: reduced lift slope beyond Maximum Cl/ Minimum Cl
+        stall = c['d(Cl)/d(alpha)@stall'] / c['d(Cl)/d(alpha)']
+        cl = np.where(cl_lin > cl_max, cl_max + stall * (cl_lin - cl_max),
+                      np.where(cl_lin < cl_min,
+                               cl_min + stall * (cl_lin - cl_min), cl_lin))
+
+        re = self.rho * w * self.chord / self.mu
+        cd = (c['Minimum Cd'] + c['d(Cd)/d(Cl**2)']
+              * (cl - c['Cl at minimum Cd'])**2) \
+            * (np.maximum(re, 1.) / c['Re'])**self.re_exponent
+        # Drag increase in stall
+        cd = cd + 2 * np.sin((cl_lin - cl) / slope)**2
+
+        return cl, cd, c['Cm'] * np.ones_like(cl)
+
+    def __polar_coefficients__(self, alpha):
+        """Cl, Cd and Cm from the section polars, see coefficients()."""
+
+        alpha = np.degrees(alpha)
+        cl = np.zeros_like(alpha)
+        cd = np.zeros_like(alpha)
+        cm = np.zeros_like(alpha)
+
+        for airfoil, weight in zip(self.airfoils, self.weights):
+            if not weight.any():
+                continue
+            polar = airfoil.polar.sort_values('alpha')
+            for coefficient, column in [[cl, 'CL'], [cd, 'CD'], [cm, 'CM']]:
+                coefficient += weight * np.interp(alpha, polar['alpha'],
+                                                  polar[column])
+
+        return cl, cd, cm
+
+    def __result__(self, state, i):
+        """Returns the XROTOR like result dictionary of loadcase i."""
+
+        tip_radius = self.propeller.parameters['tip_radius']
+        speed, omega = state['speed'][i], state['omega'][i]
+        thrust, power = state['thrust'][i], state['power'][i]
+        thrust_inv = thrust - state['thrust_visc'][i]
+        power_inv = power - state['power_visc'][i]
+
+        # Thrust coefficient based on flight speed as in XROTOR
+        tcoef = thrust / (self.rho / 2 * speed**2 * np.pi * tip_radius**2)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            single_values = {
+                'thrust(N)': thrust,
+                'power(W)': power,
+                'torque(N-m)': state['torque'][i],
+                'Efficiency': thrust * speed / power,
+                'speed(m/s)': speed,
+                'rpm': state['rpm'][i],
+                'Eff induced': thrust_inv * speed / power_inv,
+                'Eff ideal': 2 / (1 + np.sqrt(1 + tcoef)),
+                'Tcoef': tcoef,
+                'Tnacel(N)': 0.,
+                'hub rad.(m)': self.propeller.parameters['hub_radius'],
+                'disp. area': 0.,
+                'Tvisc(N)': state['thrust_visc'][i],
+                'Pvisc(W)': state['power_visc'][i],
+                'rho(kg/m3)': self.rho,
+                'Vsound(m/s)': self.vsound,
+                'mu(kg/m-s)': self.mu,
+                }
+        single_values = {key: float(value)
+                         for key, value in single_values.items()}
+
+        w, phi = state['w'][i], state['phi'][i]
+        cl, cd = state['cl'][i], state['cd'][i]
+        u_tang = omega * self.radius - state['v_tang'][i]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            effi = speed / (speed + state['v_axial'][i]) \
+                * u_tang / (omega * self.radius)
+            effp = (1 - cd / cl * np.tan(phi)) / (1 + cd / cl / np.tan(phi))
+
+        stations = np.arange(1, self.n_stations + 1)
+        oper = pd.DataFrame(dict(zip(OPER_COLUMNS, [
+            stations,
+            self.rel_radius,
+            self.chord / tip_radius,
+            np.degrees(state['beta'][i]),
+            cl,
+            cd,
+            self.rho * w * self.chord / self.mu / 1000,
+            w / self.vsound,
+            effi,
+            effp,
+            np.zeros(self.n_stations),
+            ])))
+
+        nan = np.full(self.n_stations, np.nan)
+        bend = pd.DataFrame(dict(zip(BEND_COLUMNS, [
+            stations,
+            self.rel_radius,
+            nan, nan, nan,
+            self.__moment__(state['normal'][i]),
+            self.__moment__(state['tangential'][i]),
+            nan,
+            self.__integral__(state['pitching'][i]),
+            nan, nan,
+            ])))
+
+        return {'single_values': single_values, 'oper': oper, 'bend': bend}
+
+    def __integral__(self, load):
+        """Integral of a distributed load from every station to the tip."""
+
+        outboard = np.cumsum((load * self.dr)[::-1])[::-1]
+
+        return outboard - load * self.dr / 2
+
+    def __moment__(self, load):
+        """Bending moment of a distributed load at every station."""
+
+        force = load * self.dr
+        outboard_force = np.cumsum(force[::-1])[::-1] - force
+        outboard_moment = np.cumsum((force * self.radius)[::-1])[::-1] \
+            - force * self.radius
+
+        return outboard_moment - self.radius * outboard_force \
+            + load * self.dr**2 / 8
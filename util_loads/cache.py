@@ -0,0 +1,267 @@
+#%% Import Libraries and Data
+
+# Third-party imports
+import os
+import json
+import hashlib
+import pathlib
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Local imports
+
+#%%
+
+
+class ResultCache:
+    """
+    On-disk, content-addressed cache for XFOIL and XROTOR results.
+
+    Every entry is stored under a key, which is a hash of all inputs that
+    define the result (e.g. airfoil coordinates, Re, Ncrit, mode, value...).
+    An entry is a dictionary of DataFrames and/or plain dictionaries, which
+    is written as one compressed NumPy ``.npz`` file.
+    When the size of the cache directory exceeds ``max_size``, the least
+    recently used entries are deleted.
+
+    .. code-block:: python
+
+        from util_loads import ResultCache
+
+        cache = ResultCache()
+        key = cache.fingerprint('cp_vs_x', coordinates, 500000, 'cl', 0.5)
+
+        entry = cache.load(key)
+        if entry is None:
+            entry = {'cp': cp, 'polar': polar}
+            cache.store(key, entry)
+
+    Parameters
+    ----------
+    path : str, optional
+        Cache directory. The default is the ``cache`` folder next to this
+        module.
+    max_size : int, optional
+        Size cap of the cache directory in bytes. The default is 256 MB.
+
+    """
+
+    def __init__(self, path=None, max_size=256 * 2**20):
+        if path is None:
+            path = str(pathlib.Path(__file__).parent.absolute()) + '/cache/'
+        self.path = path
+        self.max_size = max_size
+
+    def __repr__(self):
+        return 'ResultCache ' + str(self.path)
+
+    @staticmethod
+    def fingerprint(*items):
+        """
+        Returns the hash of all given items. DataFrames and np.arrays are
+        hashed by content, dicts independently of their key order. Numbers
+        are hashed by value: 1, 1.0 and np.int64(1) give the same key, as
+        do integer and float arrays with equal values.
+
+        Parameters
+        ----------
+        *items
+            Anything that defines the cached result.
+
+        Returns
+        -------
+        key : str
+            Hex digest.
+
+        """
+        sha = hashlib.sha256()
+
+        def update(item):
+            if isinstance(item, pd.DataFrame):
+                sha.update(b'DataFrame')
+                update(list(item.columns))
+                update(item.to_numpy(dtype=float))
+            elif isinstance(item, np.ndarray):
+                if item.dtype.kind in 'iuf':
+                    item = item.astype(np.float64)
+                sha.update(b'ndarray' + str(item.dtype).encode())
+                sha.update(str(item.shape).encode())
+                sha.update(np.ascontiguousarray(item).tobytes())
+            elif isinstance(item, dict):
+                sha.update(b'dict')
+                for key in sorted(item, key=str):
+                    update(str(key))
+                    update(item[key])
+            elif isinstance(item, (list, tuple)):
+                sha.update(b'list' + str(len(item)).encode())
+                for element in item:
+                    update(element)
+            elif isinstance(item, (bool, np.bool_)):
+                sha.update(b'bool' + repr(bool(item)).encode())
+            elif isinstance(item, (int, float, np.integer, np.floating)):
+                sha.update(b'float' + repr(float(item)).encode())
+            else:
+                sha.update(b'str' + str(item).encode())
+
+        for item in items:
+            update(item)
+
+        return sha.hexdigest()
+
+    def filename(self, key):
+        """Returns the path of the entry file of key."""
+
+        return os.path.join(self.path, key + '.npz')
+
+    def load(self, key):
+        """
+        Returns the cached entry of key, or None if there is no such entry.
+
+        Parameters
+        ----------
+        key : str
+            Key returned by fingerprint().
+
+        Returns
+        -------
+        entry : dict or None
+            Dictionary of DataFrames and dicts.
+
+        """
+        filename = self.filename(key)
+
+        try:
+            with np.load(filename, allow_pickle=False) as data:
+                meta = json.loads(str(data['__meta__']))
+                entry = {}
+                for name, spec in meta.items():
+                    if spec['type'] == 'dict':
+                        entry[name] = spec['data']
+                    else:
+                        columns = [data[name + '/' + str(i)]
+                                   for i in range(len(spec['columns']))]
+                        entry[name] = pd.DataFrame(
+                            dict(zip(spec['columns'], columns)),
+                            index=data[name + '/index'],
+                            columns=spec['columns'])
+        except (OSError, KeyError, ValueError):
+            return None
+
+        # Mark entry as recently used:
+        try:
+            os.utime(filename)
+        except OSError:
+            pass
+
+        return entry
+
+    def store(self, key, entry):
+        """
+        Writes an entry to the cache and evicts the least recently used
+        entries if the size cap is exceeded.
+
+        Parameters
+        ----------
+        key : str
+            Key returned by fingerprint().
+        entry : dict
+            Dictionary of DataFrames and JSON serializable dicts.
+
+        """
+        os.makedirs(self.path, exist_ok=True)
+
+        meta = {}
+        arrays = {}
+        for name, value in entry.items():
+            if isinstance(value, pd.DataFrame):
+                meta[name] = {'type': 'frame',
+                              'columns': [str(c) for c in value.columns]}
+                arrays[name + '/index'] = self.__to_array__(value.index)
+                for i, column in enumerate(value.columns):
+                    arrays[name + '/' + str(i)] = \
+                        self.__to_array__(value[column])
+            elif isinstance(value, dict):
+                meta[name] = {'type': 'dict',
+                              'data': {str(k): self.__to_json__(v)
+                                       for k, v in value.items()}}
+            else:
+                raise TypeError('Cannot cache %s' % type(value))
+
+        arrays['__meta__'] = np.array(json.dumps(meta))
+
+        # Write to a temporary file first, so that concurrent readers never
+        # see incomplete entries.
+        fd, tmp_filename = tempfile.mkstemp(suffix='.tmp', dir=self.path)
+        with os.fdopen(fd, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_filename, self.filename(key))
+
+        self.evict()
+
+    def evict(self):
+        """Deletes least recently used entries until size <= max_size."""
+
+        entries = self.__entries__()
+        size = sum(entry[2] for entry in entries)
+
+        for filename, _, entry_size in sorted(entries, key=lambda x: x[1]):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+            size -= entry_size
+
+    def clear(self):
+        """Deletes all entries."""
+
+        for filename, _, _ in self.__entries__():
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+
+    @property
+    def size(self):
+        """
+        Returns
+        -------
+        int
+            Size of all cache entries in bytes.
+
+        """
+        return sum(entry[2] for entry in self.__entries__())
+
+    def __entries__(self):
+        """Returns [filename, last access, size] of all cache entries."""
+
+        entries = []
+        if not os.path.isdir(self.path):
+            return entries
+
+        for filename in os.listdir(self.path):
+            if not filename.endswith('.npz'):
+                continue
+            filename = os.path.join(self.path, filename)
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                continue
+            entries.append([filename, stat.st_mtime, stat.st_size])
+
+        return entries
+
+    @staticmethod
+    def __to_array__(values):
+        array = np.asarray(values)
+        if array.dtype == object:
+            array = array.astype(str)
+        return array
+
+    @staticmethod
+    def __to_json__(value):
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
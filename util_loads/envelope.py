@@ -0,0 +1,133 @@
+#%% Import Libraries and Data
+
+# Third-party imports
+import numpy as np
+import pandas as pd
+
+# Local imports
+
+#%%
+
+
+class Envelope:
+    """
+    Streaming element-wise maximum of equally shaped DataFrames (e.g. the
+    'bend' or 'oper' results of all loadcases).
+
+    Every added frame updates the maximum and the label of the frame that
+    holds it (argmax) in place, so memory does not grow with the number of
+    frames. NaN values are skipped, like in DataFrame.max().
+
+    .. code-block:: python
+
+        from util_loads.envelope import Envelope
+
+        envelope = Envelope()
+        for index, (loadcase, result) in enumerate(propeller.loadcases):
+            envelope.add(result['bend'], label=index)
+
+        envelope.frame()     # Maximum of every station and column
+        envelope.critical()  # Loadcase that drives every station and column
+
+    """
+
+    def __init__(self):
+        self.__max = None
+        self.__argmax = None
+        self.__index = None
+        self.__columns = None
+        self.__dtypes = None
+        self.__frame = None
+        self.labels = []
+
+    def __repr__(self):
+        return 'Envelope of ' + str(len(self.labels)) + ' frames'
+
+    def __len__(self):
+        return len(self.labels)
+
+    def add(self, frame, label=None):
+        """
+        Adds a frame to the envelope.
+
+        Parameters
+        ----------
+        frame : DataFrame
+            Must have the same index and columns as the first frame.
+        label : optional
+            Name of the frame, returned by critical(). The default is the
+            number of the frame. On ties (equal values or NaN in both), the
+            smaller label is critical, so the result does not depend on 
+            the order the frames are added in. Labels must be comparable.
+
+        """
+        if label is None:
+            label = len(self.labels)
+        values = frame.to_numpy(dtype=float)
+
+        if self.__max is None:
+            self.__max = values.copy()
+            self.__argmax = np.zeros(values.shape, dtype=int)
+            self.__index = frame.index
+            self.__columns = frame.columns
+            self.__dtypes = frame.dtypes
+        else:
+            if values.shape != self.__max.shape \
+                    or not frame.columns.equals(self.__columns):
+                raise ValueError('Frame does not match the envelope: %s, '
+                                 'expected %s' % (values.shape,
+                                                  self.__max.shape))
+
+            greater = (values > self.__max) \
+                | (np.isnan(self.__max) & ~np.isnan(values))
+            tie = (values == self.__max) \
+                | (np.isnan(self.__max) & np.isnan(values))
+            if tie.any():
+                labels = np.empty(len(self.labels), dtype=object)
+                labels[:] = self.labels
+                greater |= tie & (labels[self.__argmax] > label) \
+                    .astype(bool)
+            np.copyto(self.__max, values, where=greater)
+            self.__argmax[greater] = len(self.labels)
+
+        self.labels.append(label)
+        self.__frame = None
+
+    def frame(self):
+        """
+        Returns
+        -------
+        DataFrame
+            Element-wise maximum of all added frames, with the columns'
+            original dtypes where possible.
+
+        """
+        if self.__max is None:
+            return None
+
+        if self.__frame is None:
+            frame = pd.DataFrame(self.__max, index=self.__index,
+                                 columns=self.__columns)
+            for column, dtype in self.__dtypes.items():
+                if dtype != frame[column].dtype \
+                        and not frame[column].isna().any():
+                    frame[column] = frame[column].astype(dtype)
+            self.__frame = frame
+
+        return self.__frame
+
+    def critical(self):
+        """
+        Returns
+        -------
+        DataFrame
+            Label of the frame that holds the maximum of every element.
+
+        """
+        if self.__max is None:
+            return None
+
+        labels = np.asarray(self.labels, dtype=object)
+
+        return pd.DataFrame(labels[self.__argmax], index=self.__index,
+                            columns=self.__columns)
@@ -0,0 +1,383 @@
+#%% Import Libraries and Data
+
+# Third-party imports
+import os
+import numpy as np
+import pandas as pd
+
+# Local imports
+
+#%% Column specifications of XFOIL and XROTOR output files
+
+POLAR_COLSPECS = [(1, 8), (10, 17), (20, 27), (30, 37), (39, 46),
+                  (49, 55), (58, 64), (66, 73), (74, 82)]
+
+DUMP_COLSPECS = [(3, 10), (12, 19), (20, 28), (29, 37), (39, 47),
+                 (49, 57), (59, 67), (70, 77), (78, 87), (88, 96),
+                 (97, 105), (106, 114)]
+
+OPER_VALUE_COLSPECS = [[(1, 12), (15, 24)],
+                       [(28, 39), (42, 51)],
+                       [(54, 65), (69, 78)]]
+
+OPER_COLSPECS = [(1, 4), (4, 9), (10, 16), (16, 25), (25, 30), (33, 39),
+                 (40, 47), (48, 53), (54, 60), (61, 66), (67, 74)]
+
+BEND_COLSPECS = [(1, 3), (4, 10), (11, 18), (19, 26), (28, 34), (35, 46),
+                 (48, 59), (61, 72), (74, 85), (87, 98), (100, 111)]
+
+#%% Basic functions
+
+
+def read_lines(source):
+    """
+    Returns the lines of a file or an in-memory buffer.
+
+    Parameters
+    ----------
+    source : str, os.PathLike, bytes or file-like object
+        Filename/ Path, the content itself as bytes (e.g. subprocess
+        stdout) or an open file/ io.StringIO/ io.BytesIO.
+
+    Returns
+    -------
+    lines : list
+        List of str, without line breaks.
+
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            source = f.read()
+    elif hasattr(source, 'read'):
+        source = source.read()
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = bytes(source).decode(errors='replace')
+
+    return source.splitlines()
+
+
+def to_float(field):
+    """
+    Converts a field to float. Empty fields and Fortran overflow fields
+    (``********``) are returned as np.nan.
+
+    """
+    try:
+        return float(field)
+    except ValueError:
+        return np.nan
+
+
+def header_names(line, colspecs):
+    """Returns the column names of a header line sliced by colspecs."""
+
+    return [line[start:stop].strip() for start, stop in colspecs]
+
+
+def parse_fixed_width(lines, colspecs, nrows=None, stop_at_text=False):
+    """
+    Parses fixed-width lines into a 2D np.array in one pass.
+
+    Parameters
+    ----------
+    lines : list
+        List of str.
+    colspecs : list
+        [start, stop) of every column.
+    nrows : int, optional
+        Maximum number of rows. The default is None (all lines).
+    stop_at_text : bool, optional
+        Stop at the first line whose first field is not a number (i.e. the
+        end of a table). The default is False.
+
+    Returns
+    -------
+    data : np.array
+        Shape (rows, columns). Empty and overflow fields are np.nan.
+
+    """
+    rows = []
+
+    for line in lines:
+        if nrows is not None and len(rows) >= nrows:
+            break
+        if not line.strip():
+            continue
+
+        row = [to_float(line[start:stop]) for start, stop in colspecs]
+
+        if stop_at_text and np.isnan(row[0]) \
+                and '*' not in line[colspecs[0][0]:colspecs[0][1]]:
+            break
+        rows.append(row)
+
+    return np.array(rows, dtype=float).reshape(-1, len(colspecs))
+
+
+def parse_whitespace(lines, n_columns):
+    """
+    Parses whitespace separated lines into a 2D np.array. Lines with a
+    different number of fields (e.g. headers) are skipped.
+
+    """
+    rows = []
+
+    for line in lines:
+        fields = line.split()
+        if len(fields) != n_columns:
+            continue
+        row = [to_float(field) for field in fields]
+        if all(np.isnan(row)):
+            continue
+        rows.append(row)
+
+    return np.array(rows, dtype=float).reshape(-1, n_columns)
+
+#%%
+
+
+class Table:
+    """
+    Parsed tabular data: a 2D np.array with column names.
+
+    Columns are accessed by name and returned as views of the array,
+    to_frame() returns a DataFrame.
+
+    .. code-block:: python
+
+        from util_loads import parsers
+
+        table = parsers.parse_polar('polar.txt')
+        alpha = table['alpha']
+        polar = table.to_frame()
+
+    Parameters
+    ----------
+    columns : list
+        Column names.
+    data : np.array
+        Shape (rows, len(columns)).
+    integer : list, optional
+        Names of integer columns (e.g. XROTORs station index 'i').
+
+    """
+
+    def __init__(self, columns, data, integer=()):
+        self.columns = list(columns)
+        self.data = data
+        self.integer = [name for name in integer if name in self.columns]
+
+    def __repr__(self):
+        return 'Table ' + str(self.columns) + ' (' + str(len(self)) + ' rows)'
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def __getitem__(self, name):
+        return self.data[:, self.columns.index(name)]
+
+    def to_frame(self):
+        """
+        Returns
+        -------
+        DataFrame
+            Float columns share memory with the array where pandas allows it.
+
+        """
+        df = pd.DataFrame(self.data, columns=self.columns, copy=False)
+
+        for name in self.integer:
+            if not np.isnan(df[name]).any():
+                df[name] = df[name].astype(int)
+
+        return df
+
+#%% XFOIL
+
+
+def parse_coordinates(source):
+    """
+    Parses an airfoil coordinates file. The name line is skipped.
+
+    Returns
+    -------
+    Table
+        Columns 'X', 'Y'.
+
+    """
+    data = parse_whitespace(read_lines(source), 2)
+    data = data[~np.isnan(data).any(axis=1)]
+
+    return Table(['X', 'Y'], data)
+
+
+def parse_cp_vs_x(source):
+    """
+    Parses an XFOIL CPWR file. Works with both the ``x Cp`` and the
+    ``x y Cp`` format.
+
+    Returns
+    -------
+    Table
+        Columns 'x', 'Cp'.
+
+    """
+    lines = read_lines(source)
+
+    names = []
+    for line in lines:
+        if line.lstrip().startswith('#'):
+            names = line.lstrip()[1:].split()
+            break
+
+    n_columns = len(names) if names else 2
+    data = parse_whitespace(lines, n_columns)
+
+    x = names.index('x') if 'x' in names else 0
+    cp = names.index('Cp') if 'Cp' in names else n_columns - 1
+
+    return Table(['x', 'Cp'], data[:, [x, cp]])
+
+
+def parse_dump(source, colspecs=DUMP_COLSPECS):
+    """
+    Parses an XFOIL DUMP file. The column names are taken from the header
+    line. Wake points have empty fields (np.nan).
+
+    Parameters
+    ----------
+    source : str, os.PathLike, bytes or file-like object
+    colspecs : list, optional
+        Columns to parse. The default is all columns.
+
+    Returns
+    -------
+    Table
+
+    """
+    lines = read_lines(source)
+
+    return Table(header_names(lines[0], colspecs),
+                 parse_fixed_width(lines[1:], colspecs))
+
+
+def parse_polar(source, columns=None, sort=True):
+    """
+    Parses an XFOIL polar (PACC) file. The table header is located by its
+    content, so the number of preceding lines does not matter.
+
+    Parameters
+    ----------
+    source : str, os.PathLike, bytes or file-like object
+    columns : list, optional
+        Column names, if source contains no header (e.g. the lines appended
+        to a polar file since the last read). The default is None.
+    sort : bool, optional
+        Sort by alpha, drop duplicate points and add the column 'index'
+        (row number in the file). The default is True.
+
+    Returns
+    -------
+    Table
+
+    """
+    lines = read_lines(source)
+    start = 0
+
+    for i, line in enumerate(lines):
+        if 'alpha' in line.split():
+            columns = line.split()
+            start = i + 2  # Skip separator line
+            break
+
+    if columns is None:
+        return Table([], np.empty((0, 0)))
+
+    data = parse_fixed_width(lines[start:], POLAR_COLSPECS[:len(columns)])
+    data = data[~np.isnan(data[:, 0])]
+
+    if not sort:
+        return Table(columns, data)
+
+    order = np.argsort(data[:, 0], kind='stable')
+    data = data[order]
+
+    # Drop duplicate points, keep the first one
+    _, first = np.unique(data, axis=0, return_index=True)
+    keep = np.sort(first)
+
+    return Table(['index'] + columns,
+                 np.column_stack([order[keep], data[keep]]),
+                 integer=['index'])
+
+#%% XROTOR
+
+
+def parse_oper(source):
+    """
+    Parses the output file of XROTORs OPER routine.
+
+    Returns
+    -------
+    single_values : dict
+        Operating point values as float, e.g. 'thrust(N)'. Overflow fields
+        are np.nan.
+    Table
+        Radial distribution.
+
+    """
+    lines = read_lines(source)
+
+    # Single values: 7 lines after the first block header
+    value_lines = [line for line in lines[3:] if line.strip()][1:8]
+
+    single_values = {}
+    for line in value_lines:
+        for (key_start, key_stop), (start, stop) in OPER_VALUE_COLSPECS:
+            key = line[key_start:key_stop].strip()
+            field = line[start:stop].strip()
+            value = to_float(field)
+            if key and (not np.isnan(value) or '*' in field):
+                single_values[key] = value
+
+    # Radial distribution: table starts at the 'i  r/R ...' line
+    for i, line in enumerate(lines):
+        fields = line.split()
+        if fields[:2] == ['i', 'r/R']:
+            break
+    else:
+        raise ValueError('No OPER table found')
+
+    table = Table(header_names(lines[i], OPER_COLSPECS),
+                  parse_fixed_width(lines[i + 1:], OPER_COLSPECS,
+                                    stop_at_text=True),
+                  integer=['i'])
+
+    return single_values, table
+
+
+def parse_bend(source, nrows=29):
+    """
+    Parses the output file of XROTORs BEND routine.
+
+    Parameters
+    ----------
+    source : str, os.PathLike, bytes or file-like object
+    nrows : int, optional
+        Maximum number of radial stations. The default is 29.
+
+    Returns
+    -------
+    Table
+
+    """
+    lines = read_lines(source)
+
+    # The 3rd line is skipped, the header is the 2nd non-empty line
+    lines = [line for i, line in enumerate(lines) if i != 2 and line.strip()]
+
+    return Table(header_names(lines[1], BEND_COLSPECS),
+                 parse_fixed_width(lines[2:], BEND_COLSPECS, nrows=nrows,
+                                   stop_at_text=True),
+                 integer=['i'])
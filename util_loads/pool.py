@@ -0,0 +1,192 @@
+#%% Import Libraries and Data
+
+# Third-party imports
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+# Local imports
+
+#%% Worker functions
+
+
+def run_in_scratch(func, *args, **kwargs):
+    """
+    Runs func in a new temporary directory, which is deleted afterwards.
+    XFOIL and XROTOR write their input and output files with fixed names
+    into the current directory, so every job needs its own directory.
+
+    """
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory(prefix='_xpool_') as scratch:
+        os.chdir(scratch)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            os.chdir(cwd)
+
+
+def _cp_vs_x(airfoil, mode, value, xtr):
+    return airfoil.cp_vs_x(mode, value, xtr)
+
+
+def _set_polar(airfoil, alpha_start, alpha_stop, alpha_inc):
+    airfoil.set_polar(alpha_start, alpha_stop, alpha_inc)
+    return airfoil.polar, airfoil.xrotor_characteristics
+
+
+def _calc_loadcase(propeller, loadcase):
+    return propeller.calc_loadcase(loadcase)
+
+#%%
+
+
+class XfoilPool:
+    """
+    Runs XFOIL (and XROTOR) jobs concurrently in N worker processes. Every 
+    job runs in its own temporary directory.
+
+    The pool works with a context manager:
+
+    .. code-block:: python
+
+        from util_loads import XfoilPool
+
+        with XfoilPool(workers=8) as pool:
+            futures = pool.map_cp_vs_x(airfoil, 'cl', [0.2, 0.4, 0.6])
+            pressures, cf, polar = futures[0].result()
+
+            pool.set_polars([airfoil1, airfoil2], alpha_start=-7)
+
+            propeller.calc_loads(pool=pool)  # All loadcases concurrently
+
+    Parameters
+    ----------
+    workers : int, optional
+        Number of worker processes. The default is the number of CPUs.
+
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.__executor = None
+
+    def __repr__(self):
+        return 'XfoilPool (' + str(self.workers) + ' workers)'
+
+    def __enter__(self):
+        self.__executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.__executor.shutdown(wait=True)
+        self.__executor = None
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Submits func(*args, **kwargs) to the pool. func must be picklable
+        (i.e. defined at module level).
+
+        Returns
+        -------
+        Future
+
+        """
+        if self.__executor is None:
+            raise RuntimeError('XfoilPool must be used as context manager')
+
+        return self.__executor.submit(run_in_scratch, func, *args, **kwargs)
+
+    def submit_cp_vs_x(self, airfoil, mode, value, xtr=[1, 1]):
+        """
+        Submits Airfoil.cp_vs_x(mode, value, xtr) to the pool.
+
+        Returns
+        -------
+        Future
+            Resolves to the return value of Airfoil.cp_vs_x().
+
+        """
+        return self.submit(_cp_vs_x, airfoil, mode, value, list(xtr))
+
+    def submit_polar(self, airfoil, alpha_start=-20, alpha_stop=20,
+                     alpha_inc=0.25):
+        """
+        Submits Airfoil.set_polar() to the pool. The airfoil instance in
+        this process is not changed.
+
+        Returns
+        -------
+        Future
+            Resolves to (polar, xrotor_characteristics).
+
+        """
+        return self.submit(_set_polar, airfoil,
+                           alpha_start, alpha_stop, alpha_inc)
+
+    def submit_loadcase(self, propeller, loadcase):
+        """
+        Submits the XROTOR run of one loadcase, Propeller.calc_loadcase(),
+        to the pool.
+
+        Returns
+        -------
+        Future
+            Resolves to the result dictionary (single_values, oper, bend).
+
+        """
+        return self.submit(_calc_loadcase, propeller, loadcase)
+
+    def map_cp_vs_x(self, airfoil, mode, values, xtr=[1, 1]):
+        """
+        Submits Airfoil.cp_vs_x() for all values.
+
+        Returns
+        -------
+        list
+            List of Futures, same order as values.
+
+        """
+        return [self.submit_cp_vs_x(airfoil, mode, value, xtr)
+                for value in values]
+
+    def cp_vs_x_batch(self, requests):
+        """
+        Submits many Airfoil.cp_vs_x() requests.
+
+        Parameters
+        ----------
+        requests : list
+            List of [airfoil, mode, value] or [airfoil, mode, value, xtr].
+
+        Returns
+        -------
+        list
+            List of Futures, same order as requests.
+
+        """
+        return [self.submit_cp_vs_x(*request) for request in requests]
+
+    def set_polars(self, airfoils, alpha_start=-20, alpha_stop=20,
+                   alpha_inc=0.25):
+        """
+        Calculates the polars of all airfoils concurrently and assigns
+        polar and xrotor_characteristics to the airfoil instances.
+
+        Parameters
+        ----------
+        airfoils : list
+            List of Airfoil instances.
+
+        """
+        # Every instance only once (e.g. the same airfoil at several radii)
+        airfoils = list({id(airfoil): airfoil for airfoil in airfoils}
+                        .values())
+
+        futures = [self.submit_polar(airfoil, alpha_start, alpha_stop,
+                                     alpha_inc)
+                   for airfoil in airfoils]
+
+        for airfoil, future in zip(airfoils, futures):
+            airfoil.polar, airfoil.xrotor_characteristics = future.result()
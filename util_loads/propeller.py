@@ -4,61 +4,309 @@
 import numpy as np
 import pandas as pd
 import bisect
-import math
+from concurrent.futures import Future, as_completed
 
 # Local imports
 from .xrotor import Xrotor
-from .support import cleanup #, print_call
+from .bem import Bem
+from .loadcase import Loadcase
+from .cache import ResultCache
+from .envelope import Envelope
+from .support import NORM_GRID, resample #, print_call
 from .airfoil import Airfoil
 
 #%%
 
 
 class Propeller:
+    
+    # Cache for loadcase results and operating maps, shared by all 
+    # propellers. Set to None to always run XROTOR.
+    cache = ResultCache()
 
-    def __init__(self, number_of_blades, tip_radius, hub_radius):
+    def __init__(self, number_of_blades, tip_radius, hub_radius,
+                 backend='xrotor'):
         self.parameters = {'number_of_blades': number_of_blades,
                            'tip_radius': tip_radius,
                            'hub_radius': hub_radius,
                            }
+        
+        # 'xrotor' or 'bem' (see Bem): solver of calc_loads(), 
+        # calc_loadcase() and operating_map()
+        self.backend = backend
 
         self.__loadcases = []
-        self.__load_envelope = {}
+        self.__envelope = {'bend': Envelope(), 'oper': Envelope()}
         self.__geometry = []
         self.__sections = []
 
     def __repr__(self):
         return str(self.parameters)
 
-    @cleanup
-    def calc_loads(self):
+    def calc_loads(self, pool=None):
+        """
+        Runs XROTOR for all loadcases and stores the results in loadcases.
+        The load envelope is updated in place with every result.
+        
+        With backend 'bem', all loadcases are solved at once by Bem.
+
+        Parameters
+        ----------
+        pool : XfoilPool, optional
+            Running XfoilPool: the loadcases run concurrently, results are 
+            merged into loadcases and the load envelope as they arrive. Not
+            used by backend 'bem'. The default is None.
 
+        """
+        self.__envelope = {'bend': Envelope(), 'oper': Envelope()}
+        
+        bem = self.__bem__()
+        if bem is not None:
+            results = bem.run([i[0] for i in self.loadcases])
+            for index, ((loadcase, result), bem_result) in enumerate(
+                    zip(self.loadcases, results)):
+                result.update(bem_result)
+                self.__update_load_envelope__(index, result)
+            return
+        
+        if pool is None:
+            for index, (loadcase, result) in enumerate(self.loadcases):
+                result.update(self.calc_loadcase(loadcase))
+                self.__update_load_envelope__(index, result)
+            return
+        
+        futures = {}
+        for index, (loadcase, result) in enumerate(self.loadcases):
+            cached = self.__load_cached_loadcase__(loadcase)
+            if cached is not None:
+                result.update(cached)
+                self.__update_load_envelope__(index, result)
+            else:
+                futures[pool.submit_loadcase(self, loadcase)] = index
+        
+        # The envelope breaks ties by the loadcase index, so the completion
+        # order does not matter
+        for future in as_completed(futures):
+            index = futures[future]
+            result = self.loadcases[index][1]
+            result.update(future.result())
+            self.__update_load_envelope__(index, result)
+
+    def calc_loadcase(self, loadcase):
+        """
+        Runs XROTOR for one loadcase. Results are cached by a hash of the 
+        aerodynamic model (see __aero_fingerprint__) and the loadcase.
+        Backend 'bem' is not cached.
+
+        Parameters
+        ----------
+        loadcase : Loadcase
+
+        Returns
+        -------
+        Dict
+            single_values, oper and bend.
+
+        """
+        bem = self.__bem__()
+        if bem is not None:
+            return bem.run([loadcase])[0]
+        
+        result = self.__load_cached_loadcase__(loadcase)
+        if result is not None:
+            return result
+        
+        result = self.__run_loadcase__(loadcase)
+        
+        if self.cache is not None:
+            self.cache.store(self.__loadcase_key__(loadcase), result)
+        
+        return result
+    
+    def __bem__(self):
+        """Returns a Bem solver for backend 'bem', None for 'xrotor'."""
+        
+        if self.backend == 'xrotor':
+            return None
+        elif self.backend == 'bem':
+            return Bem(self)
+        else:
+            raise ValueError('Invalid backend %s' % self.backend)
+    
+    def __loadcase_key__(self, loadcase):
+        """Returns the cache key of a loadcase."""
+        
+        return self.cache.fingerprint('loadcase',
+                                      self.__aero_fingerprint__(),
+                                      loadcase.flight_speed,
+                                      loadcase.data)
+    
+    def __load_cached_loadcase__(self, loadcase):
+        """Returns the cached result of a loadcase or None."""
+        
+        if self.cache is None:
+            return None
+        
+        return self.cache.load(self.__loadcase_key__(loadcase))
+    
+    def __run_loadcase__(self, loadcase):
+        """Runs XROTOR for one loadcase, see calc_loadcase()."""
+        
         oper_file = '_xrotor_oper.txt'
         bend_file = '_xrotor_bend.txt'
+        
+        with Xrotor(self, loadcase, in_memory=True) as x:
+            x.run('atmo 0')  # Set fluid properties from ISA 0km
+            x.arbi()  # Input arbitrary rotor geometry
+            x.parse_airfoils()
+            x.run('oper')  # Calculate off-design operating points
+            x.run('iter')
+            x.run(200)
+            for field in loadcase.data:
+                x.run(field)
+            x.run('writ ' + oper_file)
+            x.run('o')
+            x.run('')  # return
+            x.run('bend')  # Write current operating point to disk file
+            x.run('eval')  # Evaluate structural loads and deflections
+            x.run('writ ' + bend_file)
+            x.run('o')
+            x.run('')  # return
+            x.run('quit')  # Exit program
+        
+        if oper_file not in x.outputs or bend_file not in x.outputs:
+            raise RuntimeError('XROTOR wrote no results for ' + str(loadcase)
+                               + (' (timed out)' if x.timed_out else ''))
+        
+        result = {}
+        result['single_values'], result['oper'] = \
+            Xrotor.read_oper_output(x.outputs[oper_file])
+        result['bend'] = Xrotor.read_bend_output(x.outputs[bend_file])
+        
+        return result
+
+    def operating_map(self, rpm, advance_ratio):
+        """
+        Calculates a propeller map: all combinations of rpm and advance 
+        ratio are evaluated in one XROTOR run. The results are cached by a
+        hash of the geometry and sections. With backend 'bem', all points
+        are solved at once by Bem (not cached).
+
+        .. code-block:: python
+
+            op_map = propeller.operating_map(rpm=np.linspace(1000, 4000, 7),
+                                             advance_ratio=[0.1, 0.2, 0.3])
+            plt.contourf(op_map['adv. ratio'], op_map['rpm'], 
+                         op_map['thrust(N)'])
+
+        Parameters
+        ----------
+        rpm : np.array
+            Rotational speeds [1/min].
+        advance_ratio : np.array
+            Advance ratios J = V / (n * D).
+
+        Returns
+        -------
+        Dict
+            'rpm' and 'adv. ratio': the grid axes (np.array). All other OPER
+            single values (e.g. 'thrust(N)', 'torque(N-m)', 'power(W)', 
+            'Efficiency') as np.array of shape (len(rpm), 
+            len(advance_ratio)). Failed points are np.nan.
 
-        for loadcase, result in self.loadcases:
-            with Xrotor(self, loadcase) as x:
-                x.run('atmo 0')  # Set fluid properties from ISA 0km
-                x.arbi()  # Input arbitrary rotor geometry
-                x.parse_airfoils()
-                x.run('oper')  # Calculate off-design operating points
-                x.run('iter')
-                x.run(200)
-                for field in loadcase.data:
-                    x.run(field)
-                x.run('writ ' + oper_file)
-                x.run('o')
-                x.run('')  # return
-                x.run('bend')  # Write current operating point to disk file
-                x.run('eval')  # Evaluate structural loads and deflections
-                x.run('writ ' + bend_file)
-                x.run('o')
-                x.run('')  # return
-                x.run('quit')  # Exit program
-
-            result['single_values'], result['oper'] = \
-                Xrotor.read_oper_output(oper_file)
-            result['bend'] = Xrotor.read_bend_output(bend_file)
+        """
+        rpm = np.atleast_1d(np.asarray(rpm, dtype=float))
+        advance_ratio = np.atleast_1d(np.asarray(advance_ratio, dtype=float))
+        
+        points = None
+        bem = self.__bem__()
+        if bem is not None:
+            points = self.__run_operating_map__(rpm, advance_ratio, bem)
+        elif self.cache is not None:
+            key = self.cache.fingerprint('operating_map',
+                                         self.__aero_fingerprint__(),
+                                         rpm, advance_ratio)
+            entry = self.cache.load(key)
+            if entry is not None:
+                points = entry['points']
+        
+        if points is None:
+            points = self.__run_operating_map__(rpm, advance_ratio)
+            if self.cache is not None:
+                self.cache.store(key, {'points': points})
+        
+        op_map = {'rpm': rpm, 'adv. ratio': advance_ratio}
+        shape = (len(rpm), len(advance_ratio))
+        for column in points.columns:
+            if column not in op_map:
+                op_map[column] = points[column].to_numpy().reshape(shape)
+        
+        return op_map
+    
+    def __run_operating_map__(self, rpm, advance_ratio, bem=None):
+        """
+        Runs XROTOR (or bem, a Bem solver) for all combinations of rpm and 
+        advance_ratio (rpm major) and returns the OPER single values as 
+        DataFrame, one row per point.
+
+        """
+        grid_rpm, grid_j = [x.ravel() for x in np.meshgrid(rpm, advance_ratio,
+                                                            indexing='ij')]
+        # Flight speed from J = V / (n * D), XROTOR needs V > 0
+        speed = np.maximum(grid_j * grid_rpm / 60 
+                           * 2 * self.parameters['tip_radius'], 0.01)
+        
+        if bem is not None:
+            loadcases = []
+            for i in range(len(speed)):
+                loadcases.append(Loadcase('Operating map', speed[i]))
+                loadcases[i].set_data('rpm', grid_rpm[i])
+            rows = [result['single_values'] for result in bem.run(loadcases)]
+            return pd.DataFrame(rows, index=range(len(rows)), dtype=float)
+        
+        loadcase = Loadcase('Operating map', speed[0])
+        oper_files = ['_xrotor_oper_%i.txt' % i for i in range(len(speed))]
+        
+        with Xrotor(self, loadcase, in_memory=True,
+                    timeout=Xrotor.default_timeout + len(speed)) as x:
+            x.run('atmo 0')  # Set fluid properties from ISA 0km
+            x.arbi()  # Input arbitrary rotor geometry
+            x.parse_airfoils()
+            x.run('oper')  # Calculate off-design operating points
+            x.run('iter')
+            x.run(200)
+            for i in range(len(speed)):
+                x.run('velo')
+                x.run(speed[i])
+                x.run('rpm')
+                x.run(grid_rpm[i])
+                x.run('writ ' + oper_files[i])
+            x.run('')  # return
+            x.run('quit')  # Exit program
+        
+        rows = []
+        for oper_file in oper_files:
+            try:
+                single_values, _ = Xrotor.read_oper_output(
+                    x.outputs[oper_file])
+            except (KeyError, ValueError, IndexError):
+                single_values = {}  # No output: XROTOR failed at this point
+            rows.append(single_values)
+        
+        return pd.DataFrame(rows, index=range(len(rows)), dtype=float)
+    
+    def __aero_fingerprint__(self):
+        """
+        Returns everything that defines the aerodynamic model: parameters,
+        geometry and the section airfoils (coordinates, parameters and 
+        XROTOR characteristics). Input to ResultCache.fingerprint().
+
+        """
+        return [self.parameters,
+                self.geometry,
+                [[rel_radius, airfoil.coordinates, airfoil.parameters,
+                  airfoil.xrotor_characteristics]
+                 for rel_radius, airfoil in self.sections]]
 
     @property
     def geometry(self):
@@ -83,22 +331,45 @@ class Propeller:
 
     @property
     def load_envelope(self):
-        return self.__load_envelope
+        """
+        Returns
+        -------
+        dict
+            Element-wise maximum of the 'bend' and 'oper' results of all 
+            loadcases, as DataFrames.
 
-    def set_load_envelope(self):
-        loads = [i[1] for i in self.loadcases]
+        """
+        return {key: envelope.frame() 
+                for key, envelope in self.__envelope.items() 
+                if len(envelope)}
 
-        bend = [i['bend'] for i in loads]
-        oper = [i['oper'] for i in loads]
-        # single_values = [i['single_values'] for i in loads]
+    @property
+    def critical_loadcases(self):
+        """
+        Returns
+        -------
+        dict
+            Index of the loadcase that drives every value of the load 
+            envelope ('bend' and 'oper'), as DataFrames.
 
-        def envelope(loadcase_list):
-            return pd.concat(loadcase_list).groupby(level=0).max()
+        """
+        return {key: envelope.critical() 
+                for key, envelope in self.__envelope.items() 
+                if len(envelope)}
 
-        self.__load_envelope = {'bend': envelope(bend),
-                                'oper': envelope(oper),
-                                # 'single_values': envelope(single_values),
-                                }
+    def set_load_envelope(self):
+        """Rebuilds the load envelope from the results of all loadcases."""
+        
+        self.__envelope = {'bend': Envelope(), 'oper': Envelope()}
+        
+        for index, (loadcase, result) in enumerate(self.loadcases):
+            self.__update_load_envelope__(index, result)
+    
+    def __update_load_envelope__(self, index, result):
+        """Adds the result of loadcase index to the load envelope."""
+        
+        for key, envelope in self.__envelope.items():
+            envelope.add(result[key], label=index)
         
     @property
     def loadcases(self):
@@ -131,74 +402,303 @@ class Propeller:
     def parameters(self, parameters):
         self.__parameters = parameters
     
+    def station_state(self, rel_radius, loadcase='envelope'):
+        """
+        Returns the aerodynamic state of a radial station. The lift, drag 
+        and Reynolds number are interpolated from the XROTOR results, the 
+        pressure distribution and skin friction are computed for the 
+        neighbouring airfoil sections and blended.
+
+        Parameters
+        ----------
+        rel_radius : Float
+            Relative radius: 0..1.
+        loadcase : 'envelope' or int, optional
+            Index of loadcase. The default is 'envelope'.
+
+        Returns
+        -------
+        Dict
+            Cl, Cd, alpha, Re, pressures (DataFrame: x, Cp_suc, Cp_pres) 
+            and cf (DataFrame: x, Cf).
+
+        """
+        return self.station_states([rel_radius], loadcase)[0]
+    
+    def station_states(self, rel_radii, loadcase='envelope', pool=None):
+        """
+        Returns the aerodynamic states of many radial stations, see 
+        station_state(). If an XfoilPool is given, all XFOIL runs are 
+        submitted at once and run concurrently.
+
+        Parameters
+        ----------
+        rel_radii : list
+            Relative radii: 0..1.
+        loadcase : 'envelope' or int, optional
+            Index of loadcase. The default is 'envelope'.
+        pool : XfoilPool, optional
+            Running XfoilPool. The default is None.
+
+        Returns
+        -------
+        List
+            One state dictionary per station.
+
+        """
+        if loadcase == 'envelope':
+            df = self.load_envelope['oper']
+        else:
+            df = self.loadcases[loadcase][1]['oper']
+        
+        df = df.sort_values(['r/R'])
+        
+        cl = np.interp(rel_radii, df['r/R'], df['CL'])
+        cd = np.interp(rel_radii, df['r/R'], df['Cd'])
+        re = np.interp(rel_radii, df['r/R'], df['REx10^3'])*1000
+        
+        weights = [self.__section_weights__(rel_radius) 
+                   for rel_radius in rel_radii]
+        
+        # Start all XFOIL runs, then collect the results
+        results = [[self.__cp_vs_x__(airfoil, cl[idx], pool=pool)
+                    for airfoil, _ in station]
+                   for idx, station in enumerate(weights)]
+        
+        states = []
+        for idx, station in enumerate(weights):
+            results[idx] = [result.result() if isinstance(result, Future)
+                            else result for result in results[idx]]
+            
+            pressures, cf, polar = [
+                sum(weight * result[i] 
+                    for (_, weight), result in zip(station, results[idx]))
+                for i in range(3)]
+            
+            states.append({'Cl': cl[idx],
+                           'Cd': cd[idx],
+                           'alpha': polar['alpha'][0],
+                           'Re': re[idx],
+                           'pressures': pressures,
+                           'cf': cf,
+                           })
+        
+        return states
+    
+    @staticmethod
+    def __cp_vs_x__(airfoil, cl, xtr=[1,1], pool=None):
+        """
+        Returns airfoil.cp_vs_x('cl', cl, xtr). The airfoil's cp_table is 
+        used if available, otherwise XFOIL runs (in the pool, if given: 
+        then a Future is returned).
+
+        """
+        if airfoil.cp_table is not None:
+            x = airfoil.cp_table['x']
+            lookup = airfoil.cp_lookup(x, cl)
+            
+            return (pd.DataFrame({'x': x,
+                                  'Cp_suc': lookup['Cp_suc'],
+                                  'Cp_pres': lookup['Cp_pres']}),
+                    pd.DataFrame({'x': x,
+                                  'Cf': lookup['Cf']}),
+                    pd.DataFrame({'alpha': [lookup['alpha'][0]],
+                                  'CL': [cl]}))
+        elif pool is not None:
+            return pool.submit_cp_vs_x(airfoil, 'cl', cl, xtr)
+        else:
+            return airfoil.cp_vs_x('cl', cl, xtr)
+    
+    def __section_weights__(self, rel_radius):
+        """
+        Returns the airfoil sections next to rel_radius and their 
+        interpolation weights.
+
+        Returns
+        -------
+        List
+            [[Airfoil, weight], ...]
+
+        """
+        left, right, fraction = self.__section_indices__([rel_radius])
+        
+        if left[0] == right[0]:
+            return [[self.sections[left[0]][1], 1]]
+        
+        return [[self.sections[left[0]][1], 1 - fraction[0]],
+                [self.sections[right[0]][1], fraction[0]]]
+    
+    def __section_indices__(self, rel_radii):
+        """
+        Returns the indices of the airfoil sections left and right of every
+        relative radius and the interpolation fraction of the right one. 
+        Outside of the sections, left and right are the outermost section.
+
+        Returns
+        -------
+        left : np.array
+        right : np.array
+        fraction : np.array
+
+        """
+        section_radii = np.array([x[0] for x in self.sections])
+        rel_radii = np.asarray(rel_radii, dtype=float)
+        
+        right = np.clip(np.searchsorted(section_radii, rel_radii, 
+                                        side='right'),
+                        1, len(section_radii) - 1)
+        left = right - 1
+        with np.errstate(invalid='ignore', divide='ignore'):
+            fraction = ((rel_radii - section_radii[left])
+                        / (section_radii[right] - section_radii[left]))
+        
+        inside = rel_radii <= section_radii[0]
+        outside = rel_radii >= section_radii[-1]
+        right[inside] = 0
+        left[outside] = len(section_radii) - 1
+        fraction[inside | outside] = 0
+        
+        return left, right, fraction
+    
     # @print_call
     def state(self, rel_chord, rel_radius, loadcase='envelope'):
+        """
+        Returns the aerodynamic state at a point of the blade.
+
+        Parameters
+        ----------
+        rel_chord : Float
+            Relative chord: 0..1.
+        rel_radius : Float
+            Relative radius: 0..1.
+        loadcase : 'envelope' or int, optional
+            Index of loadcase. The default is 'envelope'.
+
+        Returns
+        -------
+        Dict
+            Cl, Cd, alpha, Re, Cp_suc, Cp_pres, Cf.
+
+        """
+        return self.states([rel_chord], [rel_radius], loadcase) \
+            .iloc[0].to_dict()
+    
+    def states(self, rel_chords, rel_radii, loadcase='envelope', pool=None):
+        """
+        Returns the aerodynamic states at many points of the blade, see 
+        state(). 
+        
+        Cl, Cd and Re are interpolated for all points at once. The points 
+        are grouped by the pair of neighbouring airfoil sections: if both 
+        airfoils have a cp_table, pressures and skin friction are looked up
+        for all points of the group at once. Otherwise XFOIL runs once per 
+        distinct radius (see station_states()).
+
+        Parameters
+        ----------
+        rel_chords : np.array
+            Relative chords: 0..1.
+        rel_radii : np.array
+            Relative radii: 0..1. Broadcast against rel_chords.
+        loadcase : 'envelope' or int, optional
+            Index of loadcase. The default is 'envelope'.
+        pool : XfoilPool, optional
+            Running XfoilPool, to run XFOIL concurrently. The default is 
+            None.
+
+        Returns
+        -------
+        DataFrame
+            One row per point. Columns: Cl, Cd, alpha, Re, Cp_suc, Cp_pres,
+            Cf. (Use .to_records() for a structured np.array.)
+
+        """
+        rel_chords, rel_radii = np.broadcast_arrays(
+            np.asarray(rel_chords, dtype=float).ravel(),
+            np.asarray(rel_radii, dtype=float).ravel())
         
         if loadcase == 'envelope':
             df = self.load_envelope['oper']
         else:
             df = self.loadcases[loadcase][1]['oper']
-            
-        df = df.append(pd.Series(name='new', dtype=float))
-        df.loc['new','r/R'] = rel_radius
+        
         df = df.sort_values(['r/R'])
-        df = df.interpolate()
         
-        cl = df['CL']['new']
-        cd = df['Cd']['new']
-        re = df['REx10^3']['new']*1000
+        states = {'Cl': np.interp(rel_radii, df['r/R'], df['CL']),
+                  'Cd': np.interp(rel_radii, df['r/R'], df['Cd']),
+                  'alpha': np.zeros(len(rel_radii)),
+                  'Re': np.interp(rel_radii, df['r/R'], df['REx10^3'])*1000,
+                  'Cp_suc': np.zeros(len(rel_radii)),
+                  'Cp_pres': np.zeros(len(rel_radii)),
+                  'Cf': np.zeros(len(rel_radii)),
+                  }
         
-        if math.isnan(cl):
-            cl = df['CL'][0]
-            cd = df['Cd'][0]
-            re = df['REx10^3'][0]*1000
+        left, right, fraction = self.__section_indices__(rel_radii)
+        pairs = left * len(self.sections) + right
+        xfoil = np.zeros(len(rel_radii), dtype=bool)
         
-        if rel_radius <= self.sections[0][0]:
-            airfoil = self.sections[0][1]
-            pressures, cf, polar = airfoil.cp_vs_x('cl', cl)
+        for pair in np.unique(pairs):
+            mask = pairs == pair
+            airfoils = [self.sections[left[mask][0]][1],
+                        self.sections[right[mask][0]][1]]
             
-        elif rel_radius >=self.sections[len(self.sections)-1][0]:
-            airfoil = self.sections[len(self.sections)-1][1]
-            pressures, cf, polar = airfoil.cp_vs_x('cl', cl)
+            if any(airfoil.cp_table is None for airfoil in airfoils):
+                xfoil |= mask
+                continue
             
-        else:
-            index = bisect.bisect([x[0] for x in self.sections],rel_radius)
-            left_section = self.sections[index-1]
-            right_section = self.sections[index]
+            lookups = [airfoil.cp_lookup(rel_chords[mask], 
+                                         states['Cl'][mask])
+                       for airfoil in airfoils]
+            weight = fraction[mask]
             
-            fraction = ((rel_radius - left_section[0])
-                        / (right_section[0] - left_section[0]))
-                
-            ls_p, ls_cf, ls_polar = left_section[1].cp_vs_x('cl', cl)
-            rs_p, rs_cf, rs_polar = right_section[1].cp_vs_x('cl', cl)
-                
-            pressures = ls_p*(1-fraction)+rs_p*(fraction)
-
-            cf = ls_cf*(1-fraction)+rs_cf*(fraction)
+            for key in ['alpha', 'Cp_suc', 'Cp_pres', 'Cf']:
+                states[key][mask] = ((1 - weight) * lookups[0][key] 
+                                     + weight * lookups[1][key])
+        
+        if xfoil.any():
+            points = np.flatnonzero(xfoil)
+            radii, station = np.unique(rel_radii[points], return_inverse=True)
             
-            polar = ls_polar*(1-fraction)+rs_polar*(fraction)
-                   
-        pressures = pressures.append(pd.Series(name='new', dtype=float))
-        pressures['x']['new'] = rel_chord
-        pressures = pressures.sort_values(['x'])
-        pressures = pressures.interpolate()
-        
-        cf = cf.append(pd.Series(name='new', dtype=float))
-        cf['x']['new'] = rel_chord
-        cf = cf.sort_values(['x'])
-        cf = cf.interpolate()        
+            for idx, state in enumerate(self.station_states(radii, loadcase,
+                                                            pool)):
+                station_points = points[station == idx]
+                x = rel_chords[station_points]
+                pressures = state['pressures']
                 
-        return {'Cl': cl,
-                'Cd': cd,
-                'alpha': polar['alpha'][0],
-                'Re': re,
-                'Cp_suc': pressures['Cp_suc']['new'],
-                'Cp_pres': pressures['Cp_pres']['new'],
-                'Cf': cf['Cf']['new'],
-                }
-
-    def pressure_distribution(self, loadcase):
+                states['alpha'][station_points] = state['alpha']
+                states['Cp_suc'][station_points] = \
+                    resample(pressures['x'], pressures['Cp_suc'], x)
+                states['Cp_pres'][station_points] = \
+                    resample(pressures['x'], pressures['Cp_pres'], x)
+                states['Cf'][station_points] = \
+                    resample(state['cf']['x'], state['cf']['Cf'], x)
         
+        return pd.DataFrame(states)
+
+    def pressure_distribution(self, loadcase, pool=None):
+        """
+        Returns the pressure distribution over the whole blade.
+
+        Parameters
+        ----------
+        loadcase : 'envelope' or int
+            Index of loadcase.
+        pool : XfoilPool, optional
+            Running XfoilPool, to run XFOIL concurrently. The default is 
+            None.
+
+        Returns
+        -------
+        X : np.array
+            Meshgrid of the radial stations.
+        Y : np.array
+            Meshgrid of the relative chord.
+        Cp_suc : np.array
+            Suction side pressure coefficients.
+        Cp_pres : np.array
+            Pressure side pressure coefficients.
+
+        """
         if loadcase == 'envelope':
             df = self.load_envelope['oper']
         else:
@@ -209,35 +709,25 @@ class Propeller:
         Cp_suc = np.zeros([99, len(stations)])
         Cp_pres = np.zeros([99, len(stations)])
         
-        for idx, section in enumerate(stations):
-            if section <= self.sections[0][0]:
-                airfoil = self.sections[0][1]
-                
-                pressures, _, _ = airfoil.cp_vs_x('cl', df['CL'][idx],[1,1])
-                
-            elif section >= self.sections[len(self.sections)-1][0]:
-                airfoil = self.sections[len(self.sections)-1][1]
-                
-                pressures, _, _ = airfoil.cp_vs_x('cl', df['CL'][idx],[1,1])
-            else:
-                index = bisect.bisect([x[0] for x in self.sections],section)
-                left_section = self.sections[index-1]
-                right_section = self.sections[index]
-                
-                fraction = (section - left_section[0])/ \
-                    (right_section[0] - left_section[0])
-                
-                #print(left_section[1].cp_vs_x('cl', df['CL'][idx]))
-            
-                ls_p, ls_cf, ls_polar = left_section[1].cp_vs_x('cl', df['CL'][idx])
-                rs_p, rs_cf, rs_polar = right_section[1].cp_vs_x('cl', df['CL'][idx])
+        weights = [self.__section_weights__(section) for section in stations]
+        
+        # Start all XFOIL runs, then collect the results
+        results = [[self.__cp_vs_x__(airfoil, df['CL'][idx], [1,1], pool)
+                    for airfoil, _ in station]
+                   for idx, station in enumerate(weights)]
+        
+        for idx, station in enumerate(weights):
+            results[idx] = [result.result() if isinstance(result, Future)
+                            else result for result in results[idx]]
             
-                pressures = (ls_p * (1-fraction)) + (rs_p * (fraction))
+            pressures = sum(weight * result[0] 
+                            for (_, weight), result in zip(station,
+                                                           results[idx]))
                                                                 
             Cp_suc[:,idx] = np.array(pressures['Cp_suc'])
             Cp_pres[:,idx] = np.array(pressures['Cp_pres'])
         
-        X, Y = np.meshgrid(stations, np.arange(0.01, 1.00, 0.01))
+        X, Y = np.meshgrid(stations, NORM_GRID)
         
         return X, Y, Cp_suc, Cp_pres
 
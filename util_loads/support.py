@@ -2,6 +2,7 @@
 
 # Third-party imports
 import os
+import numpy as np
 
 
 # Local imports
@@ -58,4 +59,61 @@ def timer(func):
         
         return return_value
     
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+# %% Resampling of surface distributions
+
+# Normed X grid points of pressure distributions and skin friction:
+NORM_GRID = np.arange(1, 100) / 100
+
+
+def resample(x, y, grid=NORM_GRID):
+    """
+    Linear interpolation of y(x) onto the grid. x does not need to be 
+    sorted. Outside of the range of x, the first/last value is kept.
+
+    Parameters
+    ----------
+    x : np.array
+    y : np.array
+    grid : np.array, optional
+        The default is NORM_GRID.
+
+    Returns
+    -------
+    np.array
+        y at the grid points.
+
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    order = np.argsort(x, kind='stable')
+    
+    return np.interp(grid, x[order], y[order])
+
+
+def resample_surfaces(x, y, grid=NORM_GRID):
+    """
+    Splits a distribution over the airfoil contour (XFOIL order: TE -> 
+    suction side -> LE -> pressure side -> TE) at the leading edge and 
+    resamples both surfaces onto the grid.
+
+    Parameters
+    ----------
+    x : np.array
+    y : np.array
+    grid : np.array, optional
+        The default is NORM_GRID.
+
+    Returns
+    -------
+    suction_side : np.array
+    pressure_side : np.array
+
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    le = np.argmin(x)
+    
+    return resample(x[:le+1], y[:le+1], grid), \
+        resample(x[le+1:], y[le+1:], grid)
@@ -1,11 +1,18 @@
 # %% Import Libraries and Data
 
 # Third-party imports
+import os
+import shutil
+import tempfile
+import threading
+import subprocess
 import pandas as pd
 import numpy as np
 
 # Local imports
-from .xsoftware import Xsoftware
+from .xsoftware import Xsoftware, RunStatistics
+from .support import NORM_GRID, resample_surfaces
+from . import parsers
 
 
 # %%
@@ -33,11 +40,25 @@ class Xfoil(Xsoftware):
             
         - ``'hide'`` Hide popup windows and suppress output to console.
         - ``'show'`` Show popup windows and output to console.
+    in_memory : bool, optional
+        Pass commands via stdin and return outputs as buffers, see 
+        Xsoftware. The default is False.
+    plot : bool, optional
+        If False, XFOILs graphics are disabled (PLOP G) and no X server is
+        needed. The default is True.
+    timeout : int or float, optional
+        Time limit in seconds. The default is None (adaptive, see 
+        Xsoftware).
 
     """
-
-    def __init__(self, mode='hide'):
-        super().__init__()
+    
+    graphics_off = ['plop', 'g', '']
+    
+    statistics = RunStatistics()
+
+    def __init__(self, mode='hide', in_memory=False, plot=True, 
+                 timeout=None):
+        super().__init__(in_memory, plot, timeout)
         self.name = 'xfoil'
         self.input_file = '_xfoil_input.txt'
         self.mode = mode        
@@ -50,19 +71,14 @@ class Xfoil(Xsoftware):
         Parameters
         ----------
         filename : Str
-            Filename/ Path.
+            Filename/ Path or in-memory buffer (see parsers.read_lines).
 
         Returns
         -------
         coordinates : DataFrame
 
         """
-        df = pd.read_fwf(filename,
-                         header=0,
-                         names=['X', 'Y'],
-                         )
-
-        return df.dropna()
+        return parsers.parse_coordinates(filename).to_frame()
 
     @staticmethod
     def read_cp_vs_x(filename, norm=False):
@@ -72,90 +88,60 @@ class Xfoil(Xsoftware):
         Parameters
         ----------
         filename : Str
-            Filename/ Path.
+            Filename/ Path or in-memory buffer (see parsers.read_lines).
         norm : Bool
             - ``False`` Do not norm the output. X grid points are non-uniform
                 and depend on the airfoils curvature.
             - ``True`` Norm X grid points are ``np.arange(0.01, 1.00, 0.01)``
+            (see support.NORM_GRID)
 
         Returns
         -------
         cp_vs_x : DataFrame
 
         """
-        df = pd.read_fwf(filename,
-                         header=0,
-                         skiprows=0,
-                         names=['#', 'x', 'Cp'],
-                         )
-        df = df.drop(labels=['#'], axis=1)
+        table = parsers.parse_cp_vs_x(filename)
 
         if norm is False:
-            return df
+            return table.to_frame()
         else:
-            suction_side = df.iloc[:df['x'].idxmin() + 1, :]
-            pressure_side = df.iloc[df['x'].idxmin() + 1:, :]
-
-            def norm(dataframe): # Todo: isolieren
-                norm_list = list(np.arange(0.01, 1.00, 0.01))
-                empty_frame = pd.DataFrame(norm_list, columns=['x'])
-                empty_frame['y'] = np.nan
-                dataframe.columns = ['x', 'y']
-                dataframe = dataframe.append(empty_frame)
-                dataframe = dataframe.sort_values('x')
-                dataframe = dataframe.interpolate()
-                dataframe = dataframe.dropna()
-                dataframe = dataframe.drop_duplicates(keep='first')
-            
-                dataframe = dataframe[dataframe['x'].isin(norm_list)]
-                return dataframe
-
-            norm_suction_side = norm(suction_side)
-            norm_pressure_side = norm(pressure_side)
-
-            norm_suction_side.columns = ['x', 'Cp_suc']
-            norm_pressure_side.columns = ['x', 'Cp_pres']
+            suction_side, pressure_side = resample_surfaces(table['x'], 
+                                                            table['Cp'])
 
-            norm_suction_side['Cp_pres'] = norm_pressure_side['Cp_pres']
-            #norm_suction_side = norm_suction_side.fillna(0)
-
-            return norm_suction_side[:99]
+            return pd.DataFrame({'x': NORM_GRID,
+                                 'Cp_suc': suction_side,
+                                 'Cp_pres': pressure_side,
+                                 })
         
     @staticmethod
     def read_cf_vs_x(filename):
+        """
+        Reads a DUMP file and returns the skin friction coefficient (sum of
+        both surfaces) at the normed X grid points 
+        ``np.arange(0.01, 1.00, 0.01)``.
+
+        Parameters
+        ----------
+        filename : Str
+            Filename/ Path or in-memory buffer (see parsers.read_lines).
+
+        Returns
+        -------
+        cf_vs_x : DataFrame
+
+        """
         colspecs = [(12, 19), (59, 67)]
         
-        df = pd.read_fwf(filename,
-                         colspecs=colspecs)
-        
-        df = df[(df != 0).all(1)]
+        table = parsers.parse_dump(filename, colspecs)
         
-        suction_side = df.iloc[:df['x'].idxmin() + 1, :]
-        pressure_side = df.iloc[df['x'].idxmin() + 1:, :]
+        data = table.data[(table.data != 0).all(1)]
         
-        def norm(dataframe):
-            norm_list = list(np.arange(0.01, 1.00, 0.01))
-            empty_frame = pd.DataFrame(norm_list, columns=['x'])
-            empty_frame['y'] = np.nan
-            dataframe.columns = ['x', 'y']
-            dataframe = dataframe.append(empty_frame)
-            dataframe = dataframe.sort_values('x')
-            dataframe = dataframe.interpolate()
-            dataframe = dataframe.dropna()
-            dataframe = dataframe.drop_duplicates(keep='first')
-        
-            dataframe = dataframe[dataframe['x'].isin(norm_list)]
-            return dataframe
-
-        norm_suction_side = norm(suction_side)
-        norm_pressure_side = norm(pressure_side)
+        suction_side, pressure_side = resample_surfaces(data[:, 0], 
+                                                        data[:, 1])
         
-        norm_suction_side.columns = ['x', 'Cf']
-        norm_pressure_side.columns = ['x', 'Cf']
-        
-        norm_suction_side['Cf'] = norm_suction_side['Cf'] + norm_pressure_side['Cf']
-        
-        return norm_suction_side
+        return pd.DataFrame({'x': NORM_GRID,
+                             'Cf': suction_side + pressure_side,
+                             })
         
     @staticmethod
     def read_dump(filename):
@@ -166,7 +152,7 @@ class Xfoil(Xsoftware):
         Parameters
         ----------
         filename : Str
-            Filename/ Path.
+            Filename/ Path or in-memory buffer (see parsers.read_lines).
 
         Returns
         -------
@@ -174,14 +160,7 @@ class Xfoil(Xsoftware):
             DESCRIPTION.
 
         """
-        colspecs = [(3, 10), (12, 19), (20, 28), (29, 37), (39, 47),
-                    (49, 57), (59, 67), (70, 77), (78, 87), (88, 96),
-                    (97, 105), (106, 114)]
-        
-        tabular_data = pd.read_fwf(filename,
-                                   colspecs=colspecs)
-        
-        return tabular_data
+        return parsers.parse_dump(filename).to_frame()
         
     @staticmethod
     def read_polar(filename):
@@ -191,7 +170,7 @@ class Xfoil(Xsoftware):
         Parameters
         ----------
         filename : Str
-            Filename/ Path.
+            Filename/ Path or in-memory buffer (see parsers.read_lines).
 
         Returns
         -------
@@ -199,13 +178,248 @@ class Xfoil(Xsoftware):
             Polar DataFrame.
 
         """
-        colspecs = [(1, 8), (10, 17), (20, 27), (30, 37), (39, 46),
-                    (49, 55), (58, 64), (66, 73), (74, 82)]
-        tabular_data = pd.read_fwf(filename,
-                                   colspecs=colspecs,
-                                   header=[10],
-                                   skiprows=[11])
-        tabular_data.sort_values('alpha', inplace=True)
-        tabular_data.drop_duplicates(keep='first', inplace=True)
-
-        return tabular_data.reset_index()
+        return parsers.parse_polar(filename).to_frame()
+
+
+# %%
+
+
+class XfoilSession:
+    """
+    A long-lived XFOIL process. The airfoil is loaded and paneled once,
+    then many operating points are streamed to XFOIL over a pipe.
+
+    .. code-block:: python
+
+        from util_loads import XfoilSession
+
+        with XfoilSession(coordinates, re=500000) as session:
+            for cl in [0.2, 0.4, 0.6]:
+                pressures, cf, polar = session.cp_vs_x('cl', cl)
+
+    After every request a unique, unknown command is sent. XFOIL answers
+    it with an error message, which tells that all previous commands have
+    been processed and the output files are complete.
+
+    Parameters
+    ----------
+    coordinates : DataFrame
+        Airfoil coordinates.
+    re : int or float
+        Reynolds number
+    ncrit : int or float, optional
+        Ncrit value. The default is 9.
+    iter_limit : int, optional
+        Viscous-solution iteration limit. The default is 200.
+    xtr : list, optional
+        Forced transition points [top, bottom]. The default is [1, 1].
+    timeout : int or float, optional
+        Time limit of one request in seconds. The default is 60.
+
+    """
+
+    def __init__(self, coordinates, re, ncrit=9, iter_limit=200, xtr=[1, 1],
+                 timeout=60):
+        self.coordinates = coordinates
+        self.parameters = {'Re': re,
+                           'Ncrit': ncrit,
+                           'Iter': iter_limit,
+                           }
+        self.timeout = timeout
+
+        self.__xtr = list(xtr)
+        self.__process = None
+        self.__scratch = None
+        self.__output = bytearray()
+        self.__output_changed = threading.Condition()
+        self.__polar_columns = None
+        self.__polar_offset = 0
+        self.__counter = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def start(self):
+        """Starts XFOIL, loads the airfoil and enters OPER."""
+
+        self.__scratch = tempfile.mkdtemp(prefix='_xfoil_session_',
+                                          dir=Xsoftware.tmpfs())
+        np.savetxt(os.path.join(self.__scratch, '_xfoil_input_coords.txt'),
+                   self.coordinates, fmt='%9.8f')
+
+        Xsoftware.start_xvfb()
+
+        env = dict(os.environ,
+                   DISPLAY=':1',
+                   GFORTRAN_UNBUFFERED_ALL='y',  # Flush stdout and files
+                   )
+
+        self.__process = subprocess.Popen(['xfoil'],
+                                          stdin=subprocess.PIPE,
+                                          stdout=subprocess.PIPE,
+                                          stderr=subprocess.STDOUT,
+                                          cwd=self.__scratch,
+                                          env=env,
+                                          start_new_session=True,
+                                          )
+
+        threading.Thread(target=self.__read_output__, daemon=True).start()
+
+        self.__send__(['load ',
+                       '_xfoil_input_coords.txt',
+                       '',
+                       'pane',
+                       'oper',
+                       'vpar',
+                       'n ' + str(self.parameters['Ncrit']),
+                       'xtr',
+                       self.__xtr[0],
+                       self.__xtr[1],
+                       '',
+                       'visc ' + str(self.parameters['Re']),
+                       'iter',
+                       str(self.parameters['Iter']),
+                       'pacc',
+                       '_xfoil_polar.txt',
+                       '',
+                       ])
+        self.__sync__()
+
+    def close(self):
+        """Quits XFOIL and deletes the session's scratch directory."""
+
+        if self.__process is not None:
+            try:
+                self.__send__(['', 'quit'])
+                self.__process.stdin.close()
+                self.__process.wait(timeout=self.timeout)
+            except (OSError, subprocess.TimeoutExpired):
+                Xsoftware.kill_group(self.__process)
+            self.__process = None
+
+        if self.__scratch is not None:
+            shutil.rmtree(self.__scratch, ignore_errors=True)
+            self.__scratch = None
+
+    def cp_vs_x(self, mode, value, xtr=None):
+        """
+        Evaluates one operating point, see Airfoil.cp_vs_x().
+
+        Parameters
+        ----------
+        mode : string.
+            'alfa' for Angle of attack.
+            'cl' for Coefficient of lift.
+            'cli' for Coefficient of lift, inviscid.
+        value : int or float
+        xtr : list, optional
+            Forced transition points [top, bottom]. The default is the
+            session's value.
+
+        Returns
+        -------
+        DataFrame
+            Pressure distribution (normed).
+        DataFrame
+            Skin friction coefficient.
+        DataFrame
+            Polar of the operating point. Empty if the point did not
+            converge.
+
+        """
+        commands = []
+
+        if xtr is not None and list(xtr) != self.__xtr:
+            self.__xtr = list(xtr)
+            commands += ['vpar', 'xtr', self.__xtr[0], self.__xtr[1], '']
+
+        self.__counter += 1
+        cp_vs_x_file = '_xfoil_cpvsx_%i.txt' % self.__counter
+        dump_file = '_xfoil_dump_%i.txt' % self.__counter
+
+        commands += [mode,
+                     value,
+                     'cpwr',
+                     cp_vs_x_file,
+                     'dump',
+                     dump_file,
+                     ]
+        self.__send__(commands)
+        self.__sync__()
+
+        cp_vs_x_file = os.path.join(self.__scratch, cp_vs_x_file)
+        dump_file = os.path.join(self.__scratch, dump_file)
+
+        pressures = Xfoil.read_cp_vs_x(cp_vs_x_file, True)
+        cf = Xfoil.read_cf_vs_x(dump_file)
+        polar = self.__read_new_polar_points__()
+
+        os.remove(cp_vs_x_file)
+        os.remove(dump_file)
+
+        if polar.empty:
+            # Reset the boundary layer after an unconverged point
+            self.__send__(['init'])
+
+        return pressures, cf, polar
+
+    def __send__(self, commands):
+        """Writes commands to XFOILs stdin."""
+
+        text = ''.join(str(command) + '\n' for command in commands)
+        self.__process.stdin.write(text.encode())
+        self.__process.stdin.flush()
+
+    def __sync__(self):
+        """Waits until XFOIL has processed all commands sent so far."""
+
+        # XFOIL commands are 4 characters long and upper case
+        token = ('Z%03i' % (self.__counter % 1000)).encode()
+        self.__send__([token.decode()])
+
+        with self.__output_changed:
+            ready = self.__output_changed.wait_for(
+                lambda: (token in self.__output
+                         or self.__process.poll() is not None),
+                timeout=self.timeout)
+
+            if not ready:
+                raise TimeoutError('XFOIL session timed out')
+            if token not in self.__output:
+                raise RuntimeError('XFOIL session terminated')
+
+            del self.__output[:self.__output.index(token) + len(token)]
+
+    def __read_output__(self):
+        """Reader thread: collects XFOILs stdout."""
+
+        for chunk in iter(lambda: self.__process.stdout.read1(4096), b''):
+            with self.__output_changed:
+                self.__output += chunk
+                self.__output_changed.notify_all()
+
+        with self.__output_changed:
+            self.__output_changed.notify_all()
+
+    def __read_new_polar_points__(self):
+        """Returns the polar lines appended since the last request."""
+
+        filename = os.path.join(self.__scratch, '_xfoil_polar.txt')
+
+        with open(filename, 'rb') as f:
+            f.seek(self.__polar_offset)
+            data = f.read()
+
+        # Keep an incomplete last line for the next request
+        data = data[:data.rfind(b'\n') + 1]
+        self.__polar_offset += len(data)
+
+        table = parsers.parse_polar(data, self.__polar_columns, sort=False)
+        if table.columns:
+            self.__polar_columns = table.columns
+
+        return table.to_frame().reset_index()
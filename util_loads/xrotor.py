@@ -1,10 +1,10 @@
 #%% Import Libraries and Data 
 
 # Third-party imports
-import pandas as pd
 
 # Local imports
-from .xsoftware import Xsoftware
+from .xsoftware import Xsoftware, RunStatistics
+from . import parsers
 
 #%%
 
@@ -37,10 +37,25 @@ class Xrotor(Xsoftware):
             
         - ``'hide'`` Hide popup windows and suppress output to console.
         - ``'show'`` Show popup windows and output to console.
+    
+    in_memory : bool, optional
+        Pass commands via stdin and return outputs as buffers, see 
+        Xsoftware. The default is False.
+        
+    plot : bool, optional
+        If False, no X server is used. The default is True.
+        
+    timeout : int or float, optional
+        Time limit in seconds. The default is None (adaptive, see 
+        Xsoftware).
             
     """
-    def __init__(self, propeller, loadcase, mode='hide'):
-        super().__init__()
+    
+    statistics = RunStatistics()
+    
+    def __init__(self, propeller, loadcase, mode='hide', in_memory=False,
+                 plot=True, timeout=None):
+        super().__init__(in_memory, plot, timeout)
         self.name = 'xrotor'
         self.input_file = '_xrotor_input.txt'
         
@@ -120,23 +135,15 @@ class Xrotor(Xsoftware):
         Parameters
         ----------
         filename : String
-            Name of output file of XROTORs bend routine.
+            Name of output file of XROTORs bend routine or in-memory buffer
+            (see parsers.read_lines).
 
         Returns
         -------
         bend_data : DataFrame
 
         """
-        colspecs = [(1, 3), (4, 10), (11, 18), (19, 26), (28, 34), (35, 46),
-                    (48, 59), (61, 72), (74, 85), (87, 98), (100, 111)]
-
-        tabular_data = pd.read_fwf(filename,
-                                   colspecs=colspecs,
-                                   header=[1],
-                                   skiprows=[2],
-                                   nrows=29,)
-
-        return tabular_data
+        return parsers.parse_bend(filename).to_frame()
 
     @staticmethod
     def read_oper_output(filename):
@@ -151,7 +158,8 @@ class Xrotor(Xsoftware):
         Parameters
         ----------
         filename : String
-            Name of output file of XROTORs oper routine.
+            Name of output file of XROTORs oper routine or in-memory buffer
+            (see parsers.read_lines).
 
         Returns
         -------
@@ -159,30 +167,6 @@ class Xrotor(Xsoftware):
         oper_data : DataFrame 
 
         """
-        single_values = {}
-        columns = [[(1, 12), (15, 24)],
-                   [(28, 39), (42, 51)],
-                   [(54, 65), (69, 78)]]
-
-        for colspec in columns:
-            header = pd.read_fwf(filename,
-                                 colspecs=colspec,
-                                 header=0,
-                                 skiprows=3,
-                                 nrows=7,
-                                 index_col=0)
-
-            header.columns = ['Value']
-            header.dropna(subset=['Value'], inplace=True)
-            header = header.to_dict()['Value']
-            single_values.update(header)
-    
-        colspecs = [(1, 4), (4, 9), (10, 16), (16, 25), (25, 30), (33, 39),
-                    (40, 47), (48, 53), (54, 60), (61, 66), (67, 74)]
+        single_values, table = parsers.parse_oper(filename)
         
-        tabular_data = pd.read_fwf(filename,
-                                   colspecs=colspecs,
-                                   header=16)
-        
-        return single_values, tabular_data
-
+        return single_values, table.to_frame()
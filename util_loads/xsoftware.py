@@ -1,17 +1,121 @@
 #%% Import Libraries and Data 
 
 # Third-party imports
+import io
 import os
+import time
+import shutil
 import signal
+import tempfile
+import threading
 import subprocess
+import collections
 import psutil
 import warnings
+import numpy as np
 
 # Local imports
 
 #%%
 
 
+class RunStatistics:
+    """
+    Counters and wall times of the XFOIL or XROTOR jobs of this process.
+
+    .. code-block:: python
+
+        from util_loads import Xfoil
+
+        print(Xfoil.statistics.summary())
+        # {'runs': 120, 'timeouts': 2, 'kills': 0, 'mean': 0.41, 'p95': 0.9}
+
+    Parameters
+    ----------
+    history : int, optional
+        Number of wall times kept for mean, p95 and the adaptive timeout.
+        The default is 1000.
+
+    """
+
+    def __init__(self, history=1000):
+        self.runs = 0
+        self.timeouts = 0
+        self.kills = 0
+        self.__wall_times = collections.deque(maxlen=history)
+        self.__lock = threading.Lock()
+
+    def __repr__(self):
+        return 'RunStatistics ' + str(self.summary())
+
+    def record(self, wall_time, timed_out=False, killed=False):
+        """
+        Adds one job. Wall times of timed out jobs are not kept, as they 
+        only tell that the job took longer than the time limit.
+
+        """
+        with self.__lock:
+            self.runs += 1
+            self.timeouts += int(timed_out)
+            self.kills += int(killed)
+            if not timed_out:
+                self.__wall_times.append(wall_time)
+
+    @property
+    def mean(self):
+        """Mean wall time in seconds (nan if there are no runs)."""
+
+        with self.__lock:
+            return float(np.mean(self.__wall_times)) \
+                if self.__wall_times else np.nan
+
+    @property
+    def p95(self):
+        """95th percentile of the wall time in seconds."""
+
+        with self.__lock:
+            return float(np.percentile(self.__wall_times, 95)) \
+                if self.__wall_times else np.nan
+
+    def adaptive_timeout(self, default, factor=3, minimum=2, min_samples=20):
+        """
+        Returns a time limit learned from the observed wall times: 
+        factor * p95, but at least minimum and at most default. Until 
+        min_samples jobs are finished, default is returned.
+
+        """
+        if len(self.__wall_times) < min_samples:
+            return default
+
+        return float(np.clip(factor * self.p95, minimum, default))
+
+    def summary(self):
+        """
+        Returns
+        -------
+        dict
+            runs, timeouts, kills, mean and p95 wall time (s).
+
+        """
+        return {'runs': self.runs,
+                'timeouts': self.timeouts,
+                'kills': self.kills,
+                'mean': self.mean,
+                'p95': self.p95,
+                }
+
+    def reset(self):
+        """Sets all counters to zero and forgets the wall times."""
+
+        with self.__lock:
+            self.runs = 0
+            self.timeouts = 0
+            self.kills = 0
+            self.__wall_times.clear()
+
+#%%
+
+
 class Xsoftware:
     """
     Parent of xfoil and xrotor class. This class contains all methods, 
@@ -20,21 +124,83 @@ class Xsoftware:
     The interface is implemented as a Context Manager
     (ref: https://book.pythontips.com/en/latest/context_managers.html).
 
+    In-memory mode (``in_memory=True``): the commands are collected in a 
+    buffer and passed to the process via stdin, without a shell. The 
+    process runs in a scratch directory on tmpfs (/dev/shm, if available). 
+    Input files are written to ``x.path(filename)``, all files in the 
+    scratch directory are returned as bytes in ``x.outputs`` and stdout in
+    ``x.stdout``:
+
+    .. code-block:: python
+
+        with Xfoil(in_memory=True, plot=False) as x:
+            np.savetxt(x.path('coords.txt'), coordinates)
+            x.run('load coords.txt')
+            #...
+            x.run('pacc')
+            x.run('polar.txt')
+            #...
+
+        polar = Xfoil.read_polar(x.outputs['polar.txt'])
+
+    With ``plot=False`` graphics are disabled (if the program allows it) and
+    neither Xvfb nor DISPLAY are used.
+
+    Every job runs in its own process group. If it exceeds its time limit,
+    the whole group (shell and XFOIL/ XROTOR) is terminated. The time 
+    limit is either fixed (``timeout``) or learned from the wall times of
+    previous jobs (``timeout=None``, see RunStatistics.adaptive_timeout).
+    Counters of all jobs are in the class attribute ``statistics``. After a
+    time out, ``x.timed_out`` is True and ``x.outputs`` only holds the 
+    files written until then: callers must expect missing output files.
+
     """
+    
+    # Commands that disable graphics, sent first if plot is False
+    graphics_off = []
+    
+    # Time limits in seconds
+    default_timeout = 15
+    min_timeout = 2
+    timeout_factor = 3
+    
+    statistics = RunStatistics()
 
-    def __init__(self):
+    def __init__(self, in_memory=False, plot=True, timeout=None):
         self.input_file = None
         self.name = None
+        self.in_memory = in_memory
+        self.plot = plot
+        self.timeout = timeout
+        self.scratch = None
+        self.outputs = {}
+        self.stdout = None
+        self.timed_out = False
 
     def __enter__(self):
         """Opens a text file, which will serve as input to XFOIL and XROTOR."""
         
-        self.f = open(self.input_file, 'w')
+        if self.in_memory:
+            self.f = io.StringIO()
+            self.scratch = tempfile.mkdtemp(prefix='_' + self.name + '_',
+                                            dir=self.tmpfs())
+            self.outputs = {}
+            self.stdout = None
+        else:
+            self.f = open(self.input_file, 'w')
         return self
     
     def __exit__(self, exc_type, exc_value, exc_traceback):
         """Closes the input file, and starts the Xfoil/ Xrotor Job. """
         
+        if self.in_memory:
+            try:
+                self.__run_in_memory__()
+            finally:
+                shutil.rmtree(self.scratch, ignore_errors=True)
+                self.scratch = None
+            return
+        
         self.f.close()
         
         if self.mode == 'hide':
@@ -48,29 +214,161 @@ class Xsoftware:
         
         args = ['DISPLAY=:1 ' + self.name + ' < ' + self.input_file,]
         
-        # start xvfb server if not running:
-        if not "Xvfb" in (p.name() for p in psutil.process_iter()):
-            subprocess.Popen('Xvfb :1 &',
-                             shell=True,
-                             stdout=sp_stdout,
-                             stderr=sp_stderr,
-                             )
+        self.start_xvfb(sp_stdout, sp_stderr)
         
         process = subprocess.Popen(args,
                                    shell=True,
                                    stdout=sp_stdout,
                                    stderr=sp_stderr,
+                                   start_new_session=True,
                                    )
-        try: 
-            process.wait(timeout=15)
-        except subprocess.TimeoutExpired:
-            warnings.warn(self.name + ' timed out - killing ' + \
-                          str(process.pid) + ' and ' + \
-                              str(process.pid+1), RuntimeWarning)
-            os.kill(process.pid+1, signal.SIGKILL)
-            process.kill()
+        self.__wait__(process)
         
         os.remove(self.input_file)
+    
+    def __run_in_memory__(self):
+        """Runs the job with the command buffer as stdin."""
+        
+        commands = self.f.getvalue()
+        env = dict(os.environ)
+        
+        if self.plot:
+            self.start_xvfb()
+            env['DISPLAY'] = ':1'
+        else:
+            commands = ''.join(str(command) + '\n' 
+                               for command in self.graphics_off) + commands
+            env.pop('DISPLAY', None)
+        
+        if self.mode == 'hide':
+            sp_stdout = subprocess.PIPE
+            sp_stderr = subprocess.STDOUT
+        elif self.mode == 'show':
+            sp_stdout = None
+            sp_stderr = None
+        else:
+            raise ValueError('Invalid mode %s' % self.mode)
+        
+        process = subprocess.Popen([self.name],
+                                   stdin=subprocess.PIPE,
+                                   stdout=sp_stdout,
+                                   stderr=sp_stderr,
+                                   cwd=self.scratch,
+                                   env=env,
+                                   start_new_session=True,
+                                   )
+        self.stdout = self.__wait__(process, commands.encode())
+        
+        for filename in os.listdir(self.scratch):
+            with open(os.path.join(self.scratch, filename), 'rb') as f:
+                self.outputs[filename] = f.read()
+    
+    @property
+    def time_limit(self):
+        """
+        Returns
+        -------
+        float
+            Time limit of the job in seconds: timeout, or the adaptive
+            timeout if timeout is None.
+
+        """
+        if self.timeout is not None:
+            return self.timeout
+        
+        return self.statistics.adaptive_timeout(self.default_timeout,
+                                                self.timeout_factor,
+                                                self.min_timeout)
+    
+    def __wait__(self, process, commands=None):
+        """
+        Passes commands to the process, waits for it within the time limit
+        and records the job in statistics. Sets timed_out and returns 
+        stdout.
+
+        """
+        time_limit = self.time_limit
+        start = time.perf_counter()
+        timed_out = killed = False
+        
+        try:
+            stdout, _ = process.communicate(commands, timeout=time_limit)
+        except subprocess.TimeoutExpired:
+            warnings.warn('%s timed out after %.1f s - killing process '
+                          'group %i' % (self.name, time_limit, process.pid),
+                          RuntimeWarning)
+            timed_out = True
+            killed = self.kill_group(process)
+            stdout, _ = process.communicate()
+        
+        self.timed_out = timed_out
+        self.statistics.record(time.perf_counter() - start, timed_out, 
+                               killed)
+        
+        return stdout
+    
+    @staticmethod
+    def kill_group(process, grace_period=1):
+        """
+        Terminates the process group of process (started with 
+        start_new_session=True). Processes that are still alive after the 
+        grace period are killed.
+
+        Returns
+        -------
+        bool
+            True, if SIGKILL was necessary.
+
+        """
+        def signal_group(signum):
+            try:
+                os.killpg(process.pid, signum)
+                return True
+            except ProcessLookupError:
+                return False
+        
+        signal_group(signal.SIGTERM)
+        try:
+            process.wait(timeout=grace_period)
+        except subprocess.TimeoutExpired:
+            pass
+        
+        # Signal 0: Is any process of the group still alive?
+        if signal_group(0):
+            signal_group(signal.SIGKILL)
+            process.wait()
+            return True
+        
+        return False
+    
+    def path(self, filename):
+        """
+        Returns the path to use for input files of the job: inside the 
+        scratch directory in in-memory mode, else filename itself.
+
+        """
+        if self.in_memory:
+            return os.path.join(self.scratch, filename)
+        return filename
+    
+    @staticmethod
+    def tmpfs():
+        """Returns /dev/shm if it is available, else None (default temp)."""
+        
+        if os.access('/dev/shm', os.W_OK):
+            return '/dev/shm'
+        return None
+    
+    @staticmethod
+    def start_xvfb(stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT):
+        """Starts the Xvfb server on display :1 if it is not running."""
+        
+        if not "Xvfb" in (p.name() for p in psutil.process_iter()):
+            subprocess.Popen('Xvfb :1 &',
+                             shell=True,
+                             stdout=stdout,
+                             stderr=stderr,
+                             )
         
     def run(self, argument):
         """
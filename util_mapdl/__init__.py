@@ -3,4 +3,6 @@
 # Third-party imports
 
 # Local imports
-from .material import Material
\ No newline at end of file
+from .material import Material
+from .layup import LayupTable
+from .result_reader import ResultReader
@@ -0,0 +1,147 @@
+#%% Import Libraries and Data
+
+# Third-party imports
+import numpy as np
+
+# Local imports
+
+# %%
+
+
+class LayupTable:
+    """
+    Interning table for layered shell sections: elements with the same
+    layup (layer thicknesses, materials and angles, rounded to the
+    tolerances) share one section ID.
+
+    The default tolerances only merge layups that are equal for MAPDL. 
+    Coarser tolerances (e.g. tolerance=0.05) give fewer sections, but the
+    rounded thicknesses and angles are written to MAPDL: stiffness, mass 
+    and failure indices change and the model becomes piecewise constant 
+    in the design variables.
+
+    Interning only pays off if many elements share a layup. On the 
+    propeller models (femodel), the core plies scale with the element 
+    height: the 660 elements of mf3218 give more than 600 distinct 
+    layups at the default tolerances (still about 450 at 
+    tolerance=0.05), so Femodel.layups is None by default.
+
+    .. code-block:: python
+
+        from util_mapdl import LayupTable
+
+        layups = LayupTable()  # or model.layups = LayupTable()
+
+        section_ids = layups.intern(thickness, material, angle)
+        thickness, material, angle = layups.layup(section_ids)
+
+    Parameters
+    ----------
+    tolerance : float, optional
+        Rounding step of the layer thicknesses [mm]. The default is 1e-4.
+    angle_tolerance : float, optional
+        Rounding step of the fiber angles [deg]. The default is 1e-4.
+    first_id : int, optional
+        First section ID. The default is 1.
+
+    """
+
+    def __init__(self, tolerance=1e-4, angle_tolerance=1e-4, first_id=1):
+        self.tolerance = tolerance
+        self.angle_tolerance = angle_tolerance
+        self.first_id = first_id
+        self.clear()
+
+    def __repr__(self):
+        return 'LayupTable (' + str(len(self)) + ' layups)'
+
+    def __len__(self):
+        return len(self.__layups)
+
+    def clear(self):
+        """Deletes all layups, IDs start again at first_id."""
+
+        self.__ids = {}
+        self.__layups = {}
+
+    def intern(self, thickness, material, angle):
+        """
+        Returns the section IDs of the given layups. Unknown layups get a
+        new ID.
+
+        Parameters
+        ----------
+        thickness : np.array
+            Layer thicknesses, shape (elements, layers). np.nan: no layer.
+        material : np.array
+            Material numbers, same shape.
+        angle : np.array
+            Fiber angles, same shape.
+
+        Returns
+        -------
+        section_ids : np.array
+            Section ID of every element.
+
+        """
+        thickness = np.atleast_2d(np.asarray(thickness, dtype=float))
+        material = np.broadcast_to(material, thickness.shape)
+        angle = np.broadcast_to(np.asarray(angle, dtype=float),
+                                thickness.shape)
+
+        empty = np.isnan(thickness)
+        keys = np.hstack([
+            np.where(empty, -1, np.round(thickness / self.tolerance)),
+            np.where(empty, 0, material),
+            np.where(empty, 0, np.round(angle / self.angle_tolerance)),
+            ]).astype(np.int64)
+
+        unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+
+        ids = np.empty(len(unique), dtype=int)
+        for idx, key in enumerate(unique):
+            ids[idx] = self.__intern_key__(key)
+
+        return ids[inverse.ravel()]
+
+    def __intern_key__(self, key):
+        """Returns the ID of one rounded layup, see intern()."""
+
+        hashable = key.tobytes()
+
+        if hashable not in self.__ids:
+            section_id = self.first_id + len(self.__ids)
+            self.__ids[hashable] = section_id
+
+            thickness, material, angle = np.split(key, 3)
+            self.__layups[section_id] = (
+                np.where(thickness < 0, np.nan, thickness * self.tolerance),
+                material.astype(int),
+                angle * self.angle_tolerance)
+
+        return self.__ids[hashable]
+
+    def layup(self, section_ids):
+        """
+        Returns the (rounded) layups of the given section IDs.
+
+        Returns
+        -------
+        thickness, material, angle : np.array
+            Shape (len(section_ids), layers).
+
+        """
+        layups = [self.__layups[section_id] for section_id in section_ids]
+
+        return [np.array([layup[i] for layup in layups]) for i in range(3)]
+
+    @property
+    def layups(self):
+        """
+        Returns
+        -------
+        Dict
+            Section ID: (thickness, material, angle).
+
+        """
+        return dict(self.__layups)
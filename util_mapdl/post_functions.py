@@ -1,3 +1,15 @@
+#%% Import Libraries and Data 
+
+# Third-party imports
+import os
+import numpy as np
+
+# Local imports
+from .prep_functions import working_file
+
+# %%
+
+
 def fc_puck(mapdl):
     ###
     # This Function is supposed to return the maximum "Puck fiber failure" and "Puck inter-fiber (matrix) failure" values of the laminate.
@@ -55,4 +67,319 @@ def fc_puck(mapdl):
     I_f = mapdl.parameters['I_f']           # Retrieve those values
     I_m = mapdl.parameters['I_m']
     
-    return I_f, I_m
\ No newline at end of file
+    return I_f, I_m
+
+
+def etable_by_element(mapdl, items, n_layers=None, filename='_etable_results'):
+    """
+    Returns element table items of all layers of all elements in one pass:
+    one ETABLE per layer and item, one *MWRITE of the whole result array,
+    read by NumPy.
+
+    Parameters
+    ----------
+    mapdl : Mapdl
+        MAPDL session in /POST1 with a result loaded.
+    items : list
+        List of (Item, Comp) of ETABLE, e.g. [('fail', 'pfib'), ('s', 'x')].
+    n_layers : int, optional
+        Maximum number of layers. The default is None (number of layers 
+        of the section of the first element).
+    filename : str, optional
+        Name of the transfer file (without extension), which is written to
+        the working directory of MAPDL and deleted afterwards. The default 
+        is '_etable_results'.
+
+    Returns
+    -------
+    results : np.array
+        Shape (max. element number, n_layers, len(items)). Row i belongs
+        to element i+1, unselected elements are 0.
+
+    """
+    mapdl.allsel('all')
+    mapdl.get('etab_emax', 'elem', 0, 'num', 'max')
+    
+    if n_layers is None:
+        mapdl.run('*get,etab_emin,elem,0,num,min')
+        mapdl.run('*get,etab_sec,elem,etab_emin,attr,secn')
+        mapdl.get('etab_nlay', 'shel', 'etab_sec', 'prop', 'nlay')
+        n_layers = int(mapdl.parameters['etab_nlay'])
+    
+    n_items = len(items)
+    n_columns = n_layers * n_items
+    
+    # Transfer file in the working directory of MAPDL, deleted afterwards
+    with working_file(mapdl, filename + '.txt') as path:
+        with mapdl.non_interactive:
+            mapdl.run('*del,etab_res,,nopr')
+            mapdl.run('*dim,etab_res,array,etab_emax,%i' % n_columns)
+            
+            for lay in range(1, n_layers + 1):
+                mapdl.run('layer,%i' % lay)
+                for idx, (item, comp) in enumerate(items):
+                    column = (lay - 1) * n_items + idx + 1
+                    mapdl.run('etable,et%i,%s,%s' % (column, item, comp))
+                    mapdl.run('*vget,etab_res(1,%i),elem,1,etab,et%i' 
+                              % (column, column))
+            
+            # One line per element: column index first (JIK)
+            mapdl.run('*mwrite,etab_res(1,1),%s,txt,,jik,%i,etab_emax' 
+                      % (os.path.splitext(path)[0], n_columns))
+            mapdl.run('(%iE17.8)' % n_columns)
+            mapdl.run('etable,eras')
+        
+        results = np.loadtxt(path, ndmin=2)
+    
+    return results.reshape(len(results), n_layers, n_items)
+
+
+def puck_by_element(mapdl, n_layers=None, filename='_puck_results'):
+    """
+    Returns the Puck fiber and inter-fiber failure indices of MAPDL 
+    (FC, FCTYP pfib/pmat must be defined) of all layers of all elements 
+    in one pass, see etable_by_element().
+
+    Returns
+    -------
+    I_fib : np.array
+        Fiber failure, shape (max. element number, n_layers). Row i belongs
+        to element i+1, unselected elements are 0.
+    I_mat : np.array
+        Inter-fiber (matrix) failure, same shape.
+
+    """
+    results = etable_by_element(mapdl, [('fail', 'pfib'), ('fail', 'pmat')],
+                                n_layers, filename)
+    
+    return results[:, :, 0], results[:, :, 1]
+
+
+def layer_stresses(mapdl, n_layers=None, filename='_stress_results'):
+    """
+    Returns the in-plane stresses of all layers of all elements in the 
+    layer coordinate systems (RSYS,LSYS), see etable_by_element().
+
+    Returns
+    -------
+    stresses : np.array
+        Shape (max. element number, n_layers, 3): sigma_1 (fiber 
+        direction), sigma_2, tau_21.
+
+    """
+    mapdl.rsys('lsys')
+    stresses = etable_by_element(mapdl, [('s', 'x'), ('s', 'y'), ('s', 'xy')],
+                                 n_layers, filename)
+    mapdl.rsys(0)
+    
+    return stresses
+
+
+def rotate_stresses(stresses, angle):
+    """
+    Rotates plane stresses from the element into the layer (fiber) 
+    coordinate system.
+
+    Parameters
+    ----------
+    stresses : np.array
+        Shape (..., 6): Sx, Sy, Sz, Sxy, Syz, Sxz in the element coordinate
+        system, e.g. from ResultReader.layer_stresses().
+    angle : np.array
+        Fiber angle of every layer [deg], shape (...).
+
+    Returns
+    -------
+    stresses : np.array
+        Shape (..., 3): sigma_1, sigma_2, tau_21, see puck().
+
+    """
+    stresses = np.asarray(stresses, dtype=float)
+    sx, sy, sxy = stresses[..., 0], stresses[..., 1], stresses[..., 3]
+    
+    c = np.cos(np.radians(angle))
+    s = np.sin(np.radians(angle))
+    
+    return np.stack([sx * c**2 + sy * s**2 + 2 * sxy * s * c,
+                     sx * s**2 + sy * c**2 - 2 * sxy * s * c,
+                     (sy - sx) * s * c + sxy * (c**2 - s**2)], axis=-1)
+
+
+def puck(stresses, fc, p_tension=0.3, p_compression=0.25):
+    """
+    Puck fiber failure and inter-fiber failure (modes A, B and C) of 
+    unidirectional layers under plane stress, evaluated for all stresses
+    at once.
+
+    Parameters
+    ----------
+    stresses : np.array
+        Shape (..., 3): sigma_1 (fiber direction), sigma_2, tau_21, e.g. 
+        from layer_stresses().
+    fc : Dict
+        Strengths, the fc dict of Material: 'xten', 'xcmp' (or 'cmp'),
+        'yten', 'ycmp', 'xy'. Compressive strengths may be negative.
+    p_tension : float, optional
+        Inclination parameter p_perp_par^(+). The default is 0.3.
+    p_compression : float, optional
+        Inclination parameter p_perp_par^(-). The default is 0.25.
+
+    Returns
+    -------
+    I_fib : np.array
+        Fiber failure index, shape (...).
+    I_mat : np.array
+        Inter-fiber failure index, shape (...).
+    mode : np.array
+        Inter-fiber failure mode: 0 = A, 1 = B, 2 = C.
+
+    """
+    stresses = np.asarray(stresses, dtype=float)
+    s1, s2, t21 = stresses[..., 0], stresses[..., 1], stresses[..., 2]
+    
+    xt = fc['xten']
+    xc = abs(fc['xcmp'] if 'xcmp' in fc else fc['cmp'])
+    yt = fc['yten']
+    yc = abs(fc['ycmp'])
+    s = fc['xy']
+    
+    # Fracture resistance of the action plane and p_perp_perp^(-)
+    r_aa = s / (2 * p_compression) \
+        * (np.sqrt(1 + 2 * p_compression * yc / s) - 1)
+    p_aa = p_compression * r_aa / s
+    t21_c = s * np.sqrt(1 + 2 * p_aa)
+    
+    I_fib = np.where(s1 >= 0, s1 / xt, -s1 / xc)
+    
+    mode_a = np.sqrt((t21 / s)**2 
+                     + ((1 - p_tension * yt / s) * s2 / yt)**2) \
+        + p_tension * s2 / s
+    mode_b = (np.sqrt(t21**2 + (p_compression * s2)**2) 
+              + p_compression * s2) / s
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mode_c = ((t21 / (2 * (1 + p_aa) * s))**2 + (s2 / yc)**2) \
+            * yc / -s2
+        
+    mode = np.where(s2 >= 0, 0, 
+                    np.where(np.abs(s2) <= np.abs(t21) * r_aa / t21_c, 1, 2))
+    I_mat = np.choose(mode, [mode_a, mode_b, mode_c])
+    
+    return I_fib, I_mat, mode
+
+
+def puck_layup(stresses, material, materials, **kwargs):
+    """
+    Puck failure of a layup with several materials, see puck().
+
+    Parameters
+    ----------
+    stresses : np.array
+        Shape (elements, layers, 3).
+    material : np.array
+        Material number of every layer, shape (elements, layers). Layers
+        without a material in materials (e.g. absent layers) are 0.
+    materials : Dict
+        Material number: Material (or fc dict). A different dict 
+        evaluates other strengths for the same stresses.
+
+    Returns
+    -------
+    I_fib, I_mat, mode : np.array
+        Shape (elements, layers).
+
+    """
+    stresses = np.asarray(stresses, dtype=float)
+    material = np.broadcast_to(material, stresses.shape[:-1])
+    
+    I_fib = np.zeros(material.shape)
+    I_mat = np.zeros(material.shape)
+    mode = np.zeros(material.shape, dtype=int)
+    
+    for number, fc in materials.items():
+        mask = material == number
+        if not mask.any():
+            continue
+        
+        fc = getattr(fc, 'fc', fc)
+        I_fib[mask], I_mat[mask], mode[mask] = puck(stresses[mask], fc, 
+                                                    **kwargs)
+    
+    return I_fib, I_mat, mode
+
+
+def reaction_resultant(rforces, nnum, dof, node_numbers=None, 
+                       node_coordinates=None, point=(0., 0., 0.)):
+    """
+    Sums the nodal reaction forces of every DOF and, with the node 
+    coordinates, the resulting moment about a point.
+
+    Parameters
+    ----------
+    rforces, nnum, dof : np.array
+        Reaction forces as returned by nodal_reaction_forces(): value, 
+        node number and DOF (1 = UX, ... 6 = ROTZ) of every entry.
+    node_numbers : np.array, optional
+        Node numbers of node_coordinates. The default is None (forces
+        only, the moment is the sum of the reaction moments).
+    node_coordinates : np.array, optional
+        Coordinates of the nodes, shape (nodes, 3).
+    point : tuple, optional
+        Reference point of the moment. The default is (0., 0., 0.).
+
+    Returns
+    -------
+    resultant : np.array
+        FX, FY, FZ, MX, MY, MZ.
+
+    """
+    rforces = np.asarray(rforces, dtype=float)
+    dof = np.asarray(dof, dtype=int)
+    
+    resultant = np.bincount(dof - 1, weights=rforces, minlength=6)[:6]
+    
+    if node_numbers is None:
+        return resultant
+    
+    # Force vector of every node with reactions
+    nodes, inverse = np.unique(np.asarray(nnum, dtype=int), 
+                               return_inverse=True)
+    forces = np.zeros((len(nodes), 6))
+    np.add.at(forces, (inverse, dof - 1), rforces)
+    
+    node_numbers = np.asarray(node_numbers, dtype=int)
+    order = np.argsort(node_numbers)
+    rows = order[np.searchsorted(node_numbers, nodes, sorter=order)]
+    lever = np.asarray(node_coordinates, dtype=float)[rows, :3] \
+        - np.asarray(point, dtype=float)
+    
+    resultant[3:] += np.cross(lever, forces[:, :3]).sum(axis=0)
+    
+    return resultant
+
+
+def section_maxima(values, element_section, n_sec):
+    """
+    Reduces element values to the maximum of every section.
+
+    Parameters
+    ----------
+    values : np.array
+        Values of the elements, shape (elements, ...), e.g. the failure 
+        indices of all layers.
+    element_section : np.array
+        Section index of every element.
+    n_sec : int
+        Number of sections.
+
+    Returns
+    -------
+    maxima : np.array
+        Shape (n_sec,). Sections without elements are 0.
+
+    """
+    values = np.asarray(values, dtype=float).reshape(len(element_section), -1)
+    
+    maxima = np.zeros(n_sec)
+    np.maximum.at(maxima, element_section, values.max(axis=1))
+    
+    return maxima
@@ -1,6 +1,8 @@
 #%% Import Libraries and Data 
 
 # Third-party imports
+import os
+import contextlib
 import numpy as np
 
 # Local imports
@@ -38,4 +40,176 @@ def get_edges(mapdl, y):
     le = np.array(intersection(4))
     te = np.array(intersection(2))
     
-    return le, te, np.linalg.norm(te - le)
\ No newline at end of file
+    return le, te, np.linalg.norm(te - le)
+
+def distribute_to_nodes(element_nodes, element_forces, nodes_per_elem=None):
+    """
+    Distributes element forces equally onto the element nodes and sums the
+    forces of nodes shared by several elements.
+
+    Parameters
+    ----------
+    element_nodes : list
+        Node numbers of every element (np.array or list).
+    element_forces : np.array
+        Force components of every element, shape (elements, components).
+    nodes_per_elem : int, optional
+        Divisor of the element force. The default is None (number of nodes 
+        of the respective element).
+
+    Returns
+    -------
+    nodes : np.array
+        Sorted unique node numbers.
+    forces : np.array
+        Summed nodal forces, shape (nodes, components).
+
+    """
+    element_forces = np.asarray(element_forces, dtype=float)
+    if element_forces.ndim == 1:
+        element_forces = element_forces[:, None]
+        
+    counts = np.array([len(nodes) for nodes in element_nodes])
+    all_nodes = np.concatenate([np.asarray(nodes, dtype=int) 
+                                for nodes in element_nodes])
+    
+    share = element_forces / (counts[:, None] if nodes_per_elem is None 
+                              else nodes_per_elem)
+    share = np.repeat(share, counts, axis=0)
+    
+    nodes, inverse = np.unique(all_nodes, return_inverse=True)
+    forces = np.column_stack([np.bincount(inverse, weights=share[:, i], 
+                                          minlength=len(nodes))
+                              for i in range(share.shape[1])])
+    
+    return nodes, forces
+
+
+def write_load_file(filename, elements=(), pressures=(), nodes=(), 
+                    forces=None, labels=('FX', 'FY', 'FZ')):
+    """
+    Writes surface loads (SFE) and nodal forces (F) as APDL command file,
+    to be read with read_input_file().
+
+    Parameters
+    ----------
+    filename : str
+    elements : np.array, optional
+        Element numbers of the pressure loads.
+    pressures : np.array, optional
+        Pressure on face 1 of every element.
+    nodes : np.array, optional
+        Node numbers of the nodal forces.
+    forces : np.array, optional
+        Nodal forces, shape (nodes, len(labels)).
+    labels : tuple, optional
+        Force labels of the columns of forces. The default is 
+        ('FX', 'FY', 'FZ').
+
+    """
+    with open(filename, 'w') as f:
+        f.write('! Loads, written by util_mapdl.prep_functions\n')
+        
+        if len(elements):
+            np.savetxt(f, np.column_stack([elements, pressures]),
+                       fmt=['SFE,%d,,PRES,1', '%.15g'], delimiter=',')
+        
+        if len(nodes):
+            forces = np.asarray(forces, dtype=float).reshape(len(nodes), -1)
+            for column, label in enumerate(labels[:forces.shape[1]]):
+                np.savetxt(f, np.column_stack([nodes, forces[:, column]]),
+                           fmt=['F,%d,' + label, '%.15g'], delimiter=',')
+
+
+def read_input_file(mapdl, filename):
+    """Lets MAPDL read an APDL command file (/INPUT)."""
+    
+    mapdl.input(os.path.abspath(filename))
+
+
+def working_directory(mapdl):
+    """
+    Returns the working directory (run_location) of MAPDL. Several MAPDL 
+    instances (e.g. one per MPI rank) run in different directories, while
+    the Python processes may share one working directory.
+
+    """
+    for attribute in ['directory', 'path']:
+        directory = getattr(mapdl, attribute, None)
+        if isinstance(directory, str) and directory:
+            return directory
+    
+    mapdl.run('/inquire,mapdl_cwd,directory')
+    return str(mapdl.parameters['mapdl_cwd']).strip()
+
+
+@contextlib.contextmanager
+def working_file(mapdl, filename):
+    """
+    Context manager for a file exchanged with MAPDL (e.g. an APDL command 
+    file or a *MWRITE result): yields the path of filename in the working 
+    directory of MAPDL and deletes the file afterwards.
+
+    .. code-block:: python
+
+        with working_file(mapdl, '_ansys_loads.inp') as path:
+            write_load_file(path, elements, pressures)
+            read_input_file(mapdl, path)
+
+    """
+    path = os.path.join(working_directory(mapdl), filename)
+    
+    try:
+        yield path
+    finally:
+        if os.path.isfile(path):
+            os.remove(path)
+
+
+def write_section_file(filename, elements, thickness, material, angle, 
+                       section_ids=None, integration_points=3):
+    """
+    Writes layered shell sections (SECTYPE/SECDATA) and their assignment 
+    to the elements (EMODIF) as APDL command file, to be read with 
+    read_input_file().
+
+    Parameters
+    ----------
+    filename : str
+    elements : np.array
+        Element numbers.
+    thickness : np.array
+        Layer thicknesses, shape (elements, layers). np.nan: no layer.
+    material : np.array
+        Material numbers, same shape.
+    angle : np.array
+        Fiber angles, same shape.
+    section_ids : np.array, optional
+        Section number of every element. The default is None (the element 
+        number).
+    integration_points : int, optional
+        The default is 3.
+
+    """
+    elements = np.asarray(elements, dtype=int)
+    section_ids = elements if section_ids is None \
+        else np.asarray(section_ids, dtype=int)
+    thickness = np.asarray(thickness, dtype=float)
+    material = np.asarray(material, dtype=int)
+    angle = np.asarray(angle, dtype=float)
+    
+    lines = ['! Sections, written by util_mapdl.prep_functions']
+    
+    _, first = np.unique(section_ids, return_index=True)
+    for idx in np.sort(first):
+        lines.append('SECTYPE,%d,SHELL' % section_ids[idx])
+        for layer in np.flatnonzero(~np.isnan(thickness[idx])):
+            lines.append('SECDATA,%.15g,%d,%.15g,%d' 
+                         % (thickness[idx, layer], material[idx, layer],
+                            angle[idx, layer], integration_points))
+    
+    lines += ['EMODIF,%d,SECNUM,%d' % (element, section) 
+              for element, section in zip(elements, section_ids)]
+    
+    with open(filename, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
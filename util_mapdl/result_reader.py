@@ -0,0 +1,216 @@
+#%% Import Libraries and Data
+
+# Third-party imports
+import shutil
+import numpy as np
+
+# Local imports
+
+# %%
+
+
+def read_binary(filename):
+    """
+    Opens a MAPDL result file with ansys-mapdl-reader (or the older
+    pyansys), which is only needed for this module.
+
+    """
+    try:
+        from ansys.mapdl.reader import read_binary
+    except ImportError:
+        try:
+            from pyansys import read_binary
+        except ImportError:
+            raise ImportError('Reading result files requires '
+                              'ansys-mapdl-reader: '
+                              'pip install ansys-mapdl-reader')
+
+    return read_binary(filename)
+
+
+class ResultReader:
+    """
+    Reads element layer stresses, displacements and reaction forces
+    directly from a MAPDL result file (.rst) instead of *GET/ETABLE
+    commands of a running MAPDL session. Element results are ordered like
+    the given element numbers (e.g. element_data['Element Number']).
+
+    The reader only holds the file name, so it can be passed to another
+    process, e.g. to post-process a copy of the result file while MAPDL
+    already solves the next design:
+
+    .. code-block:: python
+
+        from util_mapdl.result_reader import ResultReader
+
+        reader = model.result_reader(copy_to='design_1.rst')
+        future = executor.submit(reader.layer_stresses, n_layers=5)
+
+    Parameters
+    ----------
+    filename : str
+        Path of the result file.
+    element_numbers : np.array, optional
+        Element numbers in the order of the returned element results. The
+        default is None (all elements, sorted by number).
+
+    """
+
+    def __init__(self, filename, element_numbers=None):
+        self.filename = filename
+        self.element_numbers = None if element_numbers is None \
+            else np.asarray(element_numbers, dtype=int)
+        self.__result = None
+
+    def __repr__(self):
+        return 'ResultReader (' + str(self.filename) + ')'
+
+    def __getstate__(self):
+        # The opened result file is not picklable, it is opened again
+        state = self.__dict__.copy()
+        state['_ResultReader__result'] = None
+        return state
+
+    @classmethod
+    def from_mapdl(cls, mapdl, element_numbers=None, copy_to=None):
+        """
+        Returns a reader of the result file of a MAPDL session.
+
+        Parameters
+        ----------
+        mapdl : Mapdl
+        element_numbers : np.array, optional
+            See ResultReader.
+        copy_to : str, optional
+            The result file is copied to this path first, so the next solve
+            does not overwrite it. The default is None (no copy).
+
+        """
+        filename = mapdl.result_file
+
+        if copy_to is not None:
+            filename = shutil.copyfile(filename, copy_to)
+
+        return cls(filename, element_numbers)
+
+    @property
+    def result(self):
+        """
+        Returns
+        -------
+        Result
+            The result file opened by ansys-mapdl-reader.
+
+        """
+        if self.__result is None:
+            self.__result = read_binary(self.filename)
+
+        return self.__result
+
+    @property
+    def n_results(self):
+        """
+        Returns
+        -------
+        int
+            Number of result sets (e.g. loadcases) in the file.
+
+        """
+        return self.result.nsets
+
+    def node_coordinates(self):
+        """
+        Returns
+        -------
+        nnum : np.array
+            Node numbers.
+        nodes : np.array
+            Coordinates of the nodes, shape (nodes, 3).
+
+        """
+        return (np.asarray(self.result.mesh.nnum, dtype=int),
+                np.asarray(self.result.mesh.nodes, dtype=float)[:, :3])
+
+    def nodal_displacement(self, rnum=0):
+        """
+        Returns
+        -------
+        nnum : np.array
+            Node numbers.
+        disp : np.array
+            Displacements of the nodes, shape (nodes, DOF).
+
+        """
+        nnum, disp = self.result.nodal_displacement(rnum)
+
+        return np.asarray(nnum, dtype=int), np.asarray(disp, dtype=float)
+
+    def nodal_reaction_forces(self, rnum=0):
+        """
+        Returns
+        -------
+        rforces : np.array
+            Reaction force of every constrained DOF.
+        nnum : np.array
+            Node number of every entry.
+        dof : np.array
+            DOF of every entry (1 = UX, ... 6 = ROTZ).
+
+        """
+        rforces, nnum, dof = self.result.nodal_reaction_forces(rnum)
+
+        return (np.asarray(rforces, dtype=float),
+                np.asarray(nnum, dtype=int), np.asarray(dof, dtype=int))
+
+    def layer_stresses(self, n_layers, rnum=0):
+        """
+        Returns the stresses of all layers of all elements in the element
+        coordinate system, averaged over the nodes and the bottom and top
+        of every layer, see post_functions.rotate_stresses() for the layer
+        coordinate system.
+
+        The record of every element is read as layers x (bottom, top) x 
+        4 corner nodes x 6 components, the layout of SHELL281 with 
+        KEYOPT(8) = 1 (all layers stored). This layout is not verified for
+        other element types or KEYOPT(8) settings; records that do not fit
+        it raise a ValueError.
+
+        Parameters
+        ----------
+        n_layers : int
+            Maximum number of layers. Elements with fewer layers are
+            np.nan in the missing layers.
+        rnum : int, optional
+            Result number (zero based). The default is 0.
+
+        Returns
+        -------
+        stresses : np.array
+            Shape (elements, n_layers, 6): Sx, Sy, Sz, Sxy, Syz, Sxz.
+
+        """
+        enum, element_stress, _ = self.result.element_stress(
+            rnum, in_element_coord_sys=True)
+        enum = np.asarray(enum, dtype=int)
+
+        stresses = np.full((len(enum), n_layers, 6), np.nan)
+        for idx, data in enumerate(element_stress):
+            # Record order: layer, bottom/top, corner node
+            data = np.asarray(data, dtype=float).ravel()
+            layers, remainder = divmod(data.size, 2 * 4 * 6)
+            if remainder or layers > n_layers:
+                raise ValueError('Element %i: %i stress values do not match '
+                                 'the SHELL281 KEYOPT(8) = 1 layout of at '
+                                 'most %i layers' 
+                                 % (enum[idx], data.size, n_layers))
+            stresses[idx, :layers] = data.reshape(layers, 2 * 4, 6) \
+                .mean(axis=1)
+
+        if self.element_numbers is None:
+            return stresses
+
+        order = np.argsort(enum)
+        rows = order[np.searchsorted(enum, self.element_numbers,
+                                     sorter=order)]
+
+        return stresses[rows]